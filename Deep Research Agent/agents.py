@@ -1,11 +1,53 @@
 # agents.py
 # Contains agent definitions and initialization functions
 
+import contextvars
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import streamlit as st
 from agno.agent import Agent
 from agno.models.azure import AzureOpenAI
-from agno.tools.duckduckgo import DuckDuckGoTools
+from agno.run.response import RunResponse
 from textwrap import dedent
+from search_cache import CachedDuckDuckGoTools
+from utils import parse_subtopics
+
+# Section layout of the final report, shared by the team coordinator and the fan-out writer
+REPORT_STRUCTURE = dedent("""
+    ## Summary
+    (Compelling headline)
+    (Concise overview of key findings and significance)
+
+    ## Background & Context
+    (Historical context and importance)
+    (Current landscape overview)
+
+    ## Key Findings
+    (Main discoveries and analysis with citations and links)
+    (Expert insights and quotes with citations and links)
+    (Statistical evidence with links)
+
+    ## Impact Analysis
+    (Broader implications)
+    (Stakeholder perspectives)
+    (Industry/societal effects)
+
+    ## Future Directions
+    (Emerging trends)
+    (Expert predictions)
+    (Potential challenges and opportunities)
+
+    ## Expert Insights
+    (Notable quotes and analysis from industry leaders)
+    (Contrasting viewpoints)
+
+    ## Sources & Methodology
+    (List of primary sources with the links)
+    (Research methodology overview)
+
+    Compiled by ResearchGPT
+    Published: [current_date]
+    Last Updated: [current_time]
+    """)
 
 @st.cache_resource
 def initialize_single_agent():
@@ -21,7 +63,7 @@ def initialize_single_agent():
                 azure_deployment="gpt-4o-mini",
                 api_version="2024-02-15-preview",
             ),
-            tools=[DuckDuckGoTools()],
+            tools=[CachedDuckDuckGoTools()],
             show_tool_calls=True,
             description="You are a deep researcher which gives detailed responses on the research topics provided.",
             instructions="""You are a research assistant that can perform deep web research on any topic.
@@ -42,6 +84,139 @@ def initialize_single_agent():
         st.error(f"Error initializing agent: {str(e)}")
         return None
 
+def create_research_planner():
+    """Create the Research Planner agent"""
+    return Agent(
+        name="Research Planner",
+        role="Breaks research queries into structured subtopics and assigns relevant sources",
+        instructions="""
+        - Decompose research queries into well-structured subtopics covering all relevant angles
+        - Ensure logical flow and coverage of historical, current, and future perspectives
+        - Identify and recommend the most credible sources for each subtopic.
+        - Prioritize primary research, expert opinions, and authoritative publications
+        - Generate a detailed research roadmap specifying:
+            1. Subtopics with clear focus areas.
+            2. Recommended sources (websites, papers, reports).
+            3. Suggested research methodologies (quantitative, qualitative, case studies).
+        """,
+        model=AzureOpenAI(
+            azure_deployment="gpt-4o-mini",
+            api_version="2024-02-15-preview",
+        ),
+        tools=[CachedDuckDuckGoTools()],
+        show_tool_calls=True,
+        markdown=True
+    )
+
+def create_research_agent():
+    """Create a Research Agent; each concurrent sub-topic gets its own instance"""
+    return Agent(
+        name='Research Agent',
+        tools=[CachedDuckDuckGoTools()],
+        model=AzureOpenAI(
+            azure_deployment="gpt-4o-mini",
+            api_version="2024-02-15-preview",
+        ),
+        description="An expert researcher conducting deep web searches and verifying sources",
+        instructions="""
+        - Go through the research plan
+        - Perform relevant websearches based on the planned topics ad resources
+        - Prioritize recent and authoritative sources.
+        - Identify key stakeholders and perspectives
+        - Ensure all URLs cited are working and accessible with 200 status codes
+        - Provide all sources with proper formatted hyperlinks
+        """,
+        expected_output="""
+        # Research Summary Report
+
+        ## Topic: [Research Topic]
+
+        ### Key Findings
+        - **Finding 1:** [Detailed explanation with supporting data]
+        - **Finding 2:** [Detailed explanation with supporting data]
+        - **Finding 3:** [Detailed explanation with supporting data]
+
+        ### Source-Based Insights
+        #### Source 1: [Source Name / URL]
+        - **Summary:** [Concise summary of key points]
+        - **Relevant Data:** [Key statistics, dates, or figures]
+        - **Notable Quotes:** [Direct citations from experts, if available]
+
+        #### Source 2: [Source Name / URL]
+        - **Summary:** [Concise summary of key points]
+        - **Relevant Data:** [Key statistics, dates, or figures]
+        - **Notable Quotes:** [Direct citations from experts, if available]
+
+        (...repeat for all sources...)
+
+        ### Overall Trends & Patterns
+        - **Consensus among sources:** [Common viewpoints and recurring themes]
+        - **Diverging Opinions:** [Conflicting perspectives and debates]
+        - **Emerging Trends:** [New insights, innovations, or potential shifts]
+
+        ### Citations & References
+        - [[Source 1 Name]]([URL])
+        - [[Source 2 Name]]([URL])
+        - [...list all sources with links...]
+
+        ---
+
+        Research conducted by AI Investigative Journalist
+        Compiled on: [current_date] at [current_time]
+        """,
+        show_tool_calls=True,
+        add_datetime_to_instructions=True,
+    )
+
+def create_analysis_agent():
+    """Create the Analysis Agent"""
+    return Agent(
+        name="Analysis Agent",
+        tools=[CachedDuckDuckGoTools()],
+        model=AzureOpenAI(
+            azure_deployment="gpt-4o-mini",
+            api_version="2024-02-15-preview",
+        ),
+        description="A data analyst identifying trends, evaluating viewpoints, and synthesizing information",
+        instructions=dedent("""
+        - Analyze collected research for patterns, trends, and conflicting viewpoints.
+        - Evaluate the credibility of sources and filter out misinformation.
+        - Summarize findings with statistical and contextual backing.
+        - Verify all URLs are accessible and valid.
+        - Format all sources as clickable Markdown links.
+        """),
+        expected_output=dedent("""A critical analysis report in detail with all the identified patterns, trends, and insights supported by evidence. The report should evaluate source credibility and highlight any conflicting information found during research."""),
+        show_tool_calls=True
+    )
+
+def create_writing_agent():
+    """Create the Writing Agent"""
+    return Agent(
+        name='Writing Agent',
+        model=AzureOpenAI(
+            azure_deployment="gpt-4o-mini",
+            api_version="2024-02-15-preview",
+        ),
+        tools=[CachedDuckDuckGoTools()],
+        description="A professional journalist specializing in NYT-style reporting and feature writing",
+        instructions=dedent("""
+        Report Structure 📝
+        - Create an engaging academic title
+        - Write a compelling abstract
+        - Present methodology clearly
+        - Discuss findings systematically
+        - Draw evidence-based conclusions
+        - Maintain journalistic integrity, objectivity, and balance.
+        - Use clear, engaging language and provide necessary background.
+        - Use proper citations for each source 
+        - Format all references as proper Markdown links
+        - Ensure all URLs cited are working and accessible
+        """),
+        markdown=True,
+        show_tool_calls=True,
+        add_datetime_to_instructions=True
+    )
+
 @st.cache_resource
 def initialize_research_team():
     """
@@ -51,134 +226,10 @@ def initialize_research_team():
         Agent: Configured research team agent or None if error
     """
     try:
-        # Research planner
-        research_planner = Agent(
-            name="Research Planner",
-            role="Breaks research queries into structured subtopics and assigns relevant sources",
-            instructions="""
-            - Decompose research queries into well-structured subtopics covering all relevant angles
-            - Ensure logical flow and coverage of historical, current, and future perspectives
-            - Identify and recommend the most credible sources for each subtopic.
-            - Prioritize primary research, expert opinions, and authoritative publications
-            - Generate a detailed research roadmap specifying:
-                1. Subtopics with clear focus areas.
-                2. Recommended sources (websites, papers, reports).
-                3. Suggested research methodologies (quantitative, qualitative, case studies).
-            """,
-            model=AzureOpenAI(
-                azure_deployment="gpt-4o-mini",
-                api_version="2024-02-15-preview",
-            ),
-            tools=[DuckDuckGoTools()],
-            show_tool_calls=True,
-            markdown=True
-        )
-
-        # Research Agent
-        research_agent = Agent(
-            name='Research Agent',
-            tools=[DuckDuckGoTools()],
-            model=AzureOpenAI(
-                azure_deployment="gpt-4o-mini",
-                api_version="2024-02-15-preview",
-            ),
-            description="An expert researcher conducting deep web searches and verifying sources",
-            instructions="""
-            - Go through the research plan
-            - Perform relevant websearches based on the planned topics ad resources
-            - Prioritize recent and authoritative sources.
-            - Identify key stakeholders and perspectives
-            - Ensure all URLs cited are working and accessible with 200 status codes
-            - Provide all sources with proper formatted hyperlinks
-            """,
-            expected_output="""
-            # Research Summary Report
-            
-            ## Topic: [Research Topic]
-            
-            ### Key Findings
-            - **Finding 1:** [Detailed explanation with supporting data]
-            - **Finding 2:** [Detailed explanation with supporting data]
-            - **Finding 3:** [Detailed explanation with supporting data]
-            
-            ### Source-Based Insights
-            #### Source 1: [Source Name / URL]
-            - **Summary:** [Concise summary of key points]
-            - **Relevant Data:** [Key statistics, dates, or figures]
-            - **Notable Quotes:** [Direct citations from experts, if available]
-            
-            #### Source 2: [Source Name / URL]
-            - **Summary:** [Concise summary of key points]
-            - **Relevant Data:** [Key statistics, dates, or figures]
-            - **Notable Quotes:** [Direct citations from experts, if available]
-            
-            (...repeat for all sources...)
-            
-            ### Overall Trends & Patterns
-            - **Consensus among sources:** [Common viewpoints and recurring themes]
-            - **Diverging Opinions:** [Conflicting perspectives and debates]
-            - **Emerging Trends:** [New insights, innovations, or potential shifts]
-            
-            ### Citations & References
-            - [[Source 1 Name]]([URL])
-            - [[Source 2 Name]]([URL])
-            - [...list all sources with links...]
-            
-            ---
-            
-            Research conducted by AI Investigative Journalist
-            Compiled on: [current_date] at [current_time]
-            """,
-            show_tool_calls=True,
-            add_datetime_to_instructions=True,
-        )
-
-        # Analysis Agent
-        analysis_agent = Agent(
-            name="Analysis Agent",
-            tools=[DuckDuckGoTools()],
-            model=AzureOpenAI(
-                azure_deployment="gpt-4o-mini",
-                api_version="2024-02-15-preview",
-            ),
-            description="A data analyst identifying trends, evaluating viewpoints, and synthesizing information",
-            instructions=dedent("""
-            - Analyze collected research for patterns, trends, and conflicting viewpoints.
-            - Evaluate the credibility of sources and filter out misinformation.
-            - Summarize findings with statistical and contextual backing.
-            - Verify all URLs are accessible and valid.
-            - Format all sources as clickable Markdown links.
-            """),
-            expected_output=dedent("""A critical analysis report in detail with all the identified patterns, trends, and insights supported by evidence. The report should evaluate source credibility and highlight any conflicting information found during research."""),
-            show_tool_calls=True
-        )
-
-        # Writing Agent
-        writing_agent = Agent(
-            name='Writing Agent',
-            model=AzureOpenAI(
-                azure_deployment="gpt-4o-mini",
-                api_version="2024-02-15-preview",
-            ),
-            tools=[DuckDuckGoTools()],
-            description="A professional journalist specializing in NYT-style reporting and feature writing",
-            instructions=dedent("""
-            Report Structure 📝
-            - Create an engaging academic title
-            - Write a compelling abstract
-            - Present methodology clearly
-            - Discuss findings systematically
-            - Draw evidence-based conclusions
-            - Maintain journalistic integrity, objectivity, and balance.
-            - Use clear, engaging language and provide necessary background.
-            - Use proper citations for each source 
-            - Format all references as proper Markdown links
-            - Ensure all URLs cited are working and accessible
-            """),
-            markdown=True,
-            show_tool_calls=True,
-            add_datetime_to_instructions=True
-        )
+        research_planner = create_research_planner()
+        research_agent = create_research_agent()
+        analysis_agent = create_analysis_agent()
+        writing_agent = create_writing_agent()
 
         # Research Team
         research_team = Agent(
@@ -190,7 +241,7 @@ def initialize_research_team():
             description="A team coordinator conducting investigative reporting collaboratively",
             role="Executes a structured research workflow",
             team=[research_planner, research_agent, analysis_agent, writing_agent],
-            tools=[DuckDuckGoTools()],
+            tools=[CachedDuckDuckGoTools()],
             instructions=dedent("""
             - Establish a workflow for executing a structured research operation.
             - Assign tasks to each agent sequentially.
@@ -201,42 +252,7 @@ def initialize_research_team():
             - Format all references as proper clickable Markdown links (not full link just the header) 
             -  The final Response must not be less than 1000 words.
             """),
-            expected_output=dedent("""
-            ## Summary
-            (Compelling headline)
-            (Concise overview of key findings and significance)
-            
-            ## Background & Context
-            (Historical context and importance)
-            (Current landscape overview)
-            
-            ## Key Findings
-            (Main discoveries and analysis with citations and links)
-            (Expert insights and quotes with citations and links)
-            (Statistical evidence with links)
-            
-            ## Impact Analysis
-            (Broader implications)
-            (Stakeholder perspectives)
-            (Industry/societal effects)
-            
-            ## Future Directions
-            (Emerging trends)
-            (Expert predictions)
-            (Potential challenges and opportunities)
-            
-            ## Expert Insights
-            (Notable quotes and analysis from industry leaders)
-            (Contrasting viewpoints)
-            
-            ## Sources & Methodology
-            (List of primary sources with the links)
-            (Research methodology overview)
-            
-            Compiled by ResearchGPT
-            Published: [current_date]
-            Last Updated: [current_time]
-            """),
+            expected_output=REPORT_STRUCTURE,
             markdown=True,
             show_tool_calls=True,
             add_datetime_to_instructions=True
@@ -247,3 +263,122 @@ def initialize_research_team():
         st.error(f"Error initializing research team: {str(e)}")
         return None
 
+
+# ---Parallel Sub-topic Fan-out---
+
+MAX_SUBTOPICS = 6
+DEFAULT_RESEARCH_CONCURRENCY = 4
+
+PLANNER_FANOUT_PROMPT = dedent("""
+    Create a research roadmap for: {query}
+
+    End your answer with a section titled "## Subtopics" that lists 3 to {max_subtopics} subtopics,
+    one per line, formatted as "- <subtopic title>: <focus area>".
+    """)
+
+RESEARCH_SUBTOPIC_PROMPT = dedent("""
+    Overall research topic: {query}
+
+    Research roadmap:
+    {roadmap}
+
+    Research ONLY this subtopic of the roadmap: {subtopic}
+    """)
+
+ANALYSIS_FANOUT_PROMPT = dedent("""
+    Research topic: {query}
+
+    Below are the findings of {count} researchers, one per subtopic. Analyze them together:
+
+    {findings}
+    """)
+
+WRITING_FANOUT_PROMPT = dedent("""
+    Write the final research report on: {query}
+
+    Base it on the analysis and the subtopic findings below. Every section must contain citations,
+    formatted as clickable Markdown links (not full link just the header). The report must not be
+    less than 1000 words and must follow this structure:
+    {structure}
+
+    ## Analysis
+    {analysis}
+
+    ## Subtopic Findings
+    {findings}
+    """)
+
+def _research_subtopic(query, roadmap, subtopic):
+    """Run a fresh Research Agent on one sub-topic and return its findings"""
+    response = create_research_agent().run(
+        RESEARCH_SUBTOPIC_PROMPT.format(query=query, roadmap=roadmap, subtopic=subtopic))
+    return response.content or ""
+
+class ParallelResearchTeam:
+    """
+    Research workflow that researches the planner's sub-topics concurrently
+    
+    The Research Planner's roadmap is split into sub-topics, one Research
+    Agent per sub-topic runs on a thread pool capped at max_concurrency,
+    and the merged findings go to the Analysis and Writing agents. Research
+    time is that of the slowest sub-topic rather than the sum of all of
+    them. Agents are created per run, so concurrent runs share no state.
+    """
+
+    def __init__(self, max_concurrency=DEFAULT_RESEARCH_CONCURRENCY, max_subtopics=MAX_SUBTOPICS):
+        self.max_concurrency = max(1, max_concurrency)
+        self.max_subtopics = max_subtopics
+
+    def run(self, query, stream=False, on_status=None):
+        """
+        Research a query
+        
+        Args:
+            query (str): Research question or topic
+            stream (bool): Stream the Writing Agent's report as it is written
+            on_status (callable): Optional callback receiving progress messages
+            
+        Returns:
+            Iterator of RunResponse chunks when streaming, else the final RunResponse
+        """
+        chunks = self._run(query, on_status or (lambda message: None))
+        if stream:
+            return chunks
+        return RunResponse(content="".join(chunk.content or "" for chunk in chunks))
+
+    def _run(self, query, on_status):
+        on_status("Planning sub-topics...")
+        roadmap = create_research_planner().run(
+            PLANNER_FANOUT_PROMPT.format(query=query, max_subtopics=self.max_subtopics)).content or ""
+        subtopics = parse_subtopics(roadmap, self.max_subtopics)
+        if not subtopics:
+            on_status("No sub-topics found in the research plan; researching the whole query instead")
+            subtopics = [query]
+
+        findings = [None] * len(subtopics)
+        on_status(f"Researching {len(subtopics)} sub-topic(s), {min(self.max_concurrency, len(subtopics))} at a time...")
+        with ThreadPoolExecutor(max_workers=min(self.max_concurrency, len(subtopics))) as pool:
+            # Each researcher runs in a copy of this context, so its searches count towards this run
+            futures = {pool.submit(contextvars.copy_context().run, _research_subtopic, query, roadmap,
+                                   subtopic): i
+                       for i, subtopic in enumerate(subtopics)}
+            for done, future in enumerate(as_completed(futures), start=1):
+                i = futures[future]
+                try:
+                    findings[i] = future.result()
+                except Exception as e:
+                    findings[i] = f"_Research for this sub-topic failed: {e}_"
+                on_status(f"Researched {done}/{len(subtopics)}: {subtopics[i]}")
+
+        # Merge in roadmap order, whatever order the researchers finished in
+        merged = "\n\n".join(f"### Subtopic: {subtopic}\n\n{finding}"
+                             for subtopic, finding in zip(subtopics, findings))
+        on_status("Analyzing merged findings...")
+        analysis = create_analysis_agent().run(
+            ANALYSIS_FANOUT_PROMPT.format(query=query, count=len(subtopics), findings=merged)).content or ""
+
+        on_status("Writing the report...")
+        yield from create_writing_agent().run(
+            WRITING_FANOUT_PROMPT.format(query=query, structure=REPORT_STRUCTURE, analysis=analysis,
+                                         findings=merged),
+            stream=True)
@@ -9,9 +9,11 @@ from dotenv import load_dotenv
 
 # Import from local modules
 from style import CSS
-from utils import get_image_base64
-from agents import initialize_single_agent, initialize_research_team
+from utils import get_image_base64, new_report_path, tee_stream
+from agents import (initialize_single_agent, initialize_research_team, ParallelResearchTeam,
+                    DEFAULT_RESEARCH_CONCURRENCY)
 from animation import show_research_pipeline
+from search_cache import track_searches
 
 # Load environment variables
 load_dotenv()
@@ -58,9 +60,12 @@ with st.sidebar:
     st.markdown("### Research Mode")
     research_mode = st.radio(
         "Select Research Mode:",
-        ["Standard (Single Agent)", "Advanced (Multi-Agent Team)"],
+        ["Standard (Single Agent)", "Advanced (Multi-Agent Team)", "Parallel (Sub-topic Fan-out)"],
         index=1
     )
+    if research_mode == "Parallel (Sub-topic Fan-out)":
+        max_concurrency = st.slider("Parallel researchers:", 1, 8, DEFAULT_RESEARCH_CONCURRENCY,
+                                    help="Maximum number of sub-topics researched at the same time")
 
 # Create a two-column layout
 col1, col2 = st.columns([2, 1])
@@ -91,15 +96,28 @@ with col2:
                     <small>{item['date']}</small>
                 </div>
                 """, unsafe_allow_html=True)
+                # Older reports may have been pruned from disk
+                if os.path.exists(item["report_path"]):
+                    with open(item["report_path"], "rb") as report_file:
+                        st.download_button(
+                            label="📥 Download",
+                            data=report_file.read(),
+                            file_name=os.path.basename(item["report_path"]),
+                            mime="text/markdown",
+                            key=f"history_download_{item['report_path']}"
+                        )
 
 # Main research execution
 if search_button and query:
     # Get appropriate agent based on selected mode
     if research_mode == "Standard (Single Agent)":
         agent = initialize_single_agent()
-    else:  # Advanced (Multi-Agent Team)
+    elif research_mode == "Advanced (Multi-Agent Team)":
         agent = initialize_research_team()
         show_research_pipeline()
+    else:  # Parallel (Sub-topic Fan-out)
+        agent = ParallelResearchTeam(max_concurrency)
+        show_research_pipeline()
     
     if agent:
         with st.container():
@@ -110,63 +128,61 @@ if search_button and query:
                 try:
                     # Record start time
                     start_time = time.time()
+                    started_at = datetime.datetime.now()
+                    report_path = new_report_path(started_at)
                     
-                    # Run the agent with the query
-                    with st.spinner("Research Team Lead Finalizing research..."):
-                        response = agent.run(query)
-                        stream = True
-                        if stream:
-                            response_stream = agent.run(query, stream=True)
-                            response_text = ""
-                            report_placeholder = st.empty()
-
-                            for chunk in response_stream:
-                                response_text += chunk.content
-                                report_placeholder.markdown(response_text + "▌")
-
-                            report_placeholder.markdown(response_text)
+                    # One streaming run; chunks go to the page and the report file as they arrive
+                    with st.spinner("Research Team Lead Finalizing research..."), \
+                            track_searches() as search_stats, \
+                            open(report_path, "w", encoding="utf-8") as report_file:
+                        report_file.write(f"""# Research: {query}
+
+Date: {started_at.strftime("%Y-%m-%d %H:%M:%S")}
+Mode: {research_mode}
+
+---
+
+""")
+                        run_options = {}
+                        if isinstance(agent, ParallelResearchTeam):
+                            run_options["on_status"] = st.empty().caption
+                        report_parts = []
+                        report_placeholder = st.empty()
+                        last_render = 0.0
+                        for text in tee_stream(agent.run(query, stream=True, **run_options), report_file):
+                            report_parts.append(text)
+                            # Re-rendering the growing markdown on every token is quadratic; throttle it
+                            if time.time() - last_render >= 0.1:
+                                report_placeholder.markdown("".join(report_parts) + "▌")
+                                last_render = time.time()
+
+                        report_placeholder.markdown("".join(report_parts))
                     
-                    # Record end time and calculate duration
-                    duration = round(time.time() - start_time, 2)
+                        # Record end time and calculate duration
+                        duration = round(time.time() - start_time, 2)
+                        report_file.write(f"\n\n---\n\nDuration: {duration} seconds\n")
                     
                     # Save to history
                     st.session_state.research_history.append({
                         "query": query,
-                        "date": datetime.datetime.now().strftime("%Y-%m-%d %H:%M"),
+                        "date": started_at.strftime("%Y-%m-%d %H:%M"),
                         "duration": duration,
-                        "mode": research_mode
+                        "mode": research_mode,
+                        "report_path": report_path
                     })
                     
                     # Show success message
                     st.success(f"Research completed in {duration} seconds using {research_mode} mode")
+                    st.caption(search_stats.summary())
                     
-                    # Display results
-                    # with st.container():
-                    #     st.markdown(response.content)
-                    
-                    # Generate file for download
-                    current_time = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-                    file_name = f"research_{current_time}.md"
-                    
-                    # Add metadata to the markdown content
-                    markdown_content = f"""# Research: {query}
-                    
-Date: {datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")}
-Mode: {research_mode}
-Duration: {duration} seconds
-
----
-
-
-                    """
-                    
-                    # Download option
-                    st.download_button(
-                        label="📥 Download Research",
-                        data=markdown_content,
-                        file_name=file_name,
-                        mime="text/markdown"
-                    )
+                    # Download option with the full report read back from disk
+                    with open(report_path, "rb") as report_file:
+                        st.download_button(
+                            label="📥 Download Research",
+                            data=report_file.read(),
+                            file_name=os.path.basename(report_path),
+                            mime="text/markdown"
+                        )
                     
                 except Exception as e:
                     st.error(f"Error during research: {str(e)}")
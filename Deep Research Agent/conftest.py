@@ -0,0 +1,6 @@
+# conftest.py
+# Test setup: app modules import from this directory
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
@@ -0,0 +1,206 @@
+# search_cache.py
+# Process-wide DuckDuckGo result cache shared by every research agent
+
+import contextvars
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from contextlib import contextmanager
+from agno.tools.duckduckgo import DuckDuckGoTools
+
+SEARCH_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "search")
+# Search results older than this are fetched again
+SEARCH_CACHE_TTL = 6 * 60 * 60
+# Results kept in memory; older ones are still read back from disk
+MEMORY_CACHE_SIZE = 512
+
+_WHITESPACE = re.compile(r"\s+")
+
+def normalize_query(query):
+    """
+    Normalize a search query so trivially different spellings share a cache entry
+
+    Args:
+        query (str): Search query as issued by an agent
+
+    Returns:
+        str: Lowercased query with collapsed whitespace and no trailing punctuation
+    """
+    return _WHITESPACE.sub(" ", query).strip().rstrip("?.!").strip().casefold()
+
+class SearchStats:
+    """Hit, miss and dedup counters of the searches made during one research run"""
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.deduped = 0
+        self._lock = threading.Lock()
+
+    def record(self, outcome):
+        with self._lock:
+            setattr(self, outcome, getattr(self, outcome) + 1)
+
+    def summary(self):
+        """One-line description of the counters"""
+        return (f"Web searches: {self.misses} fetched · {self.hits} served from cache · "
+                f"{self.deduped} shared with an identical in-flight search")
+
+_run_stats = contextvars.ContextVar("search_run_stats", default=None)
+
+@contextmanager
+def track_searches():
+    """
+    Count the searches made in this context (and in contexts copied from it)
+
+    Yields:
+        SearchStats: Counters updated as agents search
+    """
+    stats = SearchStats()
+    token = _run_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _run_stats.reset(token)
+
+def _record(outcome):
+    stats = _run_stats.get()
+    if stats is not None:
+        stats.record(outcome)
+
+class SearchCache:
+    """
+    TTL cache of search results, in memory and on disk, with single-flight fetching
+
+    Concurrent requests for the same normalized query wait for one fetch
+    instead of each calling the search engine. Failed fetches are not cached.
+    """
+
+    def __init__(self, directory=SEARCH_CACHE_DIR, ttl=SEARCH_CACHE_TTL, max_entries=MEMORY_CACHE_SIZE):
+        self.directory = directory
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._memory = OrderedDict()
+        self._inflight = {}
+        self._lock = threading.Lock()
+
+    def _path(self, key):
+        return os.path.join(self.directory, key[:2], f"{key}.json")
+
+    def _read_disk(self, key):
+        try:
+            with open(self._path(key), encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if time.time() - entry.get("fetched_at", 0) > self.ttl:
+            return None
+        return entry
+
+    def _write_disk(self, key, query, fetched_at, result):
+        path = self._path(key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            temp_path = f"{path}.{threading.get_ident()}.tmp"
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump({"query": query, "fetched_at": fetched_at, "result": result}, f)
+            os.replace(temp_path, path)
+        except OSError:
+            pass  # The memory cache still serves this process
+
+    def _remember(self, key, fetched_at, result):
+        with self._lock:
+            self._memory[key] = (fetched_at, result)
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_entries:
+                self._memory.popitem(last=False)
+
+    def get_or_fetch(self, kind, query, max_results, fetch):
+        """
+        Return a cached result for a query, calling fetch() only on a miss
+
+        Args:
+            kind (str): Search type, e.g. "search" or "news"
+            query (str): Search query
+            max_results (int): Number of results requested
+            fetch (callable): Runs the actual search and returns its result string
+
+        Returns:
+            str: Search result
+        """
+        normalized = normalize_query(query)
+        key = hashlib.sha256(json.dumps([kind, normalized, max_results]).encode("utf-8")).hexdigest()
+        with self._lock:
+            cached = self._memory.get(key)
+            if cached and time.time() - cached[0] <= self.ttl:
+                self._memory.move_to_end(key)
+                _record("hits")
+                return cached[1]
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = self._inflight[key] = Future()
+        if not leader:
+            _record("deduped")
+            return future.result()
+
+        try:
+            entry = self._read_disk(key)
+            if entry is not None:
+                _record("hits")
+                fetched_at, result = entry["fetched_at"], entry["result"]
+            else:
+                _record("misses")
+                fetched_at, result = time.time(), fetch()
+                self._write_disk(key, normalized, fetched_at, result)
+            self._remember(key, fetched_at, result)
+            future.set_result(result)
+            return result
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+_search_cache = SearchCache()
+
+def get_search_cache():
+    """Return the search cache shared by the whole process"""
+    return _search_cache
+
+class CachedDuckDuckGoTools(DuckDuckGoTools):
+    """DuckDuckGoTools whose searches go through the shared search cache"""
+
+    def duckduckgo_search(self, query: str, max_results: int = 5) -> str:
+        """Use this function to search DuckDuckGo for a query.
+
+        Args:
+            query(str): The query to search for.
+            max_results (optional, default=5): The maximum number of results to return.
+
+        Returns:
+            The result from DuckDuckGo.
+        """
+        fetch = super().duckduckgo_search
+        return get_search_cache().get_or_fetch(
+            "search", query, max_results, lambda: fetch(query=query, max_results=max_results))
+
+    def duckduckgo_news(self, query: str, max_results: int = 5) -> str:
+        """Use this function to get the latest news from DuckDuckGo.
+
+        Args:
+            query(str): The query to search for.
+            max_results (optional, default=5): The maximum number of results to return.
+
+        Returns:
+            The latest news from DuckDuckGo.
+        """
+        fetch = super().duckduckgo_news
+        return get_search_cache().get_or_fetch(
+            "news", query, max_results, lambda: fetch(query=query, max_results=max_results))
@@ -0,0 +1,47 @@
+# test_parse_subtopics.py
+# Sub-topic extraction from Research Planner roadmaps
+from utils import parse_subtopics
+
+
+def test_subtopics_section_with_details():
+    roadmap = (
+        "# Research Plan\n"
+        "Some overview.\n"
+        "## Subtopics\n"
+        "- **Market size** - revenue and growth\n"
+        "  - Sources: analyst reports\n"
+        "- Key players\n"
+        "## Notes\n"
+        "- Not a sub-topic\n"
+    )
+    assert parse_subtopics(roadmap, 6) == ["Market size - revenue and growth", "Key players"]
+
+
+def test_numbered_heading_and_numbered_items():
+    roadmap = "## 1. Subtopics and Focus Areas\n1. Market\n   detail\n2) Technology\n"
+    assert parse_subtopics(roadmap, 6) == ["Market", "Technology"]
+
+
+def test_indented_list_is_measured_from_its_first_item():
+    roadmap = "## Subtopics\n   - A\n       - detail of A\n   - B\n"
+    assert parse_subtopics(roadmap, 6) == ["A", "B"]
+
+
+def test_bold_line_heading():
+    roadmap = "Plan overview.\n\n**Subtopics:**\n- A\n- B\n\n**Timeline**\n- Week 1\n"
+    assert parse_subtopics(roadmap, 6) == ["A", "B"]
+
+
+def test_labelled_subtopics_fallback():
+    roadmap = "### Subtopic 1: Market\n- detail\n### Subtopic 2: Technology\n- detail\n"
+    assert parse_subtopics(roadmap, 6) == ["Market", "Technology"]
+
+
+def test_limit_and_duplicates():
+    roadmap = "## Subtopics\n- A\n- A\n- B\n- C\n"
+    assert parse_subtopics(roadmap, 2) == ["A", "B"]
+
+
+def test_no_subtopics():
+    assert parse_subtopics("Just prose, no list.", 6) == []
+    assert parse_subtopics(None, 6) == []
@@ -2,6 +2,8 @@
 # Contains utility functions for the app
 
 import base64
+import os
+import re
 import streamlit as st
 
 def get_image_base64(image_path):
@@ -21,3 +23,112 @@ def get_image_base64(image_path):
         st.warning(f"Could not load image: {e}")
         return None
 
+
+# Finished and in-progress research reports
+REPORTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "reports")
+# Newest reports kept on disk; older ones are deleted when a new run starts
+MAX_REPORTS_KEPT = 50
+
+def prune_reports(keep=MAX_REPORTS_KEPT):
+    """
+    Delete all but the newest saved research reports
+    
+    Args:
+        keep (int): Number of reports to keep
+    """
+    try:
+        paths = [os.path.join(REPORTS_DIR, name) for name in os.listdir(REPORTS_DIR) if name.endswith(".md")]
+    except OSError:
+        return
+    paths.sort(key=os.path.getmtime, reverse=True)
+    for path in paths[keep:]:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+def new_report_path(started_at):
+    """
+    Create the reports folder if needed and return a fresh report file path
+    
+    Reports beyond the newest MAX_REPORTS_KEPT are pruned first.
+    
+    Args:
+        started_at (datetime.datetime): Start time of the research run
+        
+    Returns:
+        str: Path of the markdown report file
+    """
+    os.makedirs(REPORTS_DIR, exist_ok=True)
+    prune_reports(MAX_REPORTS_KEPT - 1)
+    return os.path.join(REPORTS_DIR, f"research_{started_at.strftime('%Y%m%d_%H%M%S_%f')}.md")
+
+def tee_stream(response_stream, report_file):
+    """
+    Pass streamed agent output through while appending it to the report file
+    
+    Args:
+        response_stream: Iterator of agent run responses from agent.run(..., stream=True)
+        report_file: Text file open for writing
+        
+    Yields:
+        str: Text content of each chunk, as soon as it is written to disk
+    """
+    for chunk in response_stream:
+        text = getattr(chunk, "content", None)
+        # Tool-call and status events carry no text
+        if not isinstance(text, str) or not text:
+            continue
+        report_file.write(text)
+        report_file.flush()
+        yield text
+
+# "## Subtopics", "## 1. Subtopics and Focus Areas", "**Subtopics:**", ... but not "### Subtopic 1: ..." labels
+_SUBTOPIC_HEADING = re.compile(
+    r"^(?:#{1,6}\s*\**|\*\*)\s*(?:\d+[.)]\s*)?\**\s*(?:sub-?topics\b.*|sub-?topic\s*\**\s*:?\s*)$", re.IGNORECASE)
+_LABELLED_SUBTOPIC = re.compile(r"^\s*(?:#{1,6}\s*|\d+[.)]\s*|[-*+]\s*)?\**\s*sub-?topic\s*\d*\s*[:.\-–]\s*(.+)$",
+                                re.IGNORECASE)
+_LIST_ITEM = re.compile(r"^(\s*)(?:[-*+]|\d+[.)])\s+(.+)$")
+# A markdown heading, or a line that is bold text only, ends the sub-topic section
+_SECTION_END = re.compile(r"^(?:#{1,6}\s|\*\*[^*]+\*\*\s*:?\s*$)")
+
+def _clean_subtopic(text):
+    text = text.replace("**", "").replace("__", "").strip(" :-–")
+    return text[:200]
+
+def parse_subtopics(roadmap, max_subtopics):
+    """
+    Extract the sub-topics from a Research Planner roadmap
+    
+    The list under the last heading starting with "Subtopics" (the
+    "## Subtopics" section the planner is asked to end with, variants such
+    as "## 1. Subtopics and Focus Areas", or a bold "**Subtopics**" line)
+    is preferred; otherwise lines labelled "Subtopic N: ..." are used.
+    
+    Args:
+        roadmap (str): Planner output
+        max_subtopics (int): Maximum number of sub-topics to return
+        
+    Returns:
+        list: Sub-topic titles (with their focus), possibly empty
+    """
+    lines = (roadmap or "").splitlines()
+    subtopics = []
+    section_starts = [i for i, line in enumerate(lines) if _SUBTOPIC_HEADING.match(line.strip())]
+    if section_starts:
+        top_indent = None
+        for line in lines[section_starts[-1] + 1:]:
+            if _SECTION_END.match(line.strip()):
+                break
+            item = _LIST_ITEM.match(line.expandtabs(4))
+            if not item:
+                continue
+            # The first item sets the list's indentation; deeper items are details of the previous sub-topic
+            indent = len(item.group(1))
+            if top_indent is None:
+                top_indent = indent
+            if indent <= top_indent:
+                subtopics.append(_clean_subtopic(item.group(2)))
+    if not subtopics:
+        subtopics = [_clean_subtopic(m.group(1)) for m in map(_LABELLED_SUBTOPIC.match, lines) if m]
+    return list(dict.fromkeys(s for s in subtopics if s))[:max_subtopics]
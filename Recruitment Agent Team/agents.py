@@ -2,51 +2,153 @@
 
 import streamlit as st 
 from agno.agent import Agent
+from agno.exceptions import ModelProviderError
 from agno.models.azure import AzureOpenAI
 from agno.tools.duckduckgo import DuckDuckGoTools
-from utils.text_extraction import extract_text_from_pdf
+from utils.text_extraction import extract_resume_for_prompt
+from utils.hashing import sha256_source
+from utils.result_parsing import parse_json_response, parse_packed_response
+from utils.tokens import estimate_tokens
+from utils.verdict_cache import get_verdict_cache, requirements_hash
+from utils.question_bank import get_question_bank, cluster_skills, pick_questions, QUESTIONS_PER_CLUSTER
+from utils.triage import normalize_term
+from config import PACKED_TOKEN_BUDGET, PACKED_MAX_RESUMES, PACKED_OUTPUT_TOKENS_PER_RESUME, PERSONALIZED_QUESTIONS
+import json
 import os
-import smtplib
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
+import threading
+from utils.email_dispatch import EmailDispatcher, build_candidate_messages
+
+# Model deployment used by every agent here, and the version of the analyzer prompt.
+# Bump ANALYZER_PROMPT_VERSION whenever the instructions, the resume representation
+# or the output format change so that cached verdicts from the old prompt are no
+# longer served.
+ANALYZER_DEPLOYMENT = "gpt-4o-mini"
+ANALYZER_PROMPT_VERSION = "3"
+PACKED_PROMPT_VERSION = f"{ANALYZER_PROMPT_VERSION}-packed"
+FUSED_PROMPT_VERSION = f"{ANALYZER_PROMPT_VERSION}-fused"
+
+# Screening criteria shared by the single and packed analyzer prompts
+ANALYZER_CRITERIA = (
+    "Be lenient with AI/ML candidates who show strong potential.\n"
+    "Consider project experience as valid experience.\n"
+    "Value hands-on experience with key technologies.\n"
+    "Return a JSON response with selection decision as (Rejected or Selected) and feedback.\n"
+    "The feedback must be detailed and proper."
+    "Also return a structured response containing the Name and email id of the each candidate.\n"
+    "Also include a resume_score from 0 to 100 representing how well the resume matches the job requirements.\n"
+    "Also extract structured features from the resume: the years of hands-on experience per skill "
+    "(use 0 when unknown), total years of professional experience, highest education level "
+    "(High School, Diploma, Associate, Bachelor, Master, PhD or None), the number of distinct projects, "
+    "and seniority (Intern, Entry, Junior, Mid, Senior, Lead or Principal).\n"
+)
+
+VERDICT_FORMAT = (
+    "{\n"
+    '  "name": "Candidate Name",\n'
+    '  "email": "candidate@email.com",\n'
+    '  "selection_decision": "Selected" or "Rejected",\n'
+    '  "resume_score": 85,\n'
+    '  "feedback": "Some feedback text",\n'
+    '  "features": {\n'
+    '    "skills": {"Python": 3, "Docker": 1},\n'
+    '    "total_years": 4,\n'
+    '    "education": "Bachelor",\n'
+    '    "project_count": 5,\n'
+    '    "seniority": "Mid"\n'
+    "  }\n"
+    "}\n"
+)
+
+# Verdict format for the fused analyze-and-questions call
+FUSED_VERDICT_FORMAT = VERDICT_FORMAT.replace(
+    '  "feedback": "Some feedback text",\n',
+    '  "feedback": "Some feedback text",\n  "interview_questions": "1. Question 1 ...\\n2. Question 2 ...",\n', 1)
+
+
+# Interview question guidelines shared by the question generator and the fused analyzer prompt
+QUESTION_GUIDELINES = (
+    "Generate 5-10 technical interview questions specific to the candidate's background and the role.\n"
+    "Focus on the required skills mentioned in the job requirements.\n"
+    "Keep the questions practical and relevant.\n"
+    "Do not repeat any questions"
+)
+
+FUSED_QUESTIONS_INSTRUCTIONS = (
+    "If and only if the selection_decision is Selected, also write interview questions for the candidate "
+    "and return them in an \"interview_questions\" field as one string with a numbered list "
+    "(\"1. ...\\n2. ...\"). For Rejected candidates return an empty string.\n"
+    + QUESTION_GUIDELINES + "\n"
+)
+
+
+def _get_cached_verdict(resume_hash, req_hash, include_questions=False):
+    """Return a cached verdict produced by the single, packed or fused prompt"""
+    cache = get_verdict_cache()
+    versions = (ANALYZER_PROMPT_VERSION, PACKED_PROMPT_VERSION, FUSED_PROMPT_VERSION)
+    if include_questions:
+        versions = (FUSED_PROMPT_VERSION, ANALYZER_PROMPT_VERSION, PACKED_PROMPT_VERSION)
+    for prompt_version in versions:
+        verdict = cache.get(resume_hash, req_hash, ANALYZER_DEPLOYMENT, prompt_version)
+        if verdict is None:
+            continue
+        # A plain verdict cannot stand in for a fused one when the questions are missing
+        if (include_questions and str(verdict.get("selection_decision", "")).lower() == "selected"
+                and not verdict.get("interview_questions")):
+            continue
+        return verdict
+    return None
+
+def lookup_cached_verdict(pdf_source, job_requirements: str, include_questions: bool = False):
+    """
+    Look up a cached verdict for a resume without calling the model.
+    
+    Args:
+        pdf_source: Path to the PDF resume file, or its bytes
+        job_requirements: Custom job requirements text provided by HR
+        include_questions: Only accept verdicts that carry interview questions when Selected
+        
+    Returns:
+        dict: Cached verdict, or None on a miss
+    """
+    return _get_cached_verdict(sha256_source(pdf_source), requirements_hash(job_requirements),
+                               include_questions)
 
 # ----------------------------------Resume Analyzer agent--------------------------------------------------
-def resume_analyzer(pdf_file_path: str, job_requirements: str):
+def resume_analyzer(pdf_source, job_requirements: str, use_cache: bool = True,
+                    include_questions: bool = False):
     """
     Analyze a resume against custom job requirements.
     
     Args:
-        pdf_file_path: Path to the PDF resume file
+        pdf_source: Path to the PDF resume file, or its bytes
         job_requirements: Custom job requirements text provided by HR
+        use_cache: Serve and store parsed verdicts in the persistent verdict cache
+        include_questions: Fused mode; Selected verdicts also carry interview_questions,
+            saving the separate test_question_generator call
     """
-    # Step 1: Extract resume text
-    extracted_text = extract_text_from_pdf(pdf_file_path)
+    # Step 0: Return a cached verdict for the same resume bytes and requirements
+    if use_cache:
+        cached_verdict = lookup_cached_verdict(pdf_source, job_requirements, include_questions)
+        if cached_verdict is not None:
+            return json.dumps(cached_verdict)
+
+    # Step 1: Extract resume text, compacted into sections within the token budget
+    extracted_text = extract_resume_for_prompt(pdf_source)
 
     # Step 2: Initialize the agent
     agent = Agent(
         model=AzureOpenAI(
-            azure_deployment="gpt-4o-mini",
+            azure_deployment=ANALYZER_DEPLOYMENT,
             api_version="2024-02-15-preview",
         ),
         show_tool_calls=False,
         description="You are an expert technical recruiter who analyzes multiple resumes.",
         instructions=(
             "Analyze the resume against the provided job requirements.\n"
-            "Be lenient with AI/ML candidates who show strong potential.\n"
-            "Consider project experience as valid experience.\n"
-            "Value hands-on experience with key technologies.\n"
-            "Return a JSON response with selection decision as (Rejected or Selected) and feedback.\n"
-            "The feedback must be detailed and proper."
-            "Also return a structured response containing the Name and email id of the each candidate.\n"
-            "Also include a resume_score from 0 to 100 representing how well the resume matches the job requirements.\n"
+            + ANALYZER_CRITERIA
+            + (FUSED_QUESTIONS_INSTRUCTIONS if include_questions else "") +
             "**Return a JSON response** in the following format:\n"
-            "{\n"
-            '  "name": "Candidate Name",\n'
-            '  "email": "candidate@email.com",\n'
-            '  "selection_decision": "Selected" or "Rejected",\n'
-            '  "resume_score": 85,\n'
-            '  "feedback": "Some feedback text"\n'
-            "}\n"
+            + (FUSED_VERDICT_FORMAT if include_questions else VERDICT_FORMAT)
         ),
         use_json_mode=True
     )
@@ -62,37 +164,160 @@ def resume_analyzer(pdf_file_path: str, job_requirements: str):
 
     # Step 4: Run the agent and return the output
     response = agent.run(prompt)
+
+    # Step 5: Cache the verdict only if it parsed cleanly
+    if use_cache:
+        verdict = parse_json_response(response.content)
+        if verdict:
+            get_verdict_cache().put(sha256_source(pdf_source), requirements_hash(job_requirements),
+                                    ANALYZER_DEPLOYMENT,
+                                    FUSED_PROMPT_VERSION if include_questions else ANALYZER_PROMPT_VERSION,
+                                    verdict)
+
     return response.content
 
 
+# ----------------------------------Packed Resume Analyzer--------------------------------------------------
+def plan_resume_packs(resumes, job_requirements, token_budget=PACKED_TOKEN_BUDGET,
+                      max_resumes=PACKED_MAX_RESUMES):
+    """
+    Group resumes into packs that each fit one analyzer call.
+    
+    The instructions and job requirements are counted once per pack, and each
+    resume also reserves room for its share of the response.
+    
+    Args:
+        resumes: List of (resume_id, pdf_source) tuples
+        job_requirements: Custom job requirements text provided by HR
+        token_budget: Maximum estimated tokens (prompt + response) per call
+        max_resumes: Maximum number of resumes per call
+        
+    Returns:
+        list: Packs, each a list of (resume_id, pdf_source, extracted_text) tuples
+    """
+    overhead = estimate_tokens(ANALYZER_CRITERIA + VERDICT_FORMAT + job_requirements)
+    packs = []
+    current = []
+    current_tokens = overhead
+
+    for resume_id, pdf_source in resumes:
+        extracted_text = extract_resume_for_prompt(pdf_source)
+        cost = estimate_tokens(extracted_text) + PACKED_OUTPUT_TOKENS_PER_RESUME
+        if current and (current_tokens + cost > token_budget or len(current) >= max_resumes):
+            packs.append(current)
+            current = []
+            current_tokens = overhead
+        # A resume larger than the budget still gets a pack of its own
+        current.append((resume_id, pdf_source, extracted_text))
+        current_tokens += cost
+
+    if current:
+        packs.append(current)
+    return packs
+
+
+def packed_resume_analyzer(pack, job_requirements: str, use_cache: bool = True, fallback: bool = True):
+    """
+    Analyze several resumes against the same job requirements in one call.
+    
+    Resumes whose verdicts are missing from a malformed or partial response
+    fall back to individual resume_analyzer calls.
+    
+    Args:
+        pack: List of (resume_id, pdf_source, extracted_text) tuples from plan_resume_packs
+        job_requirements: Custom job requirements text provided by HR
+        use_cache: Serve and store parsed verdicts in the persistent verdict cache
+        fallback: Analyze missed resumes individually; when False they are left
+            out of the result for the caller to analyze (e.g. with retries)
+        
+    Returns:
+        dict: resume_id -> parsed verdict dict (None if even the fallback failed)
+    """
+    verdicts = {}
+
+    if len(pack) > 1:
+        # Short aliases keep the candidate keys cheap and unambiguous for the model
+        aliases = {f"R{i + 1}": item for i, item in enumerate(pack)}
+
+        agent = Agent(
+            model=AzureOpenAI(
+                azure_deployment=ANALYZER_DEPLOYMENT,
+                api_version="2024-02-15-preview",
+            ),
+            show_tool_calls=False,
+            description="You are an expert technical recruiter who analyzes multiple resumes.",
+            instructions=(
+                "Analyze each resume independently against the provided job requirements.\n"
+                + ANALYZER_CRITERIA +
+                "**Return a JSON response** of the form {\"candidates\": [...]} with exactly one entry per resume.\n"
+                "Each entry must include the resume_id given in the resume header and follow this format:\n"
+                + VERDICT_FORMAT.replace("{\n", '{\n  "resume_id": "R1",\n', 1)
+            ),
+            use_json_mode=True
+        )
+
+        resumes_block = "\n".join(
+            f"=== Resume {alias} ===\n{extracted_text}\n"
+            for alias, (_, _, extracted_text) in aliases.items()
+        )
+        prompt = f"""
+    Resumes:
+    {resumes_block}
+
+    Job Requirements:
+    {job_requirements}
+    """
+
+        try:
+            parsed = parse_packed_response(agent.run(prompt).content) or []
+        except Exception:
+            parsed = []
+
+        req_hash = requirements_hash(job_requirements)
+        for verdict in parsed:
+            item = aliases.get(str(verdict.pop("resume_id", "")).strip())
+            if item is None or item[0] in verdicts or "selection_decision" not in verdict:
+                continue
+            resume_id, pdf_source, _ = item
+            verdicts[resume_id] = verdict
+            if use_cache:
+                get_verdict_cache().put(sha256_source(pdf_source), req_hash, ANALYZER_DEPLOYMENT,
+                                        PACKED_PROMPT_VERSION, verdict)
+
+    # Fall back to one call per resume for anything the packed response missed
+    for resume_id, pdf_source, _ in pack:
+        if fallback and resume_id not in verdicts:
+            verdicts[resume_id] = parse_json_response(
+                resume_analyzer(pdf_source, job_requirements, use_cache))
+
+    return verdicts
+
+
 
 # -----------------------------------------Test question Generator--------------------------------------- 
 
-def test_question_generator(pdf_file_path: str, job_requirements: str):
+def test_question_generator(pdf_source, job_requirements: str):
     """
     Generate test questions based on resume and custom job requirements.
     
     Args:
-        pdf_file_path: Path to the PDF resume file
+        pdf_source: Path to the PDF resume file, or its bytes
         job_requirements: Custom job requirements text provided by HR
     """
-    extracted_text = extract_text_from_pdf(pdf_file_path)
+    extracted_text = extract_resume_for_prompt(pdf_source)
 
     # Initialize the agent
     agent = Agent(
         model=AzureOpenAI(
-            azure_deployment="gpt-4o-mini",
+            azure_deployment=ANALYZER_DEPLOYMENT,
             api_version="2024-02-15-preview",
         ),
         show_tool_calls=False,
         description="You are an expert technical interviewer who generates relevant test questions.",
         instructions=(
             "Analyze the candidate's resume and the target role requirements.\n"
-            "Generate 5-10 technical interview questions specific to the candidate's background and the role.\n"
-            "Focus on the required skills mentioned in the job requirements.\n"
-            "Keep the questions practical and relevant.\n"
             "Return the questions only in a proper format.\n"
-            "Do not repeat any questions"
+            + QUESTION_GUIDELINES
         ),
         expected_output=(
             """
@@ -116,91 +341,201 @@ def test_question_generator(pdf_file_path: str, job_requirements: str):
     return response.content
 
 
-def send_email_to_candidate(name: str, email: str, selected: str, questions=None):
-    """Send an email to the candidate with results and questions if selected."""
-    # Email configuration
-    SMTP_SERVER = "smtp.gmail.com"
-    SMTP_PORT = 587
-    EMAIL_SENDER = os.environ.get('sender_email')
-    # Use App Password if 2FA enabled
-    EMAIL_PASSWORD = os.environ.get('sender_passkey')
-
-    if not EMAIL_SENDER or not EMAIL_PASSWORD:
-        st.error(
-            "Email credentials not found in environment variables. Check your .env file.")
-        return False
-
-    subject = "Application Result"
-    if selected.lower() == "selected":
-        body = f"""
-Dear {name},
-
-Congratulations! 🎉
+# -----------------------------------------Question Bank--------------------------------------------------
+# One lock per requirements hash so concurrent sessions generate each bank only once
+_bank_locks = {}
+_bank_locks_guard = threading.Lock()
 
-After reviewing your resume, we are pleased to inform you that you have been selected for the next steps in our hiring process.
 
-You will receive test questions for your evaluation shortly. Please reply to this email to submit your answers.
+def _question_agent(instructions):
+    return Agent(
+        model=AzureOpenAI(
+            azure_deployment=ANALYZER_DEPLOYMENT,
+            api_version="2024-02-15-preview",
+        ),
+        show_tool_calls=False,
+        description="You are an expert technical interviewer who generates relevant test questions.",
+        instructions=instructions,
+        use_json_mode=True
+    )
 
-All the best,
 
-Best regards,  
-Recruitment Team
-"""
-        # If questions are provided, send them in another email
-        if questions:
-            questions_subject = "Technical Assessment Questions"
-            questions_body = f"""
-Dear {name},
+def generate_cluster_questions(job_requirements: str, cluster: str, skills):
+    """
+    Generate reusable interview questions for one skill cluster of a job.
+    
+    Args:
+        job_requirements: Custom job requirements text provided by HR
+        cluster: Skill cluster name
+        skills: Skills in the cluster
+        
+    Returns:
+        list: {"question": str, "keywords": [str, ...]} dicts
+    """
+    agent = _question_agent(
+        f"Write {QUESTIONS_PER_CLUSTER} technical interview questions for the role described in the job "
+        f"requirements, covering these skills: {', '.join(skills)}.\n"
+        "The questions must not depend on any particular candidate; they are reused for every applicant.\n"
+        "Mix fundamentals, practical scenarios and one harder design or debugging question.\n"
+        "For each question list 2-5 lowercase keywords (skills, tools or concepts) it probes.\n"
+        + QUESTION_GUIDELINES + "\n"
+        '**Return a JSON response** of the form {"questions": [{"question": "...", "keywords": ["..."]}]}'
+    )
+    parsed = parse_json_response(agent.run(f"Job Requirements:\n{job_requirements}").content) or {}
+    questions = []
+    for item in parsed.get("questions", []):
+        if not isinstance(item, dict) or not str(item.get("question", "")).strip():
+            continue
+        keywords = item.get("keywords") or []
+        if isinstance(keywords, str):
+            keywords = keywords.split(",")
+        elif not isinstance(keywords, list):
+            keywords = []
+        keywords = [k for k in map(normalize_term, keywords) if k]
+        # The cluster's own skills make questions findable even with sparse keywords
+        keywords += [s.lower() for s in skills if s.lower() in item["question"].lower()]
+        questions.append({"question": item["question"].strip(), "keywords": list(dict.fromkeys(keywords))})
+    return questions
+
+
+def ensure_question_bank(job_requirements: str, skills):
+    """
+    Make sure every skill cluster of the job has banked questions.
+    
+    Only clusters missing from the bank are generated, so the bank for a set
+    of requirements costs one call per cluster, once.
+    
+    Args:
+        job_requirements: Custom job requirements text provided by HR
+        skills: Required skills of the job
+        
+    Returns:
+        list: Banked questions for these requirements
+    """
+    req_hash = requirements_hash(job_requirements)
+    bank = get_question_bank()
+    with _bank_locks_guard:
+        lock = _bank_locks.setdefault(req_hash, threading.Lock())
+    with lock:
+        existing = bank.clusters(req_hash)
+        for cluster, members in cluster_skills(skills).items():
+            if cluster not in existing:
+                questions = generate_cluster_questions(job_requirements, cluster, members)
+                if questions:
+                    bank.add(req_hash, cluster, questions)
+    return bank.questions(req_hash)
+
+
+def personalize_questions(picked, candidate_profile: str, job_requirements: str,
+                          count: int = PERSONALIZED_QUESTIONS):
+    """
+    Generate a few candidate-specific questions to complement the banked ones.
+    
+    Only the candidate's short profile and the picked questions are sent, not
+    the resume, so the call is small.
+    
+    Args:
+        picked: Banked question dicts already chosen for the candidate
+        candidate_profile: Short summary of the candidate (skills, seniority, feedback)
+        job_requirements: Custom job requirements text provided by HR
+        count: Number of questions to add
+        
+    Returns:
+        list: Question strings
+        
+    Raises:
+        ValueError: The response holds no question list
+    """
+    agent = _question_agent(
+        f"Write {count} interview questions tailored to this specific candidate's background and projects.\n"
+        "They must not duplicate the questions already chosen.\n"
+        '**Return a JSON response** of the form {"questions": ["..."]}'
+    )
+    chosen = "\n".join(f"- {q['question']}" for q in picked)
+    prompt = f"""
+    Candidate profile:
+    {candidate_profile}
 
-As part of our selection process, please answer the following technical questions:
+    Questions already chosen:
+    {chosen}
 
-{questions}
+    Job Requirements:
+    {job_requirements}
+    """
+    parsed = parse_json_response(agent.run(prompt).content)
+    questions = parsed.get("questions") if isinstance(parsed, dict) else None
+    if not isinstance(questions, list):
+        raise ValueError("the response did not contain a list of questions")
+    return [str(q).strip() for q in questions if str(q).strip()][:count]
 
-Please reply to this email with your answers.
 
-Best regards,  
-Recruitment Team
-"""
-    elif selected.lower() == "rejected":
-        body = f"""
-Dear {name},
+def bank_question_generator(pdf_source, job_requirements: str, skills, result=None, personalize: bool = True):
+    """
+    Build a candidate's interview questions from the job's shared question bank.
+    
+    Questions are picked locally by keyword match against the resume and then
+    topped up with a small personalized delta. Falls back to
+    test_question_generator when the job has no skills to build a bank from.
+    
+    Args:
+        pdf_source: Path to the PDF resume file, or its bytes
+        job_requirements: Custom job requirements text provided by HR
+        skills: Required skills of the job
+        result: Parsed analyzer verdict for the candidate, if available
+        personalize: Add candidate-specific questions with one small model call
+        
+    Returns:
+        str: Numbered questions
+    """
+    bank_questions = ensure_question_bank(job_requirements, skills) if skills else []
+    if not bank_questions:
+        return test_question_generator(pdf_source, job_requirements)
+
+    result = result or {}
+    features = result.get("features") or {}
+    candidate_skills = features.get("skills") or {}
+    picked = pick_questions(bank_questions, extract_resume_for_prompt(pdf_source), candidate_skills)
+    questions = [q["question"] for q in picked]
+
+    if personalize:
+        profile = (
+            f"Skills: {', '.join(map(str, candidate_skills)) or 'unknown'}\n"
+            f"Seniority: {features.get('seniority', 'unknown')}, "
+            f"projects: {features.get('project_count', 'unknown')}\n"
+            f"Screening feedback: {result.get('feedback', '')}"
+        )
+        try:
+            questions += personalize_questions(picked, profile, job_requirements)
+        except (ModelProviderError, ValueError) as e:
+            # The banked questions are still a complete set without the personalized delta
+            st.warning(f"⚠️ Personalized questions were skipped: {e}")
+
+    return "\n".join(f"{i}. {question}" for i, question in enumerate(questions, start=1))
 
-Thank you for applying to our company.
 
-After a thorough review of your resume, we regret to inform you that you were not selected for the role at this time.
+def send_email_to_candidate(name: str, email: str, selected: str, questions=None):
+    """Send an email to the candidate with results and questions if selected."""
+    # Email configuration
+    EMAIL_SENDER = os.environ.get('sender_email')
+    # Use App Password if 2FA enabled
+    EMAIL_PASSWORD = os.environ.get('sender_passkey')
 
-We encourage you to apply again in the future and wish you the very best in your career.
+    if not EMAIL_SENDER or not EMAIL_PASSWORD:
+        st.error(
+            "Email credentials not found in environment variables. Check your .env file.")
+        return False
 
-Warm regards,  
-Recruitment Team
-"""
+    # Result email, plus the questions email for selected candidates
+    messages = build_candidate_messages(EMAIL_SENDER, name, email, selected, questions)
+    if not messages:
+        st.error(f"Unknown selection decision: {selected}")
+        return False
 
     try:
-        # Compose the email
-        msg = MIMEMultipart()
-        msg['From'] = EMAIL_SENDER
-        msg['To'] = email
-        msg['Subject'] = subject
-        msg.attach(MIMEText(body, 'plain'))
-
-        # Send the email via SMTP
-        with smtplib.SMTP(SMTP_SERVER, SMTP_PORT) as server:
-            server.starttls()
-            server.login(EMAIL_SENDER, EMAIL_PASSWORD)
-            server.send_message(msg)
-
-        # Send questions in a separate email if selected
-        if selected.lower() == "selected" and questions:
-            msg = MIMEMultipart()
-            msg['From'] = EMAIL_SENDER
-            msg['To'] = email
-            msg['Subject'] = questions_subject
-            msg.attach(MIMEText(questions_body, 'plain'))
-
-            with smtplib.SMTP(SMTP_SERVER, SMTP_PORT) as server:
-                server.starttls()
-                server.login(EMAIL_SENDER, EMAIL_PASSWORD)
-                server.send_message(msg)
+        # Both messages share one SMTP session
+        with EmailDispatcher(username=EMAIL_SENDER, password=EMAIL_PASSWORD) as dispatcher:
+            for msg in messages:
+                dispatcher.send(msg)
 
         return True
     except Exception as e:
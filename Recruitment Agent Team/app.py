@@ -2,14 +2,33 @@
 import streamlit as st
 from streamlit_option_menu import option_menu
 import json
-import tempfile
 import matplotlib.pyplot as plt
 import os
-import uuid
 from dotenv import load_dotenv
 import pandas as pd
-from utils.resume_preview import display_pdf
-from agents import resume_analyzer, test_question_generator, send_email_to_candidate
+from utils.resume_preview import display_resume_preview
+from utils.thumbnails import discard_thumbnails
+from utils.result_parsing import parse_json_response
+from utils.ingestion import ingest_pdfs
+from utils.text_extraction import extract_text_from_pdf, extract_compact_resume
+from utils.triage import score_resumes, triage_profile_key
+from utils.dedup import discard_duplicate_index, link_near_duplicates
+from utils.requirements_diff import diff_profiles, describe_diff, decision_score, select_affected
+from utils.role_matrix import build_role_matrix, DEFAULT_TOP_K
+from utils.ranking import CandidateFeatureStore, DEFAULT_WEIGHTS, EXPERIENCE_LEVEL_TARGETS
+from utils.candidate_store import get_candidate_store, job_id_from_title, match_level, MATCH_LEVELS
+from utils.blob_store import get_resume_blob_store
+from utils.verdict_cache import get_verdict_cache, requirements_hash
+from utils.batch_processing import (analyze_resumes_concurrently, analyze_resumes_packed,
+                                    process_resumes_in_background, screen_roles_in_background,
+                                    DEFAULT_MAX_WORKERS, DEFAULT_MAX_RETRIES)
+from utils.jobs import get_job_registry, DEFAULT_POOL_WORKERS, PAUSED, FINISHED_STATES
+from utils.pipeline import get_screening_pipeline, STAGES
+from utils.bulk_import import start_bulk_import
+from utils.exports import available_formats, build_export, export_path, EXPORT_FORMATS
+from config import PACKED_TOKEN_BUDGET, DEFAULT_JOB_ID, BULK_IMPORT_ROOT
+from utils.email_dispatch import EmailDispatcher, build_candidate_messages, notify_candidates_in_background
+from agents import resume_analyzer, bank_question_generator, send_email_to_candidate
 
 # Load environment variables
 load_dotenv()
@@ -20,9 +39,9 @@ st.set_page_config(page_title="Resume Analyzer", layout="wide")
 # Initialize session state variables
 if 'job_skills' not in st.session_state:
     st.session_state.job_skills = []
-if 'resumes' not in st.session_state:
-    # Dictionary to store resume info: {id: {path, name, analyzed, result}}
-    st.session_state.resumes = {}
+if 'current_job_id' not in st.session_state:
+    # Resumes and results live in the shared candidate store, grouped by job
+    st.session_state.current_job_id = DEFAULT_JOB_ID
 if 'job_requirements' not in st.session_state:
     st.session_state.job_requirements = ""
 if 'selected_resume_id' not in st.session_state:
@@ -31,6 +50,46 @@ if 'active_tab' not in st.session_state:
     st.session_state.active_tab = "Upload"
 if 'show_all_analyzed' not in st.session_state:
     st.session_state.show_all_analyzed = False
+if 'analysis_workers' not in st.session_state:
+    st.session_state.analysis_workers = DEFAULT_MAX_WORKERS
+if 'analysis_retries' not in st.session_state:
+    st.session_state.analysis_retries = DEFAULT_MAX_RETRIES
+if 'use_verdict_cache' not in st.session_state:
+    st.session_state.use_verdict_cache = True
+if 'job_profile' not in st.session_state:
+    # Structured job definition used for local triage: {skills, description}
+    st.session_state.job_profile = None
+if 'triage_threshold' not in st.session_state:
+    st.session_state.triage_threshold = 0
+if 'rank_weights' not in st.session_state:
+    st.session_state.rank_weights = dict(DEFAULT_WEIGHTS)
+if 'results_page' not in st.session_state:
+    st.session_state.results_page = 1
+if 'packed_mode' not in st.session_state:
+    st.session_state.packed_mode = False
+if 'packed_token_budget' not in st.session_state:
+    st.session_state.packed_token_budget = PACKED_TOKEN_BUDGET
+if 'fused_questions' not in st.session_state:
+    st.session_state.fused_questions = False
+if 'stream_screening' not in st.session_state:
+    st.session_state.stream_screening = False
+
+# Number of candidates rendered per page
+PAGE_SIZE = 25
+
+MATCH_LABELS = {
+    "strong": ("Strong Match", "green"),
+    "moderate": ("Moderate Match", "orange"),
+    "poor": ("Poor Match", "red"),
+}
+MATCH_ICONS = {"strong": "🟢", "moderate": "🟠", "poor": "🔴"}
+# Results view sort options: label -> (column or "rank", descending)
+RESULT_SORTS = {
+    "Rank score": ("rank", True),
+    "AI score": ("score", True),
+    "Candidate name": ("candidate_name", False),
+    "Newest first": ("created_at", True),
+}
 
 # Common skills for different tech roles
 COMMON_SKILLS = [
@@ -45,106 +104,580 @@ COMMON_SKILLS = [
 
 
 def save_uploaded_file(uploaded_file):
-    """Save uploaded file to temp directory and return file path"""
-    # Generate a unique ID for this resume
-    resume_id = str(uuid.uuid4())
-
-    # Save uploaded file temporarily
-    with tempfile.NamedTemporaryFile(delete=False, suffix='.pdf') as tmp_file:
-        tmp_file.write(uploaded_file.getvalue())
-        file_path = tmp_file.name
-
-    # Store resume info in session state
-    st.session_state.resumes[resume_id] = {
-        "path": file_path,
-        "name": uploaded_file.name,
-        "analyzed": False,
-        "result": None
-    }
+    """Keep the uploaded bytes in the shared blob store and return the new resume ID,
+    or None if the same PDF was already uploaded for this job"""
+    blobs = get_resume_blob_store()
+    # getbuffer() exposes the upload's buffer without copying it
+    content_hash = blobs.put(uploaded_file.getbuffer())
+
+    # Exact duplicates (under any file name) are found through the content hash index
+    store = get_candidate_store()
+    if store.find_by_hash(st.session_state.current_job_id, content_hash) is not None:
+        return None
+
+    # Register the resume in the candidate store
+    return store.add_candidate(
+        st.session_state.current_job_id, uploaded_file.name, blobs.disk_path(content_hash) or "", content_hash)
 
-    return resume_id
+
+def load_resume_bytes(resume_info):
+    """Get a resume's PDF bytes as a shared memoryview, or None if they are gone"""
+    return get_resume_blob_store().get(resume_info["content_hash"], resume_info["path"])
 
 
 def delete_resume(resume_id):
-    """Delete a resume from the list and remove the temp file"""
-    if resume_id in st.session_state.resumes:
-        # Delete the temporary file
-        file_path = st.session_state.resumes[resume_id]["path"]
-        if os.path.exists(file_path):
+    """Delete a resume from the store and release its PDF bytes"""
+    store = get_candidate_store()
+    deleted = store.delete_candidate(resume_id)
+    if deleted:
+        file_path, content_hash = deleted
+        # Deleting can promote a near-duplicate to group representative; reload the job's index
+        discard_duplicate_index(st.session_state.current_job_id)
+        blobs = get_resume_blob_store()
+        if content_hash and not store.hash_in_use(content_hash):
+            blobs.discard(content_hash)
+            discard_thumbnails(content_hash)
+        # Resumes saved as temp files by older versions live outside the blob store
+        if file_path and os.path.exists(file_path) and file_path != blobs.disk_path(content_hash):
             try:
                 os.unlink(file_path)
             except:
                 pass
 
-        # Remove from session state
-        del st.session_state.resumes[resume_id]
+    # Reset selected resume if it was the deleted one
+    if st.session_state.selected_resume_id == resume_id:
+        st.session_state.selected_resume_id = None
 
-        # Reset selected resume if it was the deleted one
-        if st.session_state.selected_resume_id == resume_id:
-            st.session_state.selected_resume_id = None
+
+def switch_job(job_id):
+    """Make a job current and load its saved requirements"""
+    st.session_state.current_job_id = job_id
+    st.session_state.selected_resume_id = None
+    st.session_state.results_page = 1
+    job = get_candidate_store().get_job(job_id)
+    st.session_state.job_requirements = job["requirements"] if job else ""
+    st.session_state.job_profile = job["profile"] if job else None
 
 
 def analyze_resume(resume_id):
     """Analyze a single resume"""
-    resume_info = st.session_state.resumes[resume_id]
+    resume_info = get_candidate_store().get_candidate(resume_id)
+    pdf_bytes = load_resume_bytes(resume_info)
+    if pdf_bytes is None:
+        return False
 
     # Analyze the resume
     result = resume_analyzer(
-        resume_info["path"], st.session_state.job_requirements)
+        pdf_bytes, st.session_state.job_requirements,
+        use_cache=st.session_state.use_verdict_cache,
+        include_questions=st.session_state.fused_questions)
 
     # Parse the result
-    try:
-        # Try to parse the result directly
-        result_dict = json.loads(result)
-    except:
-        # If direct parsing fails, try to extract JSON from text
-        import re
-        json_match = re.search(r'({.*})', result, re.DOTALL)
-        if json_match:
-            result_dict = json.loads(json_match.group(1))
-        else:
-            return False
+    result_dict = parse_json_response(result)
+    if not result_dict:
+        return False
 
-    # Update resume info in session state
-    resume_info["analyzed"] = True
-    resume_info["result"] = result_dict
+    # Persist the verdict
+    get_candidate_store().save_result(
+        resume_id, result_dict, requirements_hash(st.session_state.job_requirements))
 
     return True
 
 
+def analyze_all_resumes(resume_ids):
+    """
+    Analyze several resumes concurrently, updating progress as each one finishes
+
+    Resumes that could not be analyzed are listed in
+    st.session_state.analysis_failures as (file name, error) pairs, which
+    survive the st.rerun() that usually follows; see show_analysis_report().
+    """
+    st.session_state.analysis_failures = []
+    total = len(resume_ids)
+    if total == 0:
+        return 0
+
+    store = get_candidate_store()
+    req_hash = requirements_hash(st.session_state.job_requirements)
+    progress_bar = st.progress(0)
+    status = st.empty()
+    rows = store.get_summaries(resume_ids)
+    names = {row["id"]: row["name"] for row in rows}
+    completed = 0
+    succeeded = 0
+    resumes = []
+    for row in rows:
+        pdf_bytes = load_resume_bytes(row)
+        if pdf_bytes is None:
+            completed += 1
+            st.session_state.analysis_failures.append(
+                (row["name"], "The file is no longer available; please upload it again."))
+        else:
+            resumes.append((row["id"], pdf_bytes))
+
+    if st.session_state.packed_mode:
+        results = analyze_resumes_packed(
+            resumes,
+            st.session_state.job_requirements,
+            max_workers=st.session_state.analysis_workers,
+            token_budget=st.session_state.packed_token_budget,
+            use_cache=st.session_state.use_verdict_cache,
+            max_retries=st.session_state.analysis_retries)
+    else:
+        results = analyze_resumes_concurrently(
+            resumes,
+            st.session_state.job_requirements,
+            max_workers=st.session_state.analysis_workers,
+            max_retries=st.session_state.analysis_retries,
+            use_cache=st.session_state.use_verdict_cache,
+            include_questions=st.session_state.fused_questions)
+
+    for resume_id, result_dict, error in results:
+        completed += 1
+        if result_dict:
+            store.save_result(resume_id, result_dict, req_hash)
+            succeeded += 1
+        elif error is not None:
+            st.session_state.analysis_failures.append((names.get(resume_id, resume_id), error))
+
+        progress_bar.progress(completed / total)
+        status.text(f"Analyzed {completed}/{total} resumes")
+
+    return succeeded
+
+
+def show_analysis_report():
+    """Show the outcome of the last "Analyze All" run once, after the rerun that followed it"""
+    report = st.session_state.pop("analysis_report", None)
+    if report is None:
+        return
+    st.success(f"✅ Successfully analyzed {report['succeeded']} resumes!")
+    if report["failures"]:
+        st.warning(f"⚠️ {len(report['failures'])} resume(s) could not be analyzed:")
+        for name, error in report["failures"]:
+            st.text(f"{name}: {str(error).splitlines()[0]}")
+
+
+def update_triage_scores():
+    """Score resumes locally against the saved job profile, only where the profile changed"""
+    profile = st.session_state.job_profile
+    if not profile:
+        return
+
+    store = get_candidate_store()
+    profile_key = triage_profile_key(profile["skills"], profile["description"])
+    stale = store.list_triage_stale(st.session_state.current_job_id, profile_key)
+    if not stale:
+        return
+
+    blobs = get_resume_blob_store()
+    texts = [extract_text_from_pdf(blobs.get(content_hash, path)) for _, content_hash, path in stale]
+    scores = score_resumes(texts, profile["skills"], profile["description"])
+    store.set_triage_scores(
+        ((rid, round(float(score), 1)) for (rid, _, _), score in zip(stale, scores)), profile_key)
+
+
+def is_below_triage_threshold(info):
+    """Check whether a resume is screened out locally and should skip the LLM"""
+    threshold = st.session_state.triage_threshold
+    return threshold > 0 and info.get("triage_score") is not None and info["triage_score"] < threshold
+
+
+def get_resumes_to_analyze():
+    """Get unanalyzed resumes that pass triage, best triage score first"""
+    threshold = st.session_state.triage_threshold
+    pending = get_candidate_store().list_candidates(
+        st.session_state.current_job_id, order_by="triage_score", descending=True,
+        analyzed=False, below_triage=threshold if threshold > 0 else None, duplicates=False)
+    return [row["id"] for row in pending]
+
+
+def get_feature_store():
+    """Get the columnar feature store for analyzed resumes, rebuilding it only after results change"""
+    store = get_candidate_store()
+    version = (st.session_state.current_job_id, store.data_version())
+    if st.session_state.get("feature_store_version") != version:
+        st.session_state.feature_store = CandidateFeatureStore.from_results(
+            store.iter_features(st.session_state.current_job_id))
+        st.session_state.feature_store_version = version
+    return st.session_state.feature_store
+
+
+def get_rank_scores():
+    """Re-rank analyzed resumes locally with the HR weights; returns {resume_id: rank score}"""
+    profile = st.session_state.job_profile or {}
+    resume_ids, scores = get_feature_store().rank(
+        st.session_state.rank_weights,
+        required_skills=profile.get("skills", []),
+        seniority_target=EXPERIENCE_LEVEL_TARGETS.get(profile.get("experience_level")))
+    return {rid: round(float(score), 1) for rid, score in zip(resume_ids, scores)}
+
+
+def get_role_matrix(role_profiles):
+    """Get the candidates x roles match matrix, rebuilding it only when the pool or the roles change"""
+    job_id = st.session_state.current_job_id
+    pool = tuple(get_candidate_store().list_candidate_ids(job_id, duplicates=False))
+    version = (job_id, hash(pool), json.dumps(role_profiles, sort_keys=True))
+    if st.session_state.get("role_matrix_version") != version:
+        with st.spinner(f"Scoring {len(pool)} resume(s) against {len(role_profiles)} role(s)..."):
+            st.session_state.role_matrix = build_role_matrix(job_id, role_profiles)
+        st.session_state.role_matrix_version = version
+    return st.session_state.role_matrix
+
+
 def get_highest_scoring_resumes(limit=5):
     """Get the highest scoring resumes"""
-    if not st.session_state.resumes:
-        return []
+    # Sort by locally re-ranked score (descending)
+    rank_scores = get_rank_scores()
+    ranked_ids = sorted(rank_scores, key=rank_scores.get, reverse=True)[:limit]
 
-    analyzed_resumes = {
-        rid: info for rid, info in st.session_state.resumes.items()
-        if info["analyzed"] and info["result"]
+    return [(row["id"], row) for row in get_candidate_store().get_summaries(ranked_ids)]
+
+
+def notify_pending_candidates():
+    """Email every analyzed, not yet notified candidate of the current job in a background job"""
+    sender = os.environ.get('sender_email')
+    password = os.environ.get('sender_passkey')
+    if not sender or not password:
+        st.error("Email credentials not found in environment variables. Check your .env file.")
+        return
+
+    store = get_candidate_store()
+    pending = store.list_candidates(
+        st.session_state.current_job_id, analyzed=True, email_sent=False, duplicates=False)
+    batches = []
+    for row in pending:
+        if not row["email"]:
+            continue
+        # Questions are only loaded for selected candidates
+        questions = None
+        if (row["decision"] or "").lower() == "selected":
+            questions = store.get_candidate(row["id"])["questions_text"]
+        messages = build_candidate_messages(
+            sender, row["candidate_name"] or "Candidate", row["email"], row["decision"] or "", questions)
+        if messages:
+            batches.append((row["id"], messages))
+
+    if not batches:
+        st.info("No candidates are waiting for an email.")
+        return
+
+    # Sending is paced by the rate limit, so it runs off the script thread like the analyses
+    if notify_candidates_in_background(batches, EmailDispatcher(username=sender, password=password)) is None:
+        st.info("These candidates are already being emailed.")
+        return
+    st.success(f"📧 Emailing {len(batches)} candidate(s) in the background. Progress is shown in the sidebar; "
+               "candidates that fail can be emailed again and only get the emails they missed.")
+
+
+def generate_candidate_questions(resume_info):
+    """Pick a candidate's questions from the job's shared bank, plus a small personalized delta"""
+    profile = st.session_state.job_profile or {}
+    return bank_question_generator(
+        load_resume_bytes(resume_info), st.session_state.job_requirements,
+        profile.get("skills", []), resume_info["result"])
+
+
+def generate_missing_questions():
+    """Give every selected candidate without questions a set from the shared question bank"""
+    store = get_candidate_store()
+    candidate_ids = store.list_missing_questions(st.session_state.current_job_id)
+    progress_bar = st.progress(0)
+    for done, candidate_id in enumerate(candidate_ids, start=1):
+        try:
+            store.set_questions(candidate_id, generate_candidate_questions(store.get_candidate(candidate_id)))
+        except Exception as e:
+            st.warning(f"⚠️ Could not generate questions for a candidate: {e}")
+        progress_bar.progress(done / len(candidate_ids))
+    return len(candidate_ids)
+
+
+def screening_context():
+    """Snapshot of the current job and analysis settings for the streaming pipeline"""
+    profile = st.session_state.job_profile or {"skills": [], "description": ""}
+    return {
+        "job_id": st.session_state.current_job_id,
+        "job_requirements": st.session_state.job_requirements,
+        "skills": profile["skills"],
+        "description": profile["description"],
+        "triage_key": triage_profile_key(profile["skills"], profile["description"]),
+        "triage_threshold": st.session_state.triage_threshold,
+        "max_retries": st.session_state.analysis_retries,
+        "use_cache": st.session_state.use_verdict_cache,
+        "include_questions": st.session_state.fused_questions,
+        "analyze": True,
     }
 
-    # Sort by score (descending)
-    sorted_resumes = sorted(
-        analyzed_resumes.items(),
-        key=lambda x: x[1]["result"].get("resume_score", 0),
-        reverse=True
-    )
 
-    return sorted_resumes[:limit]
+@st.fragment(run_every=2)
+def render_pipeline_status():
+    """Sidebar panel with per-stage queue depth of the streaming screening pipeline"""
+    status = get_screening_pipeline().status()
+    stages = status["stages"]
+    if not any(stages["save"][key] for key in ("queued", "busy", "processed", "failed")):
+        return
+
+    st.markdown("### Screening Pipeline")
+    cols = st.columns(len(STAGES))
+    for col, stage in zip(cols, STAGES):
+        counters = stages[stage]
+        col.metric(stage.capitalize(), counters["queued"] + counters["busy"],
+                   help=f"{counters['queued']} queued, {counters['busy']} in progress")
+        col.caption(f"✓ {counters['processed']}" + (f" · ✗ {counters['failed']}" if counters["failed"] else ""))
+    if status["first_verdict_seconds"] is not None:
+        st.caption(f"First verdict of the latest batch after {status['first_verdict_seconds']:.1f}s · "
+                   f"{stages['triage']['dropped']} below triage · {stages['extract']['dropped']} duplicates")
+    if status["errors"]:
+        with st.expander(f"Pipeline errors ({len(status['errors'])})"):
+            for stage, name, error in status["errors"]:
+                st.text(f"[{stage}] {name}: {error}")
+
+
+def start_background_analysis(resume_ids, reanalyze=False):
+    """Queue resumes for analysis on the background job pool"""
+    return process_resumes_in_background(
+        resume_ids,
+        st.session_state.job_requirements,
+        max_workers=st.session_state.analysis_workers,
+        max_retries=st.session_state.analysis_retries,
+        use_cache=st.session_state.use_verdict_cache,
+        include_questions=st.session_state.fused_questions,
+        reanalyze=reanalyze)
+
+
+def get_requirement_versions():
+    """Return (current requirements hash, {requirements hash: version dict}) for the current job"""
+    versions = get_candidate_store().job_versions(st.session_state.current_job_id)
+    return (requirements_hash(st.session_state.job_requirements),
+            {version["requirements_hash"]: version for version in versions})
+
+
+def verdict_status(row, current_hash, versions):
+    """Staleness marker of a verdict relative to the current job requirements"""
+    if row["requirements_hash"] == current_hash:
+        return "✅ Current"
+    version = versions.get(row["requirements_hash"])
+    label = f"v{version['version']}" if version else "older requirements"
+    if row["reviewed_hash"] == current_hash:
+        return f"↪️ Kept from {label}"
+    return f"⚠️ Stale ({label})"
+
+
+def find_affected_verdicts():
+    """
+    Split the job's stale verdicts into those a requirements change could flip and the rest
+
+    Stale verdicts are grouped by the requirements version they were scored
+    against and diffed against the current profile. Verdicts scored against
+    requirements that were never recorded are always treated as affected.
+    The result is cached until the stale set or the requirements change.
+
+    Returns:
+        tuple: ({candidate_id: reasons} of affected verdicts, set of all stale IDs,
+            {version number: diff summary})
+    """
+    store = get_candidate_store()
+    job_id = st.session_state.current_job_id
+    current_hash, versions = get_requirement_versions()
+    stale = store.stale_verdicts(job_id, current_hash)
+    cache_key = (job_id, current_hash, hash(frozenset(stale.items())))
+    if st.session_state.get("affected_verdicts_key") == cache_key:
+        return st.session_state.affected_verdicts
+
+    rows = {row["id"]: row for row in store.list_candidates(job_id, analyzed=True, duplicates=False)}
+    boundary = decision_score([row["score"] or 0 for row in rows.values()],
+                              [row["decision"] for row in rows.values()])
+    features = {candidate_id: result["features"] for candidate_id, result in store.iter_features(job_id)}
+
+    affected, summaries, groups = {}, {}, {}
+    for candidate_id, req_hash in stale.items():
+        groups.setdefault(req_hash, []).append(candidate_id)
+    for req_hash, candidate_ids in groups.items():
+        version = versions.get(req_hash)
+        if version is None:
+            affected.update({cid: ["scored against unrecorded requirements"] for cid in candidate_ids})
+            continue
+        diff = diff_profiles(version["profile"], st.session_state.job_profile)
+        summaries[version["version"]] = describe_diff(diff)
+        texts = []
+        for candidate_id in candidate_ids:
+            pdf_bytes = load_resume_bytes(rows[candidate_id]) if candidate_id in rows else None
+            texts.append(extract_text_from_pdf(pdf_bytes) if pdf_bytes is not None else None)
+        candidates = [{"id": cid, "score": rows[cid]["score"] if cid in rows else None,
+                       "skills": list((features.get(cid) or {}).get("skills") or {})} for cid in candidate_ids]
+        affected.update(select_affected(candidates, texts, diff, boundary))
+
+    st.session_state.affected_verdicts = (affected, set(stale), summaries)
+    st.session_state.affected_verdicts_key = cache_key
+    return st.session_state.affected_verdicts
+
+
+def render_rescreen_panel():
+    """Offer to re-score only the stale verdicts a requirements change could flip"""
+    affected, stale, summaries = find_affected_verdicts()
+    if not stale:
+        return
+    store = get_candidate_store()
+    current_hash, versions = get_requirement_versions()
+    current = versions.get(current_hash)
+    with st.container(border=True):
+        st.warning(f"⚠️ {len(stale)} verdict(s) were scored against earlier job requirements"
+                   + (f" (now v{current['version']})." if current else "."))
+        for number, summary in sorted(summaries.items()):
+            st.caption(f"Changes since v{number}: {summary}")
+        st.caption(f"{len(affected)} could change outcome (near the decision line or touching changed terms); "
+                   f"{len(stale) - len(affected)} are unaffected.")
+        cols = st.columns(3)
+        if cols[0].button(f"🔄 Re-score {len(affected)} Affected", key="rescore_affected",
+                          disabled=not affected, use_container_width=True):
+            store.mark_reviewed(stale - set(affected), current_hash)
+            start_background_analysis(list(affected), reanalyze=True)
+            st.info("Re-scoring queued. Track progress under Background Jobs in the sidebar.")
+        if cols[1].button(f"Re-score All {len(stale)}", key="rescore_all_stale", use_container_width=True):
+            start_background_analysis(list(stale), reanalyze=True)
+            st.info("Re-scoring queued. Track progress under Background Jobs in the sidebar.")
+        if cols[2].button("Keep All Verdicts", key="keep_stale_verdicts", use_container_width=True):
+            store.mark_reviewed(stale, current_hash)
+            st.rerun()
+
+
+@st.fragment(run_every=2)
+def render_background_jobs():
+    """Sidebar panel polling background job progress, with pause/resume/cancel controls"""
+    registry = get_job_registry()
+    snapshots = registry.snapshots()
+    if not snapshots:
+        return
+
+    st.markdown("### Background Jobs")
+    for job in snapshots:
+        with st.container(border=True):
+            st.write(f"**{job['name']}** · {job['status']}")
+            st.progress(job["progress"])
+            st.caption(
+                f"{job['completed']} done · {job['failed']} failed · {job['skipped']} skipped | "
+                f"queued {job['queue_seconds']:.1f}s · ran {job['run_seconds']:.1f}s · "
+                f"{job['avg_item_seconds']:.1f}s/item")
+            if job["detail"]:
+                st.caption(job["detail"])
+            if job["status"] not in FINISHED_STATES:
+                cols = st.columns(2)
+                if job["status"] == PAUSED:
+                    if cols[0].button("▶️ Resume", key=f"resume_{job['id']}"):
+                        registry.resume(job["id"])
+                elif cols[0].button("⏸️ Pause", key=f"pause_{job['id']}"):
+                    registry.pause(job["id"])
+                if cols[1].button("⏹️ Cancel", key=f"cancel_{job['id']}"):
+                    registry.cancel(job["id"])
+            elif job["errors"]:
+                with st.expander(f"Errors ({job['failed']})"):
+                    for item, error in job["errors"]:
+                        st.text(f"{item}: {error.splitlines()[0]}")
+    if any(job["status"] in FINISHED_STATES for job in snapshots):
+        if st.button("Clear finished jobs", key="clear_finished_jobs"):
+            registry.clear_finished()
+
+
+@st.fragment(run_every=1)
+def wait_for_export(export):
+    """Poll a background export and rerun the page once its file is ready"""
+    job = get_job_registry().get(export["job"])
+    status = job.snapshot()["status"] if job else None
+    if os.path.exists(export["path"]):
+        st.rerun()
+    elif status is None or status in FINISHED_STATES:
+        st.session_state.export_job = None
+        st.error("The export failed; see Background Jobs in the sidebar.")
+    else:
+        st.info("⏳ Preparing the export...")
+
+
+def render_export_download(path, export_format, outdated=False):
+    """
+    Offer a finished export file
+
+    st.download_button loads its data into memory on every run it is drawn
+    in, so the file is only attached after an explicit click and dropped
+    again on the next rerun.
+    """
+    label = f"📄 Download Results as {export_format.upper()}"
+    if outdated:
+        st.caption("Results changed while this export was prepared; prepare it again to include them.")
+    if st.session_state.get("export_download") == path:
+        st.session_state.export_download = None
+        with open(path, "rb") as export_file:
+            st.download_button(
+                label=f"💾 Save {export_format.upper()} File",
+                data=export_file,
+                file_name=f"resume_results.{export_format}",
+                mime=EXPORT_FORMATS[export_format],
+                use_container_width=True
+            )
+    elif st.button(label, key="request_export_download", use_container_width=True):
+        st.session_state.export_download = path
+        st.rerun()
+
+
+def resume_token_counts(resume_info):
+    """
+    Get a resume's prompt token counts before and after compaction
+
+    Compacting means extracting and segmenting the resume, so the counts are
+    computed once per candidate and kept in the store.
+
+    Returns:
+        dict: tokens_before and tokens_after, or None if no text could be extracted
+    """
+    if resume_info["tokens_full"] is None:
+        compact = extract_compact_resume(load_resume_bytes(resume_info))
+        # Zero marks a resume without text, so it is not extracted again either
+        counts = (compact["tokens_before"], compact["tokens_after"]) if compact else (0, 0)
+        get_candidate_store().set_token_counts(resume_info["id"], *counts)
+        return compact
+    if not resume_info["tokens_full"]:
+        return None
+    return {"tokens_before": resume_info["tokens_full"], "tokens_after": resume_info["tokens_compact"]}
+
+
+def token_savings_caption(compact):
+    """Describe how much compaction shrinks a resume's prompt"""
+    before, after = compact["tokens_before"], compact["tokens_after"]
+    saved = (1 - after / before) * 100 if before else 0.0
+    return f"Prompt tokens: {before:,} → {after:,} ({saved:.0f}% smaller)"
 
 
 def get_match_status(score, selection_decision):
     """Get match status based on score and selection decision"""
-    if selection_decision.lower() == "selected":
-        return "Strong Match", "green"
-    else:
-        # For rejected candidates, show more detailed remarks
-        if score >= 70:
-            return "Moderate Match", "orange"  # Even high scoring can be rejected for specific reasons
-        elif score >= 50:
-            return "Moderate Match", "orange"
-        else:
-            return "Poor Match", "red"
-
+    # Shares its rule with the store's match filter so filtered and displayed matches agree
+    return MATCH_LABELS[match_level(score, selection_decision)]
+
+
+def load_results_page(rank_scores, sort_label, filters, page):
+    """
+    Load one page of analyzed candidates, sorted and filtered in the candidate store
+
+    Args:
+        rank_scores: {resume_id: rank score} from get_rank_scores()
+        sort_label: Key of RESULT_SORTS
+        filters: Candidate store filters (decision, match, min_score)
+        page: 1-based page number
+
+    Returns:
+        tuple: (summary rows of the page, number of matching candidates)
+    """
+    store = get_candidate_store()
+    job_id = st.session_state.current_job_id
+    order_by, descending = RESULT_SORTS[sort_label]
+    offset = (page - 1) * PAGE_SIZE
+    if order_by == "rank":
+        # Rank scores are computed locally, so only the matching IDs come from SQL
+        ids = store.list_candidate_ids(job_id, analyzed=True, duplicates=False, **filters)
+        ids.sort(key=lambda rid: rank_scores.get(rid, 0), reverse=True)
+        return store.get_summaries(ids[offset:offset + PAGE_SIZE]), len(ids)
+    rows = store.list_candidates(job_id, order_by=order_by, descending=descending,
+                                 limit=PAGE_SIZE, offset=offset,
+                                 analyzed=True, duplicates=False, **filters)
+    return rows, store.count_candidates(job_id, analyzed=True, duplicates=False, **filters)
 
 
 # Streamlit UI
@@ -156,8 +689,8 @@ def main():
         # Navigation using option menu - reduced to just 2 options
         selected = option_menu(
             menu_title="Navigation",  # Menu title
-            options=["Home", "Resume Analysis"],  # Menu options - reduced to 2
-            icons=["house-door-fill", "clipboard-check"],  # Optional icons
+            options=["Home", "Resume Analysis", "Multi-Role"],
+            icons=["house-door-fill", "clipboard-check", "diagram-3-fill"],  # Optional icons
             menu_icon="cast",  # Menu icon
             default_index=0,  # Default selected index
         )
@@ -167,12 +700,66 @@ def main():
             st.session_state.active_tab = "Upload"
         elif selected == "Resume Analysis":
             st.session_state.active_tab = "Results"
+        elif selected == "Multi-Role":
+            st.session_state.active_tab = "Roles"
+
+        # Job selector; candidates and requirements are shared across sessions per job
+        jobs = get_candidate_store().list_jobs()
+        if st.session_state.current_job_id not in jobs:
+            jobs.append(st.session_state.current_job_id)
+        chosen_job = st.selectbox("Job", sorted(jobs), index=sorted(jobs).index(st.session_state.current_job_id))
+        if chosen_job != st.session_state.current_job_id:
+            switch_job(chosen_job)
+            st.rerun()
+
+        # Batch analysis settings
+        with st.expander("⚙️ Analysis Settings"):
+            st.session_state.analysis_workers = st.slider(
+                "Parallel analyses", min_value=1, max_value=DEFAULT_POOL_WORKERS,
+                value=st.session_state.analysis_workers,
+                help="Maximum number of resumes analyzed at the same time")
+            st.session_state.analysis_retries = st.number_input(
+                "Retries per resume", min_value=0, max_value=5,
+                value=st.session_state.analysis_retries,
+                help="Extra attempts for a resume whose analysis fails")
+            st.session_state.use_verdict_cache = st.checkbox(
+                "Reuse cached verdicts", value=st.session_state.use_verdict_cache,
+                help="Skip the LLM for resumes already scored against the same job requirements")
+            st.session_state.triage_threshold = st.slider(
+                "Skip LLM below triage score", min_value=0, max_value=100,
+                value=st.session_state.triage_threshold,
+                help="Resumes scoring below this on the local skill match are not sent to the LLM (0 = off)")
+            st.session_state.packed_mode = st.checkbox(
+                "Pack several resumes per request", value=st.session_state.packed_mode,
+                help="Send instructions and job requirements once for a group of resumes")
+            if st.session_state.packed_mode:
+                st.session_state.packed_token_budget = st.number_input(
+                    "Token budget per request", min_value=4000, max_value=120000, step=2000,
+                    value=st.session_state.packed_token_budget)
+            st.session_state.fused_questions = st.checkbox(
+                "Generate interview questions during analysis", value=st.session_state.fused_questions,
+                help="Selected candidates get their questions from the analysis call itself instead of a second request")
+            if st.session_state.fused_questions and st.session_state.packed_mode:
+                st.caption("Packed requests return verdicts only; questions are generated on demand.")
+            st.session_state.stream_screening = st.checkbox(
+                "Screen uploads as they arrive", value=st.session_state.stream_screening,
+                help="Save, extract, triage and analyze each resume as soon as it is uploaded "
+                     "instead of waiting for Analyze All")
+            if st.button("🗑️ Clear cached verdicts for this job", disabled=not st.session_state.job_requirements):
+                removed = get_verdict_cache().invalidate(
+                    req_hash=requirements_hash(st.session_state.job_requirements))
+                st.success(f"Removed {removed} cached verdict(s)")
+
+        render_background_jobs()
+        render_pipeline_status()
 
     # Conditional rendering based on active tab
     if st.session_state.active_tab == "Upload":
         render_job_configuration()
     elif st.session_state.active_tab == "Results":
         render_resume_results()
+    elif st.session_state.active_tab == "Roles":
+        render_role_screening()
 
 
 def render_job_configuration():
@@ -249,8 +836,25 @@ def render_job_configuration():
 
             # Save job requirements button
             if st.button("Save Job Requirements"):
+                store = get_candidate_store()
+                job_id = job_id_from_title(job_title)
+                # Resumes uploaded before the job was saved belong to it
+                if st.session_state.current_job_id == DEFAULT_JOB_ID and job_id != DEFAULT_JOB_ID:
+                    store.move_job(DEFAULT_JOB_ID, job_id)
+                st.session_state.current_job_id = job_id
                 st.session_state.job_requirements = full_job_requirements
-                st.success("✅ Job requirements saved successfully!")
+                st.session_state.job_profile = {
+                    "skills": all_skills,
+                    "description": job_description,
+                    "experience_level": experience_level,
+                }
+                version = store.save_job(job_id, full_job_requirements, st.session_state.job_profile)
+                st.success(f"✅ Job requirements saved successfully! (version {version})")
+                stale = store.count_candidates(
+                    job_id, stale_for=requirements_hash(full_job_requirements), duplicates=False)
+                if stale:
+                    st.info(f"🔄 {stale} existing verdict(s) were scored against earlier requirements. "
+                            "Review them on the Resume Analysis page.")
 
     # Resume Upload Section
     st.markdown("---")
@@ -261,27 +865,108 @@ def render_job_configuration():
                                       accept_multiple_files=True,
                                       key="resume_uploader")
 
-    if uploaded_files:
+    if uploaded_files and st.session_state.stream_screening and st.session_state.job_requirements:
+        # Each file enters the save -> extract -> triage -> analyze pipeline immediately
+        pipeline = get_screening_pipeline()
+        context = screening_context()
+        queued = sum(pipeline.submit(context, f.name, f.getbuffer()) for f in uploaded_files)
+        if queued:
+            st.success(f"✅ {queued} resume(s) queued for screening. Verdicts appear under Results as they finish.")
+    elif uploaded_files:
+        if st.session_state.stream_screening:
+            st.caption("Save the job requirements to screen uploads as they arrive.")
+        store = get_candidate_store()
+        new_resume_ids = []
         for uploaded_file in uploaded_files:
-            # Check if this file is already uploaded (by name)
-            file_exists = any(
-                info["name"] == uploaded_file.name for info in st.session_state.resumes.values())
-
-            if not file_exists:
-                # Save the file and add to session state
-                save_uploaded_file(uploaded_file)
+            # Save the file unless the same PDF is already uploaded
+            resume_id = save_uploaded_file(uploaded_file)
+            if resume_id is not None:
+                new_resume_ids.append(resume_id)
 
         st.success(f"✅ {len(uploaded_files)} resume(s) uploaded successfully!")
 
+        # Extract text for the new uploads across all cores so analysis hits the cache
+        if new_resume_ids:
+            progress_bar = st.progress(0)
+            new_rows = store.get_summaries(new_resume_ids)
+            names_by_hash = {row["content_hash"]: row["name"] for row in new_rows}
+            stats = ingest_pdfs(
+                [pdf for pdf in map(load_resume_bytes, new_rows) if pdf is not None],
+                on_progress=lambda done, total: progress_bar.progress(done / total if total else 1.0))
+            progress_bar.empty()
+            st.caption(
+                f"📄 Extracted {stats['pages']} pages from {stats['files'] - stats['cached']} new file(s) "
+                f"in {stats['seconds']:.2f}s ({stats['pages_per_sec']:.1f} pages/sec, "
+                f"{stats['cached']} already cached)")
+            for content_hash, error in stats["errors"].items():
+                st.warning(f"⚠️ Could not extract text from {names_by_hash.get(content_hash, 'a resume')}: {error}")
+
+            near_duplicates = link_near_duplicates(st.session_state.current_job_id, new_resume_ids)
+            if near_duplicates:
+                st.info(f"🔁 {near_duplicates} new resume(s) closely match one already uploaded "
+                        "and will not be analyzed again.")
+
+    with st.expander("📦 Bulk Import (ZIP or server folder)"):
+        st.caption("Resumes are read one at a time and screened as they arrive; "
+                   "files already uploaded for this job are skipped.")
+        archive_file = st.file_uploader("ZIP archive of resumes", type="zip", key="bulk_import_zip")
+        server_path = st.text_input("...or a folder or ZIP file on the server", key="bulk_import_path",
+                                    help=f"Relative to, and confined to, {BULK_IMPORT_ROOT}")
+        analyze_imported = st.checkbox("Analyze imported resumes", value=True, key="bulk_import_analyze",
+                                       help="Unchecked, imports are only extracted and triaged.")
+        if st.button("Import Resumes", disabled=not (archive_file or server_path.strip())):
+            if not st.session_state.job_requirements:
+                st.warning("Save the job requirements before importing resumes.")
+            else:
+                context = dict(screening_context(), analyze=analyze_imported)
+                source = server_path.strip() or archive_file
+                try:
+                    _, found, oversized = start_bulk_import(source, context)
+                    st.success(f"✅ Importing {found} resume(s) in the background. Progress is shown in the sidebar.")
+                    if oversized:
+                        st.caption(f"Skipped {oversized} file(s) over the import size limit.")
+                except ValueError as e:
+                    st.error(str(e))
+
     # Display uploaded resumes
-    if st.session_state.resumes:
+    store = get_candidate_store()
+    total_uploaded = store.count_candidates(st.session_state.current_job_id)
+    if total_uploaded:
         st.markdown("### Uploaded Resumes")
 
+        # Local triage scores are available as soon as a job profile is saved
+        update_triage_scores()
+        if not st.session_state.job_profile:
+            st.caption("Save the job requirements to see triage scores.")
+
+        page_count = (total_uploaded + PAGE_SIZE - 1) // PAGE_SIZE
+        upload_page = 1
+        if page_count > 1:
+            upload_page = st.number_input(
+                f"Page (of {page_count})", min_value=1, max_value=page_count, value=1, key="upload_page")
+        resumes_by_triage = store.list_candidates(
+            st.session_state.current_job_id, order_by="triage_score", descending=True,
+            limit=PAGE_SIZE, offset=(upload_page - 1) * PAGE_SIZE)
+
+        originals = {row["id"]: row["name"] for row in store.get_summaries(
+            {info["duplicate_of"] for info in resumes_by_triage if info["duplicate_of"]})}
+
         # Use a container with columns for each resume
-        for resume_id, info in list(st.session_state.resumes.items()):
+        for info in resumes_by_triage:
+            resume_id = info["id"]
             with st.container(border=True):
                 cols = st.columns([3, 1, 1])
                 cols[0].write(f"**{info['name']}**")
+                if info["duplicate_of"] in originals:
+                    cols[0].caption(f"🔁 Near-duplicate of {originals[info['duplicate_of']]} · not analyzed")
+                compact = resume_token_counts(info)
+                if compact is not None:
+                    cols[0].caption(token_savings_caption(compact))
+                if info.get("triage_score") is not None:
+                    triage_text = f"Triage: {info['triage_score']:.0f}/100"
+                    if is_below_triage_threshold(info):
+                        triage_text += " · skipped"
+                    cols[1].write(triage_text)
 
                 # Fix for Delete button - use unique keys and call the delete function
                 delete_key = f"delete_{resume_id}"
@@ -292,38 +977,44 @@ def render_job_configuration():
         # Analyze All button
         col1, col2, col3 = st.columns([1, 2, 1])
         with col2:
-            unanalyzed_count = sum(
-                1 for info in st.session_state.resumes.values() if not info["analyzed"])
+            to_analyze = get_resumes_to_analyze()
+            unanalyzed_count = len(to_analyze)
             if unanalyzed_count > 0:
                 if st.button(f"🧠 Analyze All Remaining ({unanalyzed_count})", key="analyze_all_home", use_container_width=True):
-                    progress_bar = st.progress(0)
-                    to_analyze = [
-                        rid for rid, info in st.session_state.resumes.items() if not info["analyzed"]]
-                    total = len(to_analyze)
-
-                    for i, resume_id in enumerate(to_analyze):
-                        with st.spinner(f"Analyzing {st.session_state.resumes[resume_id]['name']}..."):
-                            analyze_resume(resume_id)
-                        progress_bar.progress((i + 1) / total)
+                    with st.spinner(f"Analyzing {len(to_analyze)} resumes..."):
+                        succeeded = analyze_all_resumes(to_analyze)
 
-                    st.success(f"✅ Successfully analyzed {total} resumes!")
+                    st.session_state.analysis_report = {
+                        "succeeded": succeeded, "failures": st.session_state.analysis_failures}
                     st.session_state.show_all_analyzed = True
                     st.session_state.active_tab = "Results"
                     st.rerun()
+                if st.button(f"⏳ Analyze in Background ({unanalyzed_count})", key="analyze_background_home", use_container_width=True):
+                    start_background_analysis(to_analyze)
+                    st.info("Analysis queued. Track progress under Background Jobs in the sidebar.")
 
 
 def render_resume_details(resume_id):
     """Render full details of a selected resume"""
-    if resume_id not in st.session_state.resumes:
+    store = get_candidate_store()
+    resume_info = store.get_candidate(resume_id)
+    if resume_info is None:
         st.error("Resume not found!")
         return
-        
-    resume_info = st.session_state.resumes[resume_id]
     
     # --- Selected Resume Preview ---
     st.markdown("---")
     st.subheader(f"📑 Preview: {resume_info['name']}")
-    display_pdf(resume_info["path"])
+    pdf_bytes = load_resume_bytes(resume_info)
+    if pdf_bytes is None:
+        st.warning("The PDF for this resume is no longer available; please upload it again.")
+    else:
+        display_resume_preview(pdf_bytes, resume_info["content_hash"], key=f"preview_{resume_id}")
+        compact = extract_compact_resume(pdf_bytes)
+        if compact is not None:
+            with st.expander(f"🗜️ Compact resume sent to the model · {token_savings_caption(compact)}"):
+                st.caption(" · ".join(f"{name}: {tokens:,} tokens" for name, tokens in compact["sections"].items()))
+                st.text(compact["text"])
 
     # Analyze if not yet analyzed
     if not resume_info["analyzed"]:
@@ -343,6 +1034,13 @@ def render_resume_details(resume_id):
         st.markdown("---")
         with st.container(border=True):
             st.markdown("## 🧾 Analysis Results")
+            current_hash, versions = get_requirement_versions()
+            status = verdict_status(resume_info, current_hash, versions)
+            if not status.startswith("✅"):
+                scored_with = versions.get(resume_info["requirements_hash"])
+                changes = (describe_diff(diff_profiles(scored_with["profile"], st.session_state.job_profile))
+                           if scored_with else "unknown")
+                st.warning(f"{status}: scored before the current job requirements. Changes since: {changes}")
 
             score = result_dict.get("resume_score", 0)
             col1, col2 = st.columns([2, 1])
@@ -390,20 +1088,18 @@ def render_resume_details(resume_id):
             col1, col2, col3 = st.columns([1, 2, 1])
             with col2:
                 if st.button("💾 Apply Feedback Changes", key=f"apply_feedback_{resume_id}", use_container_width=True):
-                    resume_info["result"]["selection_decision"] = hr_decision
-                    resume_info["result"]["feedback"] = hr_feedback
+                    store.update_decision(resume_id, hr_decision, hr_feedback)
                     st.success("✅ Feedback updated successfully!")
 
             # --- If selected, handle question generation and email ---
             if hr_decision.lower() == "selected":
-                if "questions_text" not in resume_info or not resume_info["questions_text"]:
+                if not resume_info["questions_text"]:
                     col1, col2, col3 = st.columns([1, 2, 1])
                     with col2:
                         if st.button("⚙️ Generate Questions", key=f"gen_questions_{resume_id}", use_container_width=True):
                             with st.spinner("Generating technical questions..."):
-                                questions = test_question_generator(
-                                    resume_info["path"], st.session_state.job_requirements)
-                                resume_info["questions_text"] = questions
+                                questions = generate_candidate_questions(resume_info)
+                                store.set_questions(resume_id, questions)
                                 st.rerun()
 
                 if resume_info.get("questions_text"):
@@ -418,7 +1114,7 @@ def render_resume_details(resume_id):
                         col1, col2, col3 = st.columns([1, 2, 1])
                         with col2:
                             if st.button("💾 Apply Question Edits", key=f"apply_questions_{resume_id}", use_container_width=True):
-                                resume_info["questions_text"] = edited
+                                store.set_questions(resume_id, edited)
                                 st.success(
                                     "✅ Questions updated successfully!")
 
@@ -434,7 +1130,7 @@ def render_resume_details(resume_id):
                                 resume_info.get("questions_text")
                             )
                             if sent:
-                                resume_info["email_sent"] = True
+                                store.set_email_sent(resume_id)
                                 st.success("✅ Email sent successfully!")
                             else:
                                 st.warning(
@@ -451,7 +1147,7 @@ def render_resume_details(resume_id):
                                 # hr_feedback
                             )
                             if sent:
-                                resume_info["email_sent"] = True
+                                store.set_email_sent(resume_id)
                                 st.info("❌ Rejection email sent.")
                             else:
                                 st.warning(
@@ -461,40 +1157,43 @@ def render_resume_details(resume_id):
 def render_resume_results():
     st.header("Resume Analysis")
     st.text("")
+    show_analysis_report()
 
-    # Check if any resumes are analyzed
-    analyzed_resumes = {
-        rid: info for rid, info in st.session_state.resumes.items() if info["analyzed"]}
+    store = get_candidate_store()
+    job_id = st.session_state.current_job_id
+    stats = store.job_stats(job_id)
 
-    if not analyzed_resumes:
-        unanalyzed_count = len(st.session_state.resumes)
+    # Check if any resumes are analyzed
+    if not stats["analyzed"]:
+        update_triage_scores()
+        to_analyze = get_resumes_to_analyze()
+        unanalyzed_count = len(to_analyze)
         if unanalyzed_count > 0:
             st.warning(f"⚠️ You have {unanalyzed_count} resumes that need to be analyzed!")
             col1, col2, col3 = st.columns([1, 2, 1])
             with col2:
                 if st.button(f"🧠 Analyze All Resumes ({unanalyzed_count})", key="analyze_all_results", use_container_width=True):
-                    progress_bar = st.progress(0)
-                    to_analyze = [
-                        rid for rid, info in st.session_state.resumes.items() if not info["analyzed"]]
-                    total = len(to_analyze)
-
-                    for i, resume_id in enumerate(to_analyze):
-                        with st.spinner(f"Analyzing {st.session_state.resumes[resume_id]['name']}..."):
-                            analyze_resume(resume_id)
-                        progress_bar.progress((i + 1) / total)
+                    with st.spinner(f"Analyzing {len(to_analyze)} resumes..."):
+                        succeeded = analyze_all_resumes(to_analyze)
 
-                    st.success(f"✅ Successfully analyzed {total} resumes!")
+                    st.session_state.analysis_report = {
+                        "succeeded": succeeded, "failures": st.session_state.analysis_failures}
                     st.session_state.show_all_analyzed = True
                     st.rerun()
+                if st.button(f"⏳ Analyze in Background ({unanalyzed_count})", key="analyze_background_results", use_container_width=True):
+                    start_background_analysis(to_analyze)
+                    st.info("Analysis queued. Track progress under Background Jobs in the sidebar.")
+        elif stats["total"]:
+            st.warning("⚠️ All uploaded resumes are duplicates or below the triage threshold. "
+                       "Lower it in Analysis Settings to analyze them.")
         else:
             st.warning("⚠️ No resumes have been uploaded yet! Go to Home tab to upload resumes.")
         return
 
     # Summary stats (KPIs)
-    total_resumes = len(st.session_state.resumes)
-    analyzed_count = len(analyzed_resumes)
-    selected_count = sum(1 for info in analyzed_resumes.values(
-    ) if info["result"].get("selection_decision", "").lower() == "selected")
+    total_resumes = stats["total"]
+    analyzed_count = stats["analyzed"]
+    selected_count = stats["selected"]
 
     # Display metrics with full st.metric parameters
     cols = st.columns(3)
@@ -527,54 +1226,110 @@ def render_resume_results():
     )
     st.text("")
 
+    # Verdicts scored against earlier requirements can be re-screened selectively
+    render_rescreen_panel()
+
     # --- Resume Comparison Table ---
     st.subheader("Resume Comparison Table")
     st.text("")
 
-    # Prepare data for table
-    table_data = []
-    for rid, info in analyzed_resumes.items():
-        result = info["result"]
-        score = result.get("resume_score", 0)
-        selection_decision = result.get("selection_decision", "Rejected")
-        match_text, match_color = get_match_status(score, selection_decision)
-        
-        table_data.append({
-            "ID": rid,
-            "Name": result.get("name", "N/A"),
-            "Email": result.get("email", "N/A"),
-            "Score": f"{score}/100",
-            "Match": match_text,
-            "Match_Color": match_color,
-            "Decision": selection_decision,
+    # HR-adjustable ranking weights; re-ranking is local and needs no LLM calls
+    with st.expander("⚖️ Ranking Weights"):
+        weight_labels = {
+            "llm_score": "AI resume score",
+            "skills": "Required skills (years per skill)",
+            "experience": "Total experience",
+            "seniority": "Seniority fit",
+            "education": "Education",
+            "projects": "Projects",
+        }
+        weight_cols = st.columns(3)
+        for i, (name, label) in enumerate(weight_labels.items()):
+            st.session_state.rank_weights[name] = weight_cols[i % 3].slider(
+                label, min_value=0.0, max_value=1.0, step=0.05,
+                value=float(st.session_state.rank_weights.get(name, DEFAULT_WEIGHTS[name])),
+                key=f"rank_weight_{name}")
+
+    rank_scores = get_rank_scores()
+    ranked_ids = sorted(rank_scores, key=rank_scores.get, reverse=True)
+    # Near-duplicate uploads are collapsed into the resume they duplicate
+    duplicate_counts = store.duplicate_counts(job_id)
+    if stats["duplicates"]:
+        st.caption(f"🔁 {stats['duplicates']} near-duplicate resume(s) collapsed into their originals")
+
+    # Sorting and filtering run in the candidate store; only the visible page is loaded
+    control_cols = st.columns([2, 2, 2, 2])
+    sort_label = control_cols[0].selectbox("Sort by", list(RESULT_SORTS), key="results_sort")
+    decision_filter = control_cols[1].selectbox("Decision", ["All", "Selected", "Rejected"],
+                                                key="results_decision")
+    match_filter = control_cols[2].selectbox(
+        "Match", ["All", *MATCH_LEVELS], key="results_match",
+        format_func=lambda level: "All" if level == "All" else MATCH_LABELS[level][0])
+    min_score = control_cols[3].slider("Minimum score", min_value=0, max_value=100, step=5,
+                                       key="results_min_score")
+    filters = {}
+    if decision_filter != "All":
+        filters["decision"] = decision_filter
+    if match_filter != "All":
+        filters["match"] = match_filter
+    if min_score:
+        filters["min_score"] = min_score
+
+    # A new sort or filter starts again from the first page
+    view_key = (job_id, sort_label, tuple(sorted(filters.items())))
+    if st.session_state.get("results_view_key") != view_key:
+        st.session_state.results_view_key = view_key
+        st.session_state.results_page = 1
+
+    page_rows, matching = load_results_page(rank_scores, sort_label, filters, st.session_state.results_page)
+    page_count = max(1, (matching + PAGE_SIZE - 1) // PAGE_SIZE)
+    if st.session_state.results_page > page_count:
+        st.session_state.results_page = page_count
+        page_rows, matching = load_results_page(rank_scores, sort_label, filters, page_count)
+    if page_count > 1:
+        st.session_state.results_page = st.number_input(
+            f"Page (of {page_count})", min_value=1, max_value=page_count,
+            value=st.session_state.results_page)
+    st.caption(f"{matching} of {stats['analyzed']} analyzed candidate(s) match")
+
+    # One virtualized grid for the page instead of a container and button per candidate
+    current_hash, versions = get_requirement_versions()
+    grid_rows = []
+    for row in page_rows:
+        score = row["score"] or 0
+        level = match_level(score, row["decision"] or "Rejected")
+        grid_rows.append({
+            "Name": row["candidate_name"] or "N/A",
+            "Email": row["email"] or "N/A",
+            "Match": f"{MATCH_ICONS[level]} {MATCH_LABELS[level][0]}",
+            "Score": score,
+            "Rank Score": rank_scores.get(row["id"], 0),
+            "Duplicates": duplicate_counts.get(row["id"], 0),
+            "Verdict": verdict_status(row, current_hash, versions),
         })
+    grid = st.dataframe(
+        pd.DataFrame(grid_rows, columns=["Name", "Email", "Match", "Score", "Rank Score", "Duplicates", "Verdict"]),
+        hide_index=True,
+        use_container_width=True,
+        on_select="rerun",
+        selection_mode="single-row",
+        # A fresh widget per page and view, so a selection never carries over to other rows
+        key=f"results_grid_{abs(hash((view_key, st.session_state.results_page)))}",
+        column_config={
+            "Score": st.column_config.ProgressColumn("Score", min_value=0, max_value=100, format="%g"),
+            "Rank Score": st.column_config.NumberColumn("Rank Score", format="%.1f"),
+            "Duplicates": st.column_config.NumberColumn("Duplicates", help="Near-duplicate uploads collapsed into this resume"),
+        },
+    )
+    st.caption("Select a row to see the full analysis.")
+
+    # React only to new selections so "Back to Table View" is not undone by the grid's sticky selection
+    picked = tuple(grid.selection.rows)
+    if picked != st.session_state.get("results_grid_pick"):
+        st.session_state.results_grid_pick = picked
+        if picked and picked[0] < len(page_rows):
+            st.session_state.selected_resume_id = page_rows[picked[0]]["id"]
 
-    # Create DataFrame
-    df = pd.DataFrame(table_data)
-    
-    # Display table with View Details button for each row
-    for _, row in df.iterrows():
-        rid = row["ID"]
-        info = analyzed_resumes[rid]
-        result = info["result"]
-        score = result.get("resume_score", 0)
-        selection_decision = result.get("selection_decision", "Rejected")
-        match_text, match_color = get_match_status(score, selection_decision)
-        
-        with st.container(border=True):
-            cols = st.columns([2, 2, 1, 1, 2])
-            
-            cols[0].write(f"**{result.get('name', 'N/A')}**")
-            cols[1].write(result.get('email', 'N/A'))
-            
-            cols[2].markdown(f"<span style='color: {match_color};'>{match_text}</span>", unsafe_allow_html=True)
-            
-            cols[3].write(f"Score: {score}/100")
-            
-            if cols[4].button("View Full Details", key=f"view_{rid}"):
-                st.session_state.selected_resume_id = rid
-                st.rerun()
-    
     # Display selected resume details if available
     if st.session_state.selected_resume_id:
         with st.container(border=True):
@@ -587,19 +1342,141 @@ def render_resume_results():
                 
             render_resume_details(st.session_state.selected_resume_id)
 
-    # Optional: export CSV
+    # Bulk notification of everyone who has not been emailed yet
     st.markdown("---")
-    export_df = df[["Name", "Email", "Score", "Match", "Decision"]]
-    csv = export_df.to_csv(index=False).encode('utf-8')
-    col1, col2, col3 = st.columns([1, 2, 1])
-    with col2:
-        st.download_button(
-            label="📄 Download Results as CSV",
-            data=csv,
-            file_name="resume_results.csv",
-            mime="text/csv",
-            use_container_width=True
-        )
+    missing_questions = len(store.list_missing_questions(job_id))
+    if missing_questions:
+        col1, col2, col3 = st.columns([1, 2, 1])
+        with col2:
+            if st.button(f"📝 Generate Questions for Selected Candidates ({missing_questions})",
+                         key="generate_all_questions", use_container_width=True):
+                with st.spinner("Building the question bank and picking questions..."):
+                    generate_missing_questions()
+                st.rerun()
+    pending_emails = store.count_candidates(job_id, analyzed=True, email_sent=False)
+    if pending_emails:
+        col1, col2, col3 = st.columns([1, 2, 1])
+        with col2:
+            if st.button(f"📧 Email All Pending Candidates ({pending_emails})", key="notify_all", use_container_width=True):
+                notify_pending_candidates()
+
+    # Exports are written to disk in the background and reused until the data or ranking changes
+    export_cols = st.columns([1, 2, 1])
+    with export_cols[1]:
+        formats = available_formats()
+        export_format = st.selectbox("Export format", formats, key="export_format",
+                                     format_func=lambda fmt: fmt.upper())
+        version = store.results_version(job_id)
+        profile = st.session_state.job_profile or {}
+        ranking_key = json.dumps([st.session_state.rank_weights, profile.get("skills", []),
+                                  profile.get("experience_level")], sort_keys=True)
+        path = export_path(job_id, export_format, version, ranking_key)
+        # An export started before the latest results arrived is still offered once it is done
+        export = st.session_state.get("export_job")
+        if export and export["target"] != (job_id, export_format, ranking_key):
+            export = None
+        if os.path.exists(path):
+            render_export_download(path, export_format)
+        elif export and os.path.exists(export["path"]):
+            render_export_download(export["path"], export_format, outdated=True)
+            if st.button(f"📦 Prepare {export_format.upper()} Export Again", key="prepare_export_again",
+                         use_container_width=True):
+                start_export(job_id, export_format, version, ranking_key, ranked_ids, rank_scores, path)
+        elif export:
+            wait_for_export(export)
+        elif st.button(f"📦 Prepare {export_format.upper()} Export", key="prepare_export", use_container_width=True):
+            start_export(job_id, export_format, version, ranking_key, ranked_ids, rank_scores, path)
+
+
+def start_export(job_id, export_format, version, ranking_key, ranked_ids, rank_scores, path):
+    """Write an export on the job registry and poll for it"""
+    export_job = get_job_registry().submit(
+        f"{export_format.upper()} export", [export_format],
+        lambda fmt: build_export(job_id, fmt, version, ranking_key, ranked_ids, rank_scores))
+    st.session_state.export_job = {"job": export_job, "path": path,
+                                   "target": (job_id, export_format, ranking_key)}
+    st.rerun()
+
+
+def render_role_screening():
+    st.header("Multi-Role Screening")
+    st.caption("Score the current job's candidates against several saved roles at once. "
+               "Every resume is matched locally against every role; only the top candidates "
+               "per role are sent to the AI.")
+
+    store = get_candidate_store()
+    job_id = st.session_state.current_job_id
+    jobs = {role_id: store.get_job(role_id) for role_id in store.list_jobs()}
+    saved_roles = [role_id for role_id, job in jobs.items() if job]
+    if not saved_roles:
+        st.warning("⚠️ Save job requirements for at least one role first.")
+        return
+
+    role_ids = st.multiselect("Roles", saved_roles, default=saved_roles, key="matrix_roles")
+    if not role_ids:
+        return
+    matrix = get_role_matrix({role_id: jobs[role_id]["profile"] for role_id in role_ids})
+    if not matrix.candidate_ids:
+        st.warning("⚠️ No resumes have been uploaded for this job yet! Go to Home tab to upload resumes.")
+        return
+
+    role_requirements = {role_id: jobs[role_id]["requirements"] for role_id in role_ids}
+    verdicts = store.role_results(
+        job_id, {role_id: requirements_hash(text) for role_id, text in role_requirements.items()})
+
+    top_k = st.number_input("Candidates per role sent to the AI", min_value=1, max_value=50,
+                            value=DEFAULT_TOP_K, key="matrix_top_k")
+    pending = [(candidate_id, role_id) for role_id in role_ids
+               for candidate_id in matrix.top_k(role_id, top_k) if (candidate_id, role_id) not in verdicts]
+    st.caption(f"{len(matrix.candidate_ids)} candidate(s) × {len(role_ids)} role(s) scored locally · "
+               f"{len(verdicts)} AI verdict(s)")
+    if pending:
+        col1, col2, col3 = st.columns([1, 2, 1])
+        with col2:
+            if st.button(f"🧠 Analyze Top {top_k} per Role ({len(pending)} new)", key="analyze_role_matrix",
+                         use_container_width=True):
+                screen_roles_in_background(
+                    pending, role_requirements,
+                    max_workers=st.session_state.analysis_workers,
+                    max_retries=st.session_state.analysis_retries,
+                    use_cache=st.session_state.use_verdict_cache)
+                st.info("Analysis queued. Track progress under Background Jobs in the sidebar.")
+
+    tabs = st.tabs([*role_ids, "⭐ Best Fit"])
+    for tab, role_id in zip(tabs, role_ids):
+        with tab:
+            ranked = matrix.ranked(role_id, verdicts)[:PAGE_SIZE]
+            table = []
+            for row in store.get_summaries(ranked):
+                verdict = verdicts.get((row["id"], role_id))
+                table.append({
+                    "Name": row["candidate_name"] or row["name"],
+                    "Local Match": matrix.local_score(row["id"], role_id),
+                    "AI Score": verdict["score"] if verdict else None,
+                    "Decision": verdict["decision"] if verdict else "Not analyzed",
+                })
+            st.dataframe(
+                pd.DataFrame(table, columns=["Name", "Local Match", "AI Score", "Decision"]),
+                hide_index=True, use_container_width=True,
+                column_config={
+                    "Local Match": st.column_config.ProgressColumn("Local Match", min_value=0, max_value=100,
+                                                                   format="%.0f"),
+                    "AI Score": st.column_config.NumberColumn("AI Score", format="%g"),
+                })
+            if len(matrix.candidate_ids) > PAGE_SIZE:
+                st.caption(f"Top {PAGE_SIZE} of {len(matrix.candidate_ids)} candidates")
+
+    with tabs[-1]:
+        best = matrix.best_fit(verdicts)
+        names = {row["id"]: row["candidate_name"] or row["name"] for row in store.get_summaries(best)}
+        fit_table = pd.DataFrame(
+            [{"Name": names.get(candidate_id, "N/A"), "Best-Fit Role": role_id, "Score": score,
+              "Scored By": "AI" if by_ai else "Local match"}
+             for candidate_id, (role_id, score, by_ai) in best.items()],
+            columns=["Name", "Best-Fit Role", "Score", "Scored By"])
+        st.caption("Uses the AI score where a candidate was analyzed for a role, the local match elsewhere.")
+        st.dataframe(fit_table.sort_values("Score", ascending=False), hide_index=True, use_container_width=True,
+                     column_config={"Score": st.column_config.NumberColumn("Score", format="%.0f")})
 
 
 if __name__ == "__main__":
@@ -0,0 +1,67 @@
+# config.py
+# Local storage settings for the Recruitment Agent Team
+import os
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Root directory for on-disk caches and local databases
+CACHE_DIR = os.environ.get("RECRUITMENT_CACHE_DIR", os.path.join(BASE_DIR, ".cache"))
+
+# Extracted PDF text cache
+TEXT_CACHE_DIR = os.path.join(CACHE_DIR, "pdf_text")
+TEXT_CACHE_MAX_MEMORY_ENTRIES = 512
+TEXT_CACHE_MAX_DISK_ENTRIES = 10000
+
+# PDF extraction limits; resumes past these caps are truncated
+PDF_MAX_PAGES = 25
+PDF_MAX_CHARS = 120000
+
+# Persistent cache of parsed analyzer verdicts
+VERDICT_CACHE_PATH = os.path.join(CACHE_DIR, "verdicts.sqlite3")
+VERDICT_CACHE_TTL_SECONDS = 14 * 24 * 60 * 60
+
+# Multi-resume prompt packing
+PACKED_TOKEN_BUDGET = 24000
+PACKED_MAX_RESUMES = 10
+PACKED_OUTPUT_TOKENS_PER_RESUME = 400
+
+# Persistent candidate repository shared by all sessions
+CANDIDATE_DB_PATH = os.path.join(CACHE_DIR, "candidates.sqlite3")
+DEFAULT_JOB_ID = "default"
+
+# Outgoing email
+SMTP_SERVER = os.environ.get("SMTP_SERVER", "smtp.gmail.com")
+SMTP_PORT = int(os.environ.get("SMTP_PORT", "587"))
+EMAIL_RATE_PER_MINUTE = 60
+
+# Uploaded resume bytes: kept in memory, optionally spilled to a size-bounded disk store
+RESUME_BLOB_DIR = os.path.join(CACHE_DIR, "resumes")
+RESUME_MEMORY_MAX_BYTES = 256 * 1024 * 1024
+RESUME_SPILL_TO_DISK = os.environ.get("RECRUITMENT_SPILL_UPLOADS", "1") != "0"
+RESUME_DISK_MAX_BYTES = 2 * 1024 * 1024 * 1024
+
+# Section-aware resume compaction for analyzer and question prompts
+RESUME_COMPACTION = os.environ.get("RECRUITMENT_COMPACT_RESUMES", "1") != "0"
+RESUME_TOKEN_BUDGET = 3000
+
+# Shared interview question bank per job requirements
+QUESTION_BANK_PATH = os.path.join(CACHE_DIR, "question_bank.sqlite3")
+PERSONALIZED_QUESTIONS = 2
+
+# Streaming screening pipeline: bounded queue between stages and workers per stage
+PIPELINE_QUEUE_SIZE = 32
+PIPELINE_STAGE_WORKERS = {"save": 1, "extract": 2, "triage": 1, "analyze": 8}
+
+# Bulk ZIP/folder import; larger entries are skipped
+BULK_IMPORT_MAX_FILE_BYTES = 20 * 1024 * 1024
+# Server-side folders and ZIP files can only be imported from below this directory
+BULK_IMPORT_ROOT = os.environ.get("RECRUITMENT_IMPORT_ROOT", os.path.join(CACHE_DIR, "imports"))
+
+# Finished CSV/JSONL/Parquet exports, reused until the candidate data changes
+EXPORT_DIR = os.path.join(CACHE_DIR, "exports")
+
+# Rasterized resume previews (needs the optional pypdfium2), cached by content hash
+THUMBNAIL_DIR = os.path.join(CACHE_DIR, "thumbnails")
+# Pixel widths rendered for every previewed page
+THUMBNAIL_WIDTHS = {"thumbnail": 160, "preview": 850}
+THUMBNAIL_MAX_PAGES = 5
@@ -0,0 +1,8 @@
+# conftest.py
+# Test setup: app modules import from this directory, and caches go to a throwaway directory
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+os.environ["RECRUITMENT_CACHE_DIR"] = tempfile.mkdtemp(prefix="recruitment-tests-")
@@ -0,0 +1,126 @@
+# test_email_dispatch.py
+# EmailDispatcher against a local aiosmtpd server
+import socket
+import time
+import pytest
+from utils.candidate_store import get_candidate_store
+from utils.email_dispatch import EmailDispatcher, build_candidate_messages, notify_candidates_in_background
+from utils.jobs import get_job_registry, FINISHED_STATES
+
+# Test-only dependency: a local SMTP server
+Controller = pytest.importorskip("aiosmtpd.controller").Controller
+
+REFUSED = "refused@example.com"
+
+
+class RecordingHandler:
+    """Keeps every delivered message with the client address of its connection"""
+
+    def __init__(self):
+        self.messages = []
+        self.refuse = True
+
+    async def handle_RCPT(self, server, session, envelope, address, rcpt_options):
+        if self.refuse and address == REFUSED:
+            return "550 Mailbox unavailable"
+        envelope.rcpt_tos.append(address)
+        return "250 OK"
+
+    async def handle_DATA(self, server, session, envelope):
+        self.messages.append((session.peer, envelope.rcpt_tos, envelope.content.decode("utf-8", "replace")))
+        return "250 Message accepted for delivery"
+
+    @property
+    def connections(self):
+        return len({peer for peer, _, _ in self.messages})
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@pytest.fixture
+def smtp_server():
+    handler = RecordingHandler()
+    controller = Controller(handler, hostname="127.0.0.1", port=_free_port())
+    controller.start()
+    try:
+        yield controller, handler
+    finally:
+        controller.stop()
+
+
+def _dispatcher(controller, rate_per_minute=0):
+    return EmailDispatcher(host=controller.hostname, port=controller.port, use_tls=False,
+                           rate_per_minute=rate_per_minute, max_retries=0)
+
+
+def _messages(recipient, count=1):
+    return [build_candidate_messages("hr@example.com", "Ada", recipient, "Rejected")[0] for _ in range(count)]
+
+
+def test_delivers_over_one_connection(smtp_server):
+    controller, handler = smtp_server
+    batches = [(f"c{i}", _messages(f"c{i}@example.com")) for i in range(5)]
+    with _dispatcher(controller) as dispatcher:
+        outcomes = dispatcher.send_many(batches)
+
+    assert outcomes == {f"c{i}": {"sent": 1, "error": None} for i in range(5)}
+    assert [rcpt for _, rcpt, _ in handler.messages] == [[f"c{i}@example.com"] for i in range(5)]
+    assert handler.connections == 1
+    assert dispatcher.stats["connections"] == 1
+
+
+def test_rate_limit_spaces_sends(smtp_server):
+    controller, handler = smtp_server
+    # 600 per minute is one message every 0.1 s
+    with _dispatcher(controller, rate_per_minute=600) as dispatcher:
+        start = time.monotonic()
+        dispatcher.send_many([("c", _messages("c@example.com", count=5))])
+        elapsed = time.monotonic() - start
+
+    assert len(handler.messages) == 5
+    assert elapsed >= 0.4
+
+
+def test_group_stops_at_first_failure(smtp_server):
+    controller, handler = smtp_server
+    group = _messages("a@example.com") + _messages(REFUSED) + _messages("b@example.com")
+    with _dispatcher(controller) as dispatcher:
+        outcomes = dispatcher.send_many([("c", group)])
+
+    assert outcomes["c"]["sent"] == 1
+    assert outcomes["c"]["error"]
+    assert [rcpt for _, rcpt, _ in handler.messages] == [["a@example.com"]]
+
+
+def _wait_for(job_id, timeout=10):
+    job = get_job_registry().get(job_id)
+    deadline = time.monotonic() + timeout
+    while job.snapshot()["status"] not in FINISHED_STATES:
+        assert time.monotonic() < deadline, "background email job did not finish"
+        time.sleep(0.05)
+    return job.snapshot()
+
+
+def test_background_retry_resumes_after_delivered_messages(smtp_server):
+    controller, handler = smtp_server
+    store = get_candidate_store()
+    candidate_id = store.add_candidate("email-tests", "ada.pdf", "")
+    group = _messages("a@example.com") + _messages(REFUSED) + _messages("b@example.com")
+
+    snapshot = _wait_for(notify_candidates_in_background([(candidate_id, group)], _dispatcher(controller)))
+    assert snapshot["failed"] == 1
+    assert snapshot["detail"].startswith("1 email(s) sent · 1 failed · 0 retried")
+    assert store.get_summaries([candidate_id])[0]["emails_delivered"] == 1
+
+    handler.refuse = False
+    snapshot = _wait_for(notify_candidates_in_background([(candidate_id, group)], _dispatcher(controller)))
+    assert snapshot["completed"] == 1
+    assert snapshot["detail"].startswith("2 email(s) sent · 0 failed")
+    row = store.get_summaries([candidate_id])[0]
+    assert row["email_sent"] and row["emails_delivered"] == 0
+    # The first message is not sent twice
+    assert [rcpt for _, rcpt, _ in handler.messages] == [["a@example.com"], [REFUSED], ["b@example.com"]]
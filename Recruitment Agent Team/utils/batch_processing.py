@@ -1,161 +1,241 @@
 # batch_processing.py
-import streamlit as st
-import threading
-import json
-import pandas as pd
-from agents import resume_analyzer
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed, wait, FIRST_COMPLETED
+from agents import resume_analyzer, lookup_cached_verdict, plan_resume_packs, packed_resume_analyzer
+from config import PACKED_TOKEN_BUDGET, PACKED_MAX_RESUMES
+from utils.result_parsing import parse_json_response
+from utils.candidate_store import get_candidate_store
+from utils.jobs import get_job_registry
+from utils.blob_store import get_resume_blob_store
+from utils.verdict_cache import requirements_hash
 
-def process_resumes_in_background(resume_ids, job_requirements, callback=None):
+# Concurrency defaults for "Analyze All"
+DEFAULT_MAX_WORKERS = 8
+DEFAULT_MAX_RETRIES = 2
+RETRY_BACKOFF_SECONDS = 2.0
+
+def process_resumes_in_background(resume_ids, job_requirements, callback=None,
+                                  max_workers=DEFAULT_MAX_WORKERS, max_retries=DEFAULT_MAX_RETRIES,
+                                  use_cache=True, include_questions=False, reanalyze=False):
     """
     Process multiple resumes in the background
     
+    The work runs on the shared job registry's worker pool and never touches
+    st.session_state; verdicts go straight to the candidate store. Poll the
+    returned job through get_job_registry() for progress, or pause, resume
+    and cancel it there.
+    
     Args:
         resume_ids: List of resume IDs to process
         job_requirements: Job requirements text
-        callback: Function to call when processing is complete
+        callback: Function to call with the job when processing is complete
+        max_workers: Maximum number of resumes analyzed at the same time
+        max_retries: Per-resume retry count
+        use_cache: Serve and store verdicts in the persistent verdict cache
+        include_questions: Also generate interview questions for Selected candidates in the same call
+        reanalyze: Also analyze resumes that already have a verdict (re-screening)
+        
+    Returns:
+        str: Background job ID
     """
-    def process_worker():
-        for resume_id in resume_ids:
-            # Check if resume exists and is not already analyzed
-            if resume_id in st.session_state.resumes and not st.session_state.resumes[resume_id]["analyzed"]:
-                resume_info = st.session_state.resumes[resume_id]
-                
-                try:
-                    # Analyze the resume
-                    result = resume_analyzer(resume_info["path"], job_requirements)
-                    
-                    # Parse the result
-                    try:
-                        result_dict = json.loads(result)
-                        resume_info["result"] = result_dict
-                        resume_info["analyzed"] = True
-                    except:
-                        # If parsing fails, try to extract JSON from text
-                        import re
-                        json_match = re.search(r'({.*})', result, re.DOTALL)
-                        if json_match:
-                            resume_info["result"] = json.loads(json_match.group(1))
-                            resume_info["analyzed"] = True
-                except Exception as e:
-                    print(f"Error processing resume {resume_id}: {e}")
+    store = get_candidate_store()
+    req_hash = requirements_hash(job_requirements)
 
-        # Call the callback when done
-        if callback:
-            callback()
-    
-    # Start processing in a separate thread
-    thread = threading.Thread(target=process_worker)
-    thread.daemon = True
-    thread.start()
-    
-    return thread
+    def process_item(resume_id):
+        # Check if resume exists and is not already analyzed
+        resume_info = store.get_candidate(resume_id)
+        if resume_info is None or (resume_info["analyzed"] and not reanalyze):
+            return None
+        pdf_bytes = get_resume_blob_store().get(resume_info["content_hash"], resume_info["path"])
+        if pdf_bytes is None:
+            raise FileNotFoundError(f"{resume_info['name']} is no longer available")
+        result_dict = analyze_with_retry(pdf_bytes, job_requirements, max_retries, use_cache, include_questions)
+        store.save_result(resume_id, result_dict, req_hash)
+        return result_dict.get("resume_score")
+
+    return get_job_registry().submit(
+        f"{'Re-score' if reanalyze else 'Analyze'} {len(resume_ids)} resume(s)",
+        resume_ids,
+        process_item,
+        concurrency=max_workers,
+        on_done=callback,
+    )
 
-def generate_comparison_table(resumes_dict):
+def screen_roles_in_background(pairs, role_requirements, max_workers=DEFAULT_MAX_WORKERS,
+                               max_retries=DEFAULT_MAX_RETRIES, use_cache=True):
     """
-    Generate a comparison table of all analyzed resumes
+    Analyze pool candidates against other roles in the background
+    
+    Verdicts are stored per (candidate, role) in the candidate store; a
+    verdict for the role the candidate was uploaded to also becomes the
+    candidate's main result.
     
     Args:
-        resumes_dict: Dictionary of resume information
+        pairs: List of (candidate_id, role_id) to analyze
+        role_requirements: {role_id: job requirements text}
+        max_workers: Maximum number of analyses at the same time
+        max_retries: Per-analysis retry count
+        use_cache: Serve and store verdicts in the persistent verdict cache
         
     Returns:
-        pandas.DataFrame: Comparison table
+        str: Background job ID
     """
-    data = []
-    
-    for resume_id, info in resumes_dict.items():
-        if info["analyzed"] and info["result"]:
-            result = info["result"]
-            
-            row = {
-                "Resume ID": resume_id,
-                "Name": result.get("name", "Unknown"),
-                "Email": result.get("email", "N/A"),
-                "Score": result.get("resume_score", 0),
-                "Decision": result.get("selection_decision", "N/A"),
-                "Feedback": result.get("feedback", "")[:50] + "..." if result.get("feedback", "") else ""
-            }
-            
-            data.append(row)
-    
-    # Create DataFrame
-    df = pd.DataFrame(data)
-    
-    # Sort by score (descending)
-    if not df.empty and "Score" in df.columns:
-        df = df.sort_values("Score", ascending=False)
-    
-    return df
+    store = get_candidate_store()
+    role_hashes = {role_id: requirements_hash(text) for role_id, text in role_requirements.items()}
 
-def export_results_to_json(resumes_dict, job_requirements):
+    def screen_item(pair):
+        candidate_id, role_id = pair
+        rows = store.get_summaries([candidate_id])
+        if not rows:
+            return None
+        pdf_bytes = get_resume_blob_store().get(rows[0]["content_hash"], rows[0]["path"])
+        if pdf_bytes is None:
+            raise FileNotFoundError(f"{rows[0]['name']} is no longer available")
+        result_dict = analyze_with_retry(pdf_bytes, role_requirements[role_id], max_retries, use_cache)
+        store.save_role_result(candidate_id, role_id, result_dict, role_hashes[role_id])
+        if rows[0]["job_id"] == role_id:
+            store.save_result(candidate_id, result_dict, role_hashes[role_id])
+        return result_dict.get("resume_score")
+
+    return get_job_registry().submit(
+        f"Screen {len(pairs)} role match(es)",
+        pairs,
+        screen_item,
+        concurrency=max_workers,
+    )
+
+def analyze_with_retry(pdf_source, job_requirements, max_retries=DEFAULT_MAX_RETRIES, use_cache=True,
+                       include_questions=False):
     """
-    Export resume analysis results to JSON
+    Analyze one resume, retrying on errors and unparseable responses
     
     Args:
-        resumes_dict: Dictionary of resume information
+        pdf_source: Path to the PDF resume file, or its bytes
         job_requirements: Job requirements text
+        max_retries: Number of extra attempts after the first failure
+        use_cache: Serve and store verdicts in the persistent verdict cache
+        include_questions: Fused mode; Selected verdicts also carry interview_questions
         
     Returns:
-        str: JSON string
+        dict: Parsed analysis result
+        
+    Raises:
+        Exception: The last error once all attempts are exhausted
     """
-    export_data = {
-        "job_requirements": job_requirements,
-        "candidates": []
-    }
-    
-    for resume_id, info in resumes_dict.items():
-        if info["analyzed"] and info["result"]:
-            result = info["result"]
-            
-            candidate_data = {
-                "name": result.get("name", "Unknown"),
-                "email": result.get("email", "N/A"),
-                "resume_name": info.get("name", "unknown.pdf"),
-                "score": result.get("resume_score", 0),
-                "decision": result.get("selection_decision", "N/A"),
-                "feedback": result.get("feedback", ""),
-                "email_sent": info.get("email_sent", False)
-            }
-            
-            if "questions_text" in info and info["questions_text"]:
-                candidate_data["questions"] = info["questions_text"]
-            
-            export_data["candidates"].append(candidate_data)
-    
-    return json.dumps(export_data, indent=2)
+    last_error = None
+    for attempt in range(max_retries + 1):
+        if attempt:
+            # Exponential backoff between attempts
+            time.sleep(RETRY_BACKOFF_SECONDS * (2 ** (attempt - 1)))
+        try:
+            result_dict = parse_json_response(
+                resume_analyzer(pdf_source, job_requirements, use_cache, include_questions))
+            if result_dict:
+                return result_dict
+            last_error = ValueError("Analyzer returned a response without valid JSON")
+        except Exception as e:
+            last_error = e
+    raise last_error
 
-def export_results_to_csv(resumes_dict):
+def analyze_resumes_concurrently(resumes, job_requirements, max_workers=DEFAULT_MAX_WORKERS,
+                                 max_retries=DEFAULT_MAX_RETRIES, use_cache=True, include_questions=False):
     """
-    Export resume analysis results to CSV
+    Analyze many resumes with a bounded thread pool
+    
+    Results are yielded in completion order so callers can update progress as
+    soon as each analysis finishes. The worker threads never touch
+    st.session_state; the caller applies results on the script thread.
     
     Args:
-        resumes_dict: Dictionary of resume information
+        resumes: List of (resume_id, pdf_source) tuples
+        job_requirements: Job requirements text
+        max_workers: Maximum number of concurrent analyzer calls
+        max_retries: Per-resume retry count
+        use_cache: Serve and store verdicts in the persistent verdict cache
+        include_questions: Fused mode; Selected verdicts also carry interview_questions
         
-    Returns:
-        pandas.DataFrame: CSV data
+    Yields:
+        tuple: (resume_id, result_dict or None, error or None)
     """
-    data = []
-    
-    for resume_id, info in resumes_dict.items():
-        if info["analyzed"] and info["result"]:
-            result = info["result"]
-            
-            row = {
-                "Name": result.get("name", "Unknown"),
-                "Email": result.get("email", "N/A"),
-                "Resume Filename": info.get("name", "unknown.pdf"),
-                "Score": result.get("resume_score", 0),
-                "Decision": result.get("selection_decision", "N/A"),
-                "Feedback": result.get("feedback", ""),
-                "Email Sent": "Yes" if info.get("email_sent", False) else "No"
-            }
-            
-            data.append(row)
-    
-    # Create DataFrame
-    df = pd.DataFrame(data)
+    if not resumes:
+        return
+
+    workers = max(1, min(max_workers, len(resumes)))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="resume-analyzer") as executor:
+        futures = {
+            executor.submit(analyze_with_retry, pdf_source, job_requirements, max_retries, use_cache,
+                            include_questions): resume_id
+            for resume_id, pdf_source in resumes
+        }
+        for future in as_completed(futures):
+            resume_id = futures[future]
+            try:
+                yield resume_id, future.result(), None
+            except Exception as e:
+                yield resume_id, None, e
+
+def analyze_resumes_packed(resumes, job_requirements, max_workers=DEFAULT_MAX_WORKERS,
+                           token_budget=PACKED_TOKEN_BUDGET, max_resumes=PACKED_MAX_RESUMES,
+                           use_cache=True, max_retries=DEFAULT_MAX_RETRIES):
+    """
+    Analyze many resumes with several resumes packed into each analyzer call
     
-    # Sort by score (descending)
-    if not df.empty and "Score" in df.columns:
-        df = df.sort_values("Score", ascending=False)
+    Cached verdicts are yielded first; the remaining resumes are grouped into
+    token-budgeted packs that run on a bounded thread pool. Resumes a packed
+    response failed to cover (including every resume of a pack whose call
+    failed) are re-analyzed individually on the same pool with
+    analyze_with_retry, so they get the same retries and backoff as
+    unpacked analysis.
     
-    return df
\ No newline at end of file
+    Args:
+        resumes: List of (resume_id, pdf_source) tuples
+        job_requirements: Job requirements text
+        max_workers: Maximum number of concurrent analyzer calls
+        token_budget: Estimated token budget per packed call
+        max_resumes: Maximum resumes per packed call
+        use_cache: Serve and store verdicts in the persistent verdict cache
+        max_retries: Retry count of the individual re-analysis
+        
+    Yields:
+        tuple: (resume_id, result_dict or None, error or None)
+    """
+    pending = []
+    for resume_id, pdf_source in resumes:
+        cached = lookup_cached_verdict(pdf_source, job_requirements) if use_cache else None
+        if cached is not None:
+            yield resume_id, cached, None
+        else:
+            pending.append((resume_id, pdf_source))
+
+    packs = plan_resume_packs(pending, job_requirements, token_budget, max_resumes)
+    if not packs:
+        return
+
+    workers = max(1, min(max_workers, len(pending)))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="resume-analyzer") as executor:
+        # future -> ("pack", pack) or ("single", resume_id)
+        futures = {
+            executor.submit(packed_resume_analyzer, pack, job_requirements, use_cache, False): ("pack", pack)
+            for pack in packs
+        }
+        while futures:
+            done, _ = wait(futures, return_when=FIRST_COMPLETED)
+            for future in done:
+                kind, work = futures.pop(future)
+                if kind == "single":
+                    try:
+                        yield work, future.result(), None
+                    except Exception as e:
+                        yield work, None, e
+                    continue
+                try:
+                    verdicts = future.result()
+                except Exception:
+                    verdicts = {}
+                for resume_id, pdf_source, _ in work:
+                    if verdicts.get(resume_id):
+                        yield resume_id, verdicts[resume_id], None
+                    else:
+                        retry = executor.submit(analyze_with_retry, pdf_source, job_requirements, max_retries,
+                                                use_cache)
+                        futures[retry] = ("single", resume_id)
\ No newline at end of file
@@ -0,0 +1,197 @@
+# blob_store.py
+# Content-addressed store of uploaded resume PDFs, shared by all sessions
+import os
+import threading
+from collections import OrderedDict
+from config import RESUME_BLOB_DIR, RESUME_MEMORY_MAX_BYTES, RESUME_SPILL_TO_DISK, RESUME_DISK_MAX_BYTES
+from utils.hashing import sha256_bytes
+
+# Prune the disk store once every this many writes
+DISK_PRUNE_INTERVAL = 50
+
+
+class ResumeBlobStore:
+    """
+    Two-level (memory + optional disk) store of uploaded PDF bytes
+
+    Blobs are keyed by the SHA-256 of their content and handed out as
+    read-only memoryviews, so extraction, hashing and the preview all share
+    one buffer instead of re-reading a temp file. Memory is an LRU bounded
+    by total bytes. With spilling enabled every blob is also written once to
+    a content-addressed file, which survives restarts and is itself evicted
+    least-recently-used above max_disk_bytes.
+    """
+
+    def __init__(self, blob_dir=RESUME_BLOB_DIR, max_memory_bytes=RESUME_MEMORY_MAX_BYTES,
+                 spill_to_disk=RESUME_SPILL_TO_DISK, max_disk_bytes=RESUME_DISK_MAX_BYTES):
+        self.blob_dir = blob_dir
+        self.max_memory_bytes = max_memory_bytes
+        self.spill_to_disk = spill_to_disk
+        self.max_disk_bytes = max_disk_bytes
+        self._memory = OrderedDict()
+        self._memory_bytes = 0
+        self._lock = threading.Lock()
+        self._writes = 0
+        if self.spill_to_disk:
+            os.makedirs(self.blob_dir, exist_ok=True)
+
+    def _disk_path(self, content_hash):
+        return os.path.join(self.blob_dir, f"{content_hash}.pdf")
+
+    def _remember(self, content_hash, view):
+        # Caller must hold the lock
+        if content_hash in self._memory:
+            self._memory.move_to_end(content_hash)
+            return
+        self._memory[content_hash] = view
+        self._memory_bytes += view.nbytes
+        # Always keep the newest blob, even if it alone exceeds the budget
+        while self._memory_bytes > self.max_memory_bytes and len(self._memory) > 1:
+            _, evicted = self._memory.popitem(last=False)
+            self._memory_bytes -= evicted.nbytes
+
+    def put(self, data):
+        """
+        Store PDF bytes
+
+        Args:
+            data: bytes, bytearray or memoryview with the PDF content
+
+        Returns:
+            str: SHA-256 hex digest identifying the blob
+        """
+        view = memoryview(data).toreadonly()
+        content_hash = sha256_bytes(view)
+
+        if self.spill_to_disk:
+            disk_path = self._disk_path(content_hash)
+            if not os.path.exists(disk_path):
+                tmp_path = f"{disk_path}.{threading.get_ident()}.tmp"
+                try:
+                    with open(tmp_path, "wb") as f:
+                        f.write(view)
+                    os.replace(tmp_path, disk_path)
+                except OSError:
+                    # The memory tier still serves the blob when the disk is read-only or full
+                    pass
+
+        with self._lock:
+            self._remember(content_hash, view)
+            self._writes += 1
+            prune = self.spill_to_disk and self._writes % DISK_PRUNE_INTERVAL == 0
+
+        if prune:
+            self.prune_disk()
+        return content_hash
+
+    def get(self, content_hash, fallback_path=None):
+        """
+        Look up a PDF by content hash
+
+        Args:
+            content_hash: SHA-256 hex digest of the PDF bytes
+            fallback_path: Optional file to import if the blob is unknown
+                (e.g. resumes saved as temp files by older versions)
+
+        Returns:
+            memoryview: Read-only PDF bytes, or None if unavailable
+        """
+        if content_hash:
+            with self._lock:
+                view = self._memory.get(content_hash)
+                if view is not None:
+                    self._memory.move_to_end(content_hash)
+                    return view
+
+            if self.spill_to_disk:
+                disk_path = self._disk_path(content_hash)
+                try:
+                    with open(disk_path, "rb") as f:
+                        view = memoryview(f.read()).toreadonly()
+                    # Refresh the access time so disk eviction is least-recently-used
+                    os.utime(disk_path, None)
+                except OSError:
+                    view = None
+                if view is not None:
+                    with self._lock:
+                        self._remember(content_hash, view)
+                    return view
+
+        if fallback_path and os.path.exists(fallback_path):
+            with open(fallback_path, "rb") as f:
+                data = f.read()
+            self.put(data)
+            return memoryview(data).toreadonly()
+        return None
+
+    def disk_path(self, content_hash):
+        """Return the spill file for a blob, or None when it is only held in memory"""
+        if not self.spill_to_disk:
+            return None
+        path = self._disk_path(content_hash)
+        return path if os.path.exists(path) else None
+
+    def discard(self, content_hash):
+        """Drop a blob from memory and disk"""
+        with self._lock:
+            view = self._memory.pop(content_hash, None)
+            if view is not None:
+                self._memory_bytes -= view.nbytes
+        if self.spill_to_disk:
+            try:
+                os.unlink(self._disk_path(content_hash))
+            except OSError:
+                pass
+
+    def prune_disk(self):
+        """Evict the least recently used spill files above the byte cap"""
+        try:
+            entries = [(e, e.stat()) for e in os.scandir(self.blob_dir) if e.name.endswith(".pdf")]
+        except OSError:
+            return
+        excess = sum(stat.st_size for _, stat in entries) - self.max_disk_bytes
+        if excess <= 0:
+            return
+        entries.sort(key=lambda item: item[1].st_mtime)
+        for entry, stat in entries:
+            if excess <= 0:
+                break
+            try:
+                os.unlink(entry.path)
+                excess -= stat.st_size
+            except OSError:
+                pass
+
+    def stats(self):
+        """Return the number of blobs and bytes held in memory"""
+        with self._lock:
+            return {"memory_blobs": len(self._memory), "memory_bytes": self._memory_bytes}
+
+
+def load_pdf_bytes(pdf_source):
+    """
+    Resolve a PDF source to its bytes
+
+    Args:
+        pdf_source: Path to a PDF file, or the PDF content as bytes/memoryview
+
+    Returns:
+        bytes-like: The PDF content
+    """
+    if isinstance(pdf_source, (bytes, bytearray, memoryview)):
+        return pdf_source
+    with open(pdf_source, "rb") as f:
+        return f.read()
+
+
+_blob_store = None
+_store_lock = threading.Lock()
+
+
+def get_resume_blob_store():
+    """Return the process-wide resume blob store"""
+    global _blob_store
+    with _store_lock:
+        if _blob_store is None:
+            _blob_store = ResumeBlobStore()
+        return _blob_store
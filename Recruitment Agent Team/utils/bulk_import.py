@@ -0,0 +1,141 @@
+# bulk_import.py
+# Streaming import of resume PDFs from ZIP archives and server-side folders
+import os
+import zipfile
+from config import BULK_IMPORT_MAX_FILE_BYTES, BULK_IMPORT_ROOT
+from utils.jobs import get_job_registry
+from utils.pipeline import get_screening_pipeline
+
+
+def _is_pdf_name(name):
+    base = os.path.basename(name)
+    # Skip macOS resource forks and other hidden files bundled into archives
+    return name.lower().endswith(".pdf") and not base.startswith(".") and "__MACOSX/" not in name
+
+
+def _within(path, root):
+    return os.path.commonpath([path, root]) == root
+
+
+def resolve_server_path(path, root=BULK_IMPORT_ROOT):
+    """
+    Resolve a server-side import path typed by a user, confined to the import root
+
+    Args:
+        path: Folder or ZIP file, absolute or relative to root
+        root: Directory imports are allowed from
+
+    Returns:
+        str: Real path of the source
+
+    Raises:
+        ValueError: If the path does not exist or resolves (e.g. through ".." or
+            a symlink) outside root
+    """
+    root = os.path.realpath(root)
+    resolved = os.path.realpath(os.path.join(root, path))
+    if not _within(resolved, root):
+        raise ValueError(f"Server imports must be inside {root}")
+    if not os.path.exists(resolved):
+        raise ValueError(f"{path} does not exist in {root}")
+    return resolved
+
+
+def list_zip_entries(archive, max_file_bytes=BULK_IMPORT_MAX_FILE_BYTES):
+    """
+    List the PDF entries of an open archive from its central directory
+
+    Args:
+        archive: zipfile.ZipFile
+        max_file_bytes: Entries larger than this (uncompressed) are skipped
+
+    Returns:
+        tuple: (PDF entry names, number of skipped oversized entries)
+    """
+    names, oversized = [], 0
+    for info in archive.infolist():
+        if info.is_dir() or not _is_pdf_name(info.filename):
+            continue
+        if info.file_size > max_file_bytes:
+            oversized += 1
+            continue
+        names.append(info.filename)
+    return names, oversized
+
+
+def list_directory_pdfs(directory, max_file_bytes=BULK_IMPORT_MAX_FILE_BYTES):
+    """
+    Recursively list the PDFs below a server-side directory
+
+    Returns:
+        tuple: (PDF file paths, number of skipped oversized files)
+    """
+    paths, oversized = [], 0
+    directory = os.path.realpath(directory)
+    for root, _, files in os.walk(directory):
+        for name in sorted(files):
+            path = os.path.join(root, name)
+            # Symlinked files must not pull in anything from outside the folder
+            if not _is_pdf_name(path) or not _within(os.path.realpath(path), directory):
+                continue
+            try:
+                if os.path.getsize(path) > max_file_bytes:
+                    oversized += 1
+                    continue
+            except OSError:
+                continue
+            paths.append(path)
+    return paths, oversized
+
+
+def start_bulk_import(source, context, label=None):
+    """
+    Stream resumes from a ZIP archive or directory into the screening pipeline
+
+    Entries are read one at a time, so only the entries waiting in the
+    pipeline's bounded queues are held in memory, whatever the archive
+    size. Each entry is hashed and deduplicated by the pipeline before it
+    is saved, extracted, triaged and (if context["analyze"]) analyzed.
+    The import runs as a background job that can be paused or cancelled.
+
+    Args:
+        source: Path to a directory or ZIP file below BULK_IMPORT_ROOT (absolute or
+            relative to it), or a seekable file object with ZIP data
+        context: Screening context for the pipeline (see ScreeningPipeline.submit)
+        label: Name shown for the import job
+
+    Returns:
+        tuple: (job ID, number of PDFs found, number of oversized entries skipped)
+
+    Raises:
+        ValueError: If the source is neither a directory nor a ZIP archive, or is a
+            path outside BULK_IMPORT_ROOT
+    """
+    pipeline = get_screening_pipeline()
+    if isinstance(source, str):
+        source = resolve_server_path(source)
+
+    if isinstance(source, str) and os.path.isdir(source):
+        paths, oversized = list_directory_pdfs(source)
+
+        def import_entry(path):
+            with open(path, "rb") as f:
+                return pipeline.submit(context, os.path.relpath(path, source), f.read())
+
+        job_id = get_job_registry().submit(
+            label or f"Import {os.path.basename(os.path.normpath(source))}", paths, import_entry, concurrency=1)
+        return job_id, len(paths), oversized
+
+    if not zipfile.is_zipfile(source):
+        raise ValueError("Choose a ZIP archive or a folder of PDF files")
+    archive = zipfile.ZipFile(source)
+    names, oversized = list_zip_entries(archive)
+
+    def import_entry(name):
+        # Only this entry is decompressed; the rest of the archive stays on disk
+        return pipeline.submit(context, os.path.basename(name), archive.read(name))
+
+    job_id = get_job_registry().submit(
+        label or "Import ZIP archive", names, import_entry, concurrency=1,
+        on_done=lambda job: archive.close())
+    return job_id, len(names), oversized
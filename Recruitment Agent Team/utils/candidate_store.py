@@ -0,0 +1,711 @@
+# candidate_store.py
+# SQLite-backed candidate repository shared by every Streamlit session
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+import uuid
+from config import CANDIDATE_DB_PATH, DEFAULT_JOB_ID
+from utils.verdict_cache import requirements_hash as hash_requirements
+
+# Columns that are cheap to load for every row; large fields live in candidate_details
+SUMMARY_COLUMNS = (
+    "id", "job_id", "name", "path", "content_hash", "analyzed", "candidate_name", "email",
+    "score", "decision", "email_sent", "triage_score", "triage_key", "requirements_hash",
+    "duplicate_of", "reviewed_hash", "emails_delivered", "tokens_full", "tokens_compact",
+    "created_at", "updated_at",
+)
+SORTABLE_COLUMNS = {"score", "triage_score", "candidate_name", "name", "created_at", "decision"}
+
+# Match levels shown in the results view: selected candidates are strong matches,
+# rejected ones are moderate from MODERATE_MATCH_SCORE up and poor below it
+MATCH_LEVELS = ("strong", "moderate", "poor")
+MODERATE_MATCH_SCORE = 50
+MATCH_SQL = (
+    "CASE WHEN decision = 'Selected' COLLATE NOCASE THEN 'strong' "
+    f"WHEN COALESCE(score, 0) >= {MODERATE_MATCH_SCORE} THEN 'moderate' ELSE 'poor' END"
+)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS candidates (
+    id TEXT PRIMARY KEY,
+    job_id TEXT NOT NULL,
+    name TEXT NOT NULL,
+    path TEXT NOT NULL,
+    content_hash TEXT,
+    analyzed INTEGER NOT NULL DEFAULT 0,
+    candidate_name TEXT,
+    email TEXT,
+    score REAL,
+    decision TEXT,
+    email_sent INTEGER NOT NULL DEFAULT 0,
+    triage_score REAL,
+    triage_key TEXT,
+    requirements_hash TEXT,
+    duplicate_of TEXT,
+    reviewed_hash TEXT,
+    emails_delivered INTEGER NOT NULL DEFAULT 0,
+    tokens_full INTEGER,
+    tokens_compact INTEGER,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_candidates_job ON candidates (job_id, created_at);
+CREATE INDEX IF NOT EXISTS idx_candidates_job_name ON candidates (job_id, name);
+CREATE INDEX IF NOT EXISTS idx_candidates_score ON candidates (job_id, analyzed, score);
+CREATE INDEX IF NOT EXISTS idx_candidates_decision ON candidates (job_id, decision);
+CREATE INDEX IF NOT EXISTS idx_candidates_email_sent ON candidates (job_id, email_sent);
+CREATE INDEX IF NOT EXISTS idx_candidates_triage ON candidates (job_id, analyzed, triage_score);
+CREATE INDEX IF NOT EXISTS idx_candidates_hash ON candidates (content_hash);
+CREATE INDEX IF NOT EXISTS idx_candidates_job_hash ON candidates (job_id, content_hash);
+
+CREATE TABLE IF NOT EXISTS candidate_details (
+    id TEXT PRIMARY KEY REFERENCES candidates (id) ON DELETE CASCADE,
+    result_json TEXT,
+    features_json TEXT,
+    questions_text TEXT,
+    minhash BLOB
+);
+
+-- Verdicts of pool candidates against other roles (multi-role screening)
+CREATE TABLE IF NOT EXISTS role_scores (
+    candidate_id TEXT NOT NULL REFERENCES candidates (id) ON DELETE CASCADE,
+    role_id TEXT NOT NULL,
+    requirements_hash TEXT,
+    score REAL,
+    decision TEXT,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (candidate_id, role_id)
+);
+CREATE INDEX IF NOT EXISTS idx_role_scores_role ON role_scores (role_id, score);
+
+CREATE TABLE IF NOT EXISTS jobs (
+    job_id TEXT PRIMARY KEY,
+    requirements TEXT NOT NULL,
+    profile_json TEXT NOT NULL,
+    updated_at REAL NOT NULL
+);
+
+-- Every saved revision of a job's requirements, numbered from 1
+CREATE TABLE IF NOT EXISTS job_versions (
+    job_id TEXT NOT NULL,
+    version INTEGER NOT NULL,
+    requirements TEXT NOT NULL,
+    profile_json TEXT NOT NULL,
+    requirements_hash TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    PRIMARY KEY (job_id, version)
+);
+
+CREATE TABLE IF NOT EXISTS store_meta (
+    key TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO store_meta VALUES ('data_version', 0);
+
+-- Per-job counter of changes to what results views and exports show; triage scores,
+-- signatures and duplicate links are left out so screening uploads does not bump it
+CREATE TABLE IF NOT EXISTS job_results_versions (
+    job_id TEXT PRIMARY KEY,
+    version INTEGER NOT NULL
+);
+CREATE TRIGGER IF NOT EXISTS trg_results_version_update
+AFTER UPDATE OF analyzed, candidate_name, email, score, decision, email_sent ON candidates
+BEGIN
+    INSERT INTO job_results_versions VALUES (NEW.job_id, 1)
+    ON CONFLICT (job_id) DO UPDATE SET version = version + 1;
+END;
+CREATE TRIGGER IF NOT EXISTS trg_results_version_delete
+AFTER DELETE ON candidates
+BEGIN
+    INSERT INTO job_results_versions VALUES (OLD.job_id, 1)
+    ON CONFLICT (job_id) DO UPDATE SET version = version + 1;
+END;
+CREATE TRIGGER IF NOT EXISTS trg_results_version_details
+AFTER UPDATE OF result_json, questions_text ON candidate_details
+BEGIN
+    INSERT INTO job_results_versions SELECT job_id, 1 FROM candidates WHERE id = NEW.id
+    ON CONFLICT (job_id) DO UPDATE SET version = version + 1;
+END;
+"""
+
+# Columns added after the first release: (table, column, type)
+ADDED_COLUMNS = (
+    ("candidates", "duplicate_of", "TEXT"),
+    ("candidate_details", "minhash", "BLOB"),
+    ("candidates", "reviewed_hash", "TEXT"),
+    ("candidates", "emails_delivered", "INTEGER NOT NULL DEFAULT 0"),
+    ("candidates", "tokens_full", "INTEGER"),
+    ("candidates", "tokens_compact", "INTEGER"),
+)
+
+
+def job_id_from_title(job_title):
+    """Derive a stable job identifier from a job title"""
+    slug = re.sub(r"[^a-z0-9]+", "-", (job_title or "").lower()).strip("-")
+    return slug or DEFAULT_JOB_ID
+
+
+class CandidateStore:
+    """
+    Persistent store of uploaded resumes and their analysis results
+
+    Summary columns (score, decision, email_sent, ...) are indexed per job so
+    listing, sorting and counting never scan the analysis text. Verdict
+    JSON, features and interview questions are only loaded on demand via
+    get_candidate(). Every write bumps a store-wide data version that derived
+    views (rankings) use to know when to rebuild; exports follow a per-job
+    results version that only changes with what they contain.
+    """
+
+    def __init__(self, db_path=CANDIDATE_DB_PATH):
+        self.db_path = db_path
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        conn = self._connect()
+        self._migrate(conn)
+        conn.executescript(SCHEMA)
+
+    @staticmethod
+    def _migrate(conn):
+        """Add columns introduced since the database was created"""
+        for table, column, column_type in ADDED_COLUMNS:
+            columns = {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+            if columns and column not in columns:
+                conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {column_type}")
+
+    def _connect(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA foreign_keys=ON")
+            self._local.conn = conn
+        return conn
+
+    def _write(self, sql, params=()):
+        """Run one write statement and bump the data version in the same transaction"""
+        with self._connect() as conn:
+            cursor = conn.execute(sql, params)
+            conn.execute("UPDATE store_meta SET value = value + 1 WHERE key = 'data_version'")
+            return cursor.rowcount
+
+    @staticmethod
+    def _summary(row):
+        data = dict(row)
+        data["analyzed"] = bool(data["analyzed"])
+        data["email_sent"] = bool(data["email_sent"])
+        return data
+
+    def data_version(self):
+        """Monotonic counter incremented by every write"""
+        return self._connect().execute(
+            "SELECT value FROM store_meta WHERE key = 'data_version'").fetchone()[0]
+
+    def results_version(self, job_id):
+        """Counter incremented whenever the results or export data of one job change"""
+        row = self._connect().execute(
+            "SELECT version FROM job_results_versions WHERE job_id = ?", (job_id,)).fetchone()
+        return row[0] if row else 0
+
+    # ------------------------------------------------------------------ writes
+
+    def add_candidate(self, job_id, name, path, content_hash=None):
+        """
+        Register an uploaded resume
+
+        Args:
+            job_id: Job the resume was uploaded for
+            name: Original file name
+            path: Location of the PDF
+            content_hash: SHA-256 of the PDF bytes
+
+        Returns:
+            str: New candidate ID
+        """
+        candidate_id = str(uuid.uuid4())
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO candidates (id, job_id, name, path, content_hash, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (candidate_id, job_id, name, path, content_hash, now, now))
+            conn.execute("INSERT INTO candidate_details (id) VALUES (?)", (candidate_id,))
+            conn.execute("UPDATE store_meta SET value = value + 1 WHERE key = 'data_version'")
+        return candidate_id
+
+    def delete_candidate(self, candidate_id):
+        """Delete a candidate and its details; returns (path, content_hash), or None if unknown"""
+        conn = self._connect()
+        row = conn.execute(
+            "SELECT path, content_hash FROM candidates WHERE id = ?", (candidate_id,)).fetchone()
+        if row is None:
+            return None
+        duplicates = [r["id"] for r in conn.execute(
+            "SELECT id FROM candidates WHERE duplicate_of = ? ORDER BY created_at", (candidate_id,))]
+        with conn:
+            conn.execute("DELETE FROM candidates WHERE id = ?", (candidate_id,))
+            if duplicates:
+                # Promote the oldest near-duplicate so the group keeps one representative
+                conn.execute("UPDATE candidates SET duplicate_of = NULL WHERE id = ?", (duplicates[0],))
+                conn.execute("UPDATE candidates SET duplicate_of = ? WHERE duplicate_of = ?",
+                             (duplicates[0], candidate_id))
+            conn.execute("UPDATE store_meta SET value = value + 1 WHERE key = 'data_version'")
+        return row["path"], row["content_hash"]
+
+    def save_result(self, candidate_id, result, requirements_hash=None):
+        """
+        Store a parsed analyzer verdict
+
+        Interview questions returned by the fused analyzer are moved out of the
+        verdict into questions_text; existing questions are kept otherwise.
+
+        Args:
+            candidate_id: Candidate ID
+            result: Parsed verdict dict from the analyzer
+            requirements_hash: Hash of the job requirements the verdict was produced for
+        """
+        result = dict(result)
+        questions_text = _questions_text(result.pop("interview_questions", None))
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE candidates SET analyzed = 1, candidate_name = ?, email = ?, score = ?, "
+                "decision = ?, requirements_hash = ?, updated_at = ? WHERE id = ?",
+                (result.get("name"), result.get("email"), _score(result.get("resume_score")),
+                 result.get("selection_decision"), requirements_hash, time.time(), candidate_id))
+            conn.execute(
+                "UPDATE candidate_details SET result_json = ?, features_json = ?, "
+                "questions_text = COALESCE(?, questions_text) WHERE id = ?",
+                (json.dumps(result), json.dumps(result.get("features") or {}), questions_text, candidate_id))
+            conn.execute("UPDATE store_meta SET value = value + 1 WHERE key = 'data_version'")
+
+    def save_role_result(self, candidate_id, role_id, result, requirements_hash=None):
+        """
+        Store a candidate's verdict against another role than the job it was uploaded to
+
+        Args:
+            candidate_id: Candidate ID
+            role_id: Job ID of the role
+            result: Parsed verdict dict from the analyzer
+            requirements_hash: Hash of the role requirements the verdict was produced for
+        """
+        self._write(
+            "INSERT OR REPLACE INTO role_scores (candidate_id, role_id, requirements_hash, score, decision, "
+            "updated_at) VALUES (?, ?, ?, ?, ?, ?)",
+            (candidate_id, role_id, requirements_hash, _score(result.get("resume_score")),
+             result.get("selection_decision"), time.time()))
+
+    def role_results(self, job_id, role_hashes):
+        """
+        Load the role verdicts of a job's candidates that are still current
+
+        Args:
+            job_id: Job whose candidates form the pool
+            role_hashes: {role_id: current requirements hash}; verdicts for other hashes are stale
+
+        Returns:
+            dict: {(candidate_id, role_id): {"score", "decision"}}
+        """
+        if not role_hashes:
+            return {}
+        placeholders = ", ".join("?" * len(role_hashes))
+        rows = self._connect().execute(
+            "SELECT r.candidate_id, r.role_id, r.requirements_hash, r.score, r.decision FROM role_scores r "
+            "JOIN candidates c ON c.id = r.candidate_id "
+            f"WHERE c.job_id = ? AND r.role_id IN ({placeholders})", [job_id, *role_hashes])
+        return {(row["candidate_id"], row["role_id"]): {"score": row["score"], "decision": row["decision"]}
+                for row in rows if row["requirements_hash"] == role_hashes[row["role_id"]]}
+
+    def update_decision(self, candidate_id, decision, feedback):
+        """Apply an HR override of the decision and feedback"""
+        candidate = self.get_candidate(candidate_id)
+        if candidate is None or candidate["result"] is None:
+            return
+        result = dict(candidate["result"], selection_decision=decision, feedback=feedback)
+        with self._connect() as conn:
+            conn.execute("UPDATE candidates SET decision = ?, updated_at = ? WHERE id = ?",
+                         (decision, time.time(), candidate_id))
+            conn.execute("UPDATE candidate_details SET result_json = ? WHERE id = ?",
+                         (json.dumps(result), candidate_id))
+            conn.execute("UPDATE store_meta SET value = value + 1 WHERE key = 'data_version'")
+
+    def set_questions(self, candidate_id, questions_text):
+        """Store generated or edited interview questions"""
+        self._write("UPDATE candidate_details SET questions_text = ? WHERE id = ?",
+                    (questions_text, candidate_id))
+
+    def set_email_sent(self, candidate_id, sent=True):
+        """Record that the candidate was notified"""
+        self._write("UPDATE candidates SET email_sent = ?, emails_delivered = 0, updated_at = ? WHERE id = ?",
+                    (int(sent), time.time(), candidate_id))
+
+    def set_emails_delivered(self, candidate_id, count):
+        """Record how many of a candidate's notification emails went out before a failure"""
+        self._write("UPDATE candidates SET emails_delivered = ?, updated_at = ? WHERE id = ?",
+                    (count, time.time(), candidate_id))
+
+    def set_triage_scores(self, scores, triage_key):
+        """
+        Store local triage scores
+
+        Args:
+            scores: Iterable of (candidate_id, score) pairs
+            triage_key: Identifier of the job profile the scores were computed for
+        """
+        with self._connect() as conn:
+            conn.executemany(
+                "UPDATE candidates SET triage_score = ?, triage_key = ? WHERE id = ?",
+                ((score, triage_key, candidate_id) for candidate_id, score in scores))
+            conn.execute("UPDATE store_meta SET value = value + 1 WHERE key = 'data_version'")
+
+    def set_minhash(self, candidate_id, signature):
+        """Store the MinHash signature (raw bytes) of a resume's text"""
+        with self._connect() as conn:
+            conn.execute("UPDATE candidate_details SET minhash = ? WHERE id = ?", (signature, candidate_id))
+
+    def set_token_counts(self, candidate_id, tokens_full, tokens_compact):
+        """Store a resume's estimated prompt tokens before and after compaction"""
+        # Derived from the PDF alone, so like the signature it does not bump the data version
+        with self._connect() as conn:
+            conn.execute("UPDATE candidates SET tokens_full = ?, tokens_compact = ? WHERE id = ?",
+                         (tokens_full, tokens_compact, candidate_id))
+
+    def mark_duplicate(self, candidate_id, duplicate_of):
+        """Link a resume to the near-identical resume it duplicates"""
+        self._write("UPDATE candidates SET duplicate_of = ?, updated_at = ? WHERE id = ?",
+                    (duplicate_of, time.time(), candidate_id))
+
+    # ------------------------------------------------------------------- reads
+
+    def get_candidate(self, candidate_id):
+        """
+        Load one candidate including the large fields
+
+        Returns:
+            dict: Summary columns plus "result" (dict or None) and "questions_text", or None
+        """
+        row = self._connect().execute(
+            f"SELECT {', '.join('c.' + c for c in SUMMARY_COLUMNS)}, d.result_json, d.questions_text "
+            "FROM candidates c LEFT JOIN candidate_details d ON d.id = c.id WHERE c.id = ?",
+            (candidate_id,)).fetchone()
+        if row is None:
+            return None
+        data = self._summary(row)
+        result_json = data.pop("result_json")
+        data["result"] = json.loads(result_json) if result_json else None
+        return data
+
+    def get_summaries(self, candidate_ids):
+        """Load summary rows for specific candidates, preserving the given order"""
+        candidate_ids = list(candidate_ids)
+        rows = {}
+        # Stay under SQLite's bound-parameter limit
+        for start in range(0, len(candidate_ids), 900):
+            chunk = candidate_ids[start:start + 900]
+            placeholders = ", ".join("?" * len(chunk))
+            for row in self._connect().execute(
+                    f"SELECT {', '.join(SUMMARY_COLUMNS)} FROM candidates WHERE id IN ({placeholders})",
+                    chunk):
+                rows[row["id"]] = self._summary(row)
+        return [rows[cid] for cid in candidate_ids if cid in rows]
+
+    def _filters(self, job_id, analyzed=None, decision=None, min_score=None, max_score=None,
+                 email_sent=None, below_triage=None, duplicates=None, match=None, stale_for=None):
+        clauses = ["job_id = ?"]
+        params = [job_id]
+        if analyzed is not None:
+            clauses.append("analyzed = ?")
+            params.append(int(analyzed))
+        if decision is not None:
+            clauses.append("decision = ? COLLATE NOCASE")
+            params.append(decision)
+        if min_score is not None:
+            clauses.append("score >= ?")
+            params.append(min_score)
+        if max_score is not None:
+            clauses.append("score <= ?")
+            params.append(max_score)
+        if email_sent is not None:
+            clauses.append("email_sent = ?")
+            params.append(int(email_sent))
+        if below_triage is not None:
+            # Exclude resumes screened out by local triage
+            clauses.append("(triage_score IS NULL OR triage_score >= ?)")
+            params.append(below_triage)
+        if duplicates is not None:
+            clauses.append("duplicate_of IS NOT NULL" if duplicates else "duplicate_of IS NULL")
+        if stale_for is not None:
+            # Verdicts neither produced for nor carried over to these requirements
+            clauses.append("analyzed = 1 AND requirements_hash IS NOT ? AND reviewed_hash IS NOT ?")
+            params += [stale_for, stale_for]
+        if match is not None:
+            if match not in MATCH_LEVELS:
+                raise ValueError(f"Unknown match level {match!r}")
+            clauses.append(f"{MATCH_SQL} = ?")
+            params.append(match)
+        return " AND ".join(clauses), params
+
+    def list_candidates(self, job_id, order_by="created_at", descending=False, limit=None, offset=0,
+                        **filters):
+        """
+        List candidate summaries for a job, one page at a time
+
+        Args:
+            job_id: Job to list
+            order_by: One of SORTABLE_COLUMNS
+            descending: Sort direction
+            limit: Page size (None for all)
+            offset: Number of rows to skip
+            **filters: analyzed, decision, min_score, max_score, email_sent, below_triage,
+                duplicates, match, stale_for (requirements hash)
+
+        Returns:
+            list: Candidate summary dicts (no verdict JSON or questions)
+        """
+        if order_by not in SORTABLE_COLUMNS:
+            raise ValueError(f"Cannot sort candidates by {order_by!r}")
+        where, params = self._filters(job_id, **filters)
+        direction = "DESC" if descending else "ASC"
+        sql = (f"SELECT {', '.join(SUMMARY_COLUMNS)} FROM candidates WHERE {where} "
+               f"ORDER BY {order_by} IS NULL, {order_by} {direction}, created_at")
+        if limit is not None:
+            sql += " LIMIT ? OFFSET ?"
+            params += [limit, offset]
+        return [self._summary(row) for row in self._connect().execute(sql, params)]
+
+    def list_candidate_ids(self, job_id, **filters):
+        """Return the IDs of a job's candidates matching the same filters as list_candidates"""
+        where, params = self._filters(job_id, **filters)
+        return [row[0] for row in self._connect().execute(f"SELECT id FROM candidates WHERE {where}", params)]
+
+    def count_candidates(self, job_id, **filters):
+        """Count candidates for a job matching the same filters as list_candidates"""
+        where, params = self._filters(job_id, **filters)
+        return self._connect().execute(
+            f"SELECT COUNT(*) FROM candidates WHERE {where}", params).fetchone()[0]
+
+    def job_stats(self, job_id):
+        """Return total, analyzed, selected and near-duplicate counts for a job in one query"""
+        row = self._connect().execute(
+            "SELECT COUNT(*), COALESCE(SUM(analyzed), 0), "
+            "COALESCE(SUM(CASE WHEN analyzed = 1 AND decision = 'Selected' COLLATE NOCASE THEN 1 ELSE 0 END), 0), "
+            "COUNT(duplicate_of) "
+            "FROM candidates WHERE job_id = ?", (job_id,)).fetchone()
+        return {"total": row[0], "analyzed": row[1], "selected": row[2], "duplicates": row[3]}
+
+    def list_triage_stale(self, job_id, triage_key):
+        """Return (candidate_id, content_hash, path) for candidates not yet triaged against this job profile"""
+        return [(row["id"], row["content_hash"], row["path"]) for row in self._connect().execute(
+            "SELECT id, content_hash, path FROM candidates WHERE job_id = ? AND triage_key IS NOT ?",
+            (job_id, triage_key))]
+
+    def hash_in_use(self, content_hash):
+        """Check whether any candidate, in any job, still references these PDF bytes"""
+        return self._connect().execute(
+            "SELECT 1 FROM candidates WHERE content_hash = ? LIMIT 1", (content_hash,)).fetchone() is not None
+
+    def list_missing_questions(self, job_id):
+        """Return IDs of selected, non-duplicate candidates that have no interview questions yet"""
+        return [row["id"] for row in self._connect().execute(
+            "SELECT c.id FROM candidates c JOIN candidate_details d ON d.id = c.id "
+            "WHERE c.job_id = ? AND c.analyzed = 1 AND c.decision = 'Selected' COLLATE NOCASE "
+            "AND c.duplicate_of IS NULL AND d.questions_text IS NULL ORDER BY c.score DESC", (job_id,))]
+
+    def find_by_hash(self, job_id, content_hash):
+        """Return the ID of a resume with exactly these PDF bytes in the job, or None"""
+        row = self._connect().execute(
+            "SELECT id FROM candidates WHERE job_id = ? AND content_hash = ? LIMIT 1",
+            (job_id, content_hash)).fetchone()
+        return row["id"] if row else None
+
+    def iter_minhashes(self, job_id):
+        """Yield (candidate_id, duplicate_of, signature bytes) for resumes with a stored signature"""
+        rows = self._connect().execute(
+            "SELECT c.id, c.duplicate_of, d.minhash FROM candidates c "
+            "JOIN candidate_details d ON d.id = c.id WHERE c.job_id = ? AND d.minhash IS NOT NULL", (job_id,))
+        for row in rows:
+            yield row["id"], row["duplicate_of"], row["minhash"]
+
+    def duplicate_counts(self, job_id):
+        """Return {candidate_id: number of near-duplicates collapsed into it} for a job"""
+        return dict(self._connect().execute(
+            "SELECT duplicate_of, COUNT(*) FROM candidates WHERE job_id = ? AND duplicate_of IS NOT NULL "
+            "GROUP BY duplicate_of", (job_id,)).fetchall())
+
+    def iter_features(self, job_id):
+        """Yield (candidate_id, result-like dict with resume_score and features) for analyzed candidates"""
+        rows = self._connect().execute(
+            "SELECT c.id, c.score, d.features_json FROM candidates c "
+            "JOIN candidate_details d ON d.id = c.id "
+            "WHERE c.job_id = ? AND c.analyzed = 1 AND c.duplicate_of IS NULL", (job_id,))
+        for row in rows:
+            features = json.loads(row["features_json"]) if row["features_json"] else {}
+            yield row["id"], {"resume_score": row["score"], "features": features}
+
+    def iter_results(self, job_id, batch_size=500, candidate_ids=None):
+        """
+        Stream analyzed candidates with their full results, a batch at a time
+
+        Args:
+            job_id: Job to read
+            batch_size: Rows loaded per query
+            candidate_ids: Optional IDs to read instead of every analyzed candidate,
+                yielded in the given order
+
+        Yields:
+            dict: Candidate summary plus "result" and "questions_text"
+        """
+        columns = f"{', '.join('c.' + c for c in SUMMARY_COLUMNS)}, d.result_json, d.questions_text"
+        if candidate_ids is not None:
+            candidate_ids = list(candidate_ids)
+            batches = (candidate_ids[start:start + batch_size]
+                       for start in range(0, len(candidate_ids), batch_size))
+            for chunk in batches:
+                placeholders = ", ".join("?" * len(chunk))
+                rows = {row["id"]: row for row in self._connect().execute(
+                    f"SELECT {columns} FROM candidates c JOIN candidate_details d ON d.id = c.id "
+                    f"WHERE c.job_id = ? AND c.analyzed = 1 AND c.id IN ({placeholders})", [job_id, *chunk])}
+                for candidate_id in chunk:
+                    if candidate_id in rows:
+                        yield self._result_row(rows[candidate_id])
+            return
+
+        last_id = ""
+        while True:
+            rows = self._connect().execute(
+                f"SELECT {columns} FROM candidates c JOIN candidate_details d ON d.id = c.id "
+                "WHERE c.job_id = ? AND c.analyzed = 1 AND c.id > ? ORDER BY c.id LIMIT ?",
+                (job_id, last_id, batch_size)).fetchall()
+            if not rows:
+                return
+            for row in rows:
+                yield self._result_row(row)
+            last_id = rows[-1]["id"]
+
+    def _result_row(self, row):
+        data = self._summary(row)
+        result_json = data.pop("result_json")
+        data["result"] = json.loads(result_json) if result_json else None
+        return data
+
+    def move_job(self, old_job_id, new_job_id):
+        """Reassign every candidate of one job to another; returns the number moved"""
+        return self._write("UPDATE candidates SET job_id = ? WHERE job_id = ?", (new_job_id, old_job_id))
+
+    def save_job(self, job_id, job_requirements, profile):
+        """
+        Persist the requirements text and structured profile of a job
+
+        A new entry is added to the job's version history whenever the
+        requirements change.
+
+        Returns:
+            int: Version number of the saved requirements
+        """
+        req_hash = hash_requirements(job_requirements)
+        now = time.time()
+        with self._connect() as conn:
+            latest = conn.execute(
+                "SELECT version, requirements_hash FROM job_versions WHERE job_id = ? "
+                "ORDER BY version DESC LIMIT 1", (job_id,)).fetchone()
+            if latest is None:
+                # Jobs saved before versioning start their history with the stored revision
+                previous = conn.execute(
+                    "SELECT requirements, profile_json, updated_at FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+                if previous is not None:
+                    previous_hash = hash_requirements(previous["requirements"])
+                    conn.execute(
+                        "INSERT INTO job_versions VALUES (?, 1, ?, ?, ?, ?)",
+                        (job_id, previous["requirements"], previous["profile_json"], previous_hash,
+                         previous["updated_at"]))
+                    latest = (1, previous_hash)
+            version = latest[0] if latest else 0
+            if latest is None or latest[1] != req_hash:
+                version += 1
+                conn.execute("INSERT INTO job_versions VALUES (?, ?, ?, ?, ?, ?)",
+                             (job_id, version, job_requirements, json.dumps(profile), req_hash, now))
+            conn.execute(
+                "INSERT OR REPLACE INTO jobs (job_id, requirements, profile_json, updated_at) VALUES (?, ?, ?, ?)",
+                (job_id, job_requirements, json.dumps(profile), now))
+            conn.execute("UPDATE store_meta SET value = value + 1 WHERE key = 'data_version'")
+        return version
+
+    def job_versions(self, job_id):
+        """Return the job's requirement versions, oldest first, as dicts with version,
+        requirements, profile, requirements_hash and created_at"""
+        return [
+            {"version": row["version"], "requirements": row["requirements"],
+             "profile": json.loads(row["profile_json"]), "requirements_hash": row["requirements_hash"],
+             "created_at": row["created_at"]}
+            for row in self._connect().execute(
+                "SELECT * FROM job_versions WHERE job_id = ? ORDER BY version", (job_id,))
+        ]
+
+    def stale_verdicts(self, job_id, requirements_hash):
+        """Return {candidate_id: requirements hash it was scored with} for stale, non-duplicate verdicts"""
+        where, params = self._filters(job_id, stale_for=requirements_hash, duplicates=False)
+        return dict(self._connect().execute(
+            f"SELECT id, requirements_hash FROM candidates WHERE {where}", params).fetchall())
+
+    def mark_reviewed(self, candidate_ids, requirements_hash):
+        """Carry verdicts over to new requirements without re-scoring them"""
+        candidate_ids = list(candidate_ids)
+        with self._connect() as conn:
+            for start in range(0, len(candidate_ids), 900):
+                chunk = candidate_ids[start:start + 900]
+                conn.execute(
+                    f"UPDATE candidates SET reviewed_hash = ? WHERE id IN ({', '.join('?' * len(chunk))})",
+                    [requirements_hash, *chunk])
+            conn.execute("UPDATE store_meta SET value = value + 1 WHERE key = 'data_version'")
+
+    def get_job(self, job_id):
+        """Return {"requirements", "profile"} for a saved job, or None"""
+        row = self._connect().execute(
+            "SELECT requirements, profile_json FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+        return {"requirements": row["requirements"], "profile": json.loads(row["profile_json"])}
+
+    def list_jobs(self):
+        """Return the IDs of all saved jobs and jobs that have candidates"""
+        return [row[0] for row in self._connect().execute(
+            "SELECT job_id FROM jobs UNION SELECT DISTINCT job_id FROM candidates ORDER BY 1")]
+
+
+def match_level(score, decision):
+    """Python twin of MATCH_SQL for rows already loaded"""
+    if (decision or "").lower() == "selected":
+        return "strong"
+    return "moderate" if (score or 0) >= MODERATE_MATCH_SCORE else "poor"
+
+
+def _score(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def _questions_text(questions):
+    """Normalize interview questions (string or list) to numbered text, or None if empty"""
+    if isinstance(questions, (list, tuple)):
+        questions = "\n".join(f"{i}. {str(q).strip()}" for i, q in enumerate(questions, start=1) if str(q).strip())
+    questions = (questions or "").strip() if isinstance(questions, str) else ""
+    return questions or None
+
+
+_candidate_store = None
+_store_lock = threading.Lock()
+
+
+def get_candidate_store():
+    """Return the process-wide candidate store"""
+    global _candidate_store
+    with _store_lock:
+        if _candidate_store is None:
+            _candidate_store = CandidateStore()
+        return _candidate_store
@@ -0,0 +1,145 @@
+# compaction.py
+# Section-aware resume compaction: strips PDF boilerplate and fits resumes into a token budget
+import re
+from collections import Counter
+from utils.tokens import estimate_tokens, CHARS_PER_TOKEN
+
+# Heading variants recognised for each section
+SECTION_HEADINGS = {
+    "summary": ("summary", "professional summary", "profile", "professional profile", "objective",
+                "career objective", "about me", "about"),
+    "experience": ("experience", "work experience", "professional experience", "employment",
+                   "employment history", "work history", "career history", "internships", "internship"),
+    "skills": ("skills", "technical skills", "key skills", "core skills", "core competencies",
+               "competencies", "technologies", "tech stack", "tools", "tools and technologies"),
+    "education": ("education", "academic background", "academics", "qualifications",
+                  "educational qualifications"),
+    "projects": ("projects", "personal projects", "key projects", "academic projects", "side projects"),
+    "certifications": ("certifications", "certificates", "licenses", "licenses and certifications",
+                       "courses", "training"),
+    "achievements": ("achievements", "awards", "honors", "honours", "accomplishments", "publications"),
+}
+
+# Order of the compact output, and the order in which sections are trimmed (last first)
+SECTION_PRIORITY = ("contact", "summary", "skills", "experience", "projects", "education",
+                    "certifications", "achievements", "other")
+# Lines every section keeps even when the budget is tight
+MIN_SECTION_LINES = 3
+# Lines repeated on at least this many pages are page headers/footers
+REPEATED_LINE_PAGES = 2
+MAX_BOILERPLATE_LINE_CHARS = 120
+# Repeats of lines at least this long are duplicated bullets; shorter repeats (titles, dates) are kept
+MIN_DUPLICATE_LINE_CHARS = 40
+MAX_CONTACT_LINES = 6
+
+_HEADING_LOOKUP = {variant: section for section, variants in SECTION_HEADINGS.items() for variant in variants}
+_PAGE_NUMBER = re.compile(r"^(page\s*)?\d+(\s*(of|/)\s*\d+)?$", re.IGNORECASE)
+_HEADING_CHARS = re.compile(r"[^a-z& ]+")
+_SPACES = re.compile(r"[ \t\u00a0]+")
+
+
+def _normalize_line(line):
+    return _SPACES.sub(" ", line).strip()
+
+
+def _heading_section(line):
+    """Return the section a heading line starts, or None for ordinary lines"""
+    if len(line) > 40:
+        return None
+    key = _HEADING_CHARS.sub("", line.lower()).replace("&", "and").strip()
+    return _HEADING_LOOKUP.get(" ".join(key.split()))
+
+
+def segment_resume(pages):
+    """
+    Split extracted resume pages into named sections, dropping boilerplate
+
+    Page numbers, headers/footers repeated across pages, repeated lines (such
+    as a contact block printed on every page) and whitespace runs are removed.
+    Lines before the first recognised heading form the "contact" section, up
+    to MAX_CONTACT_LINES; the rest of a longer preamble goes to "other".
+    Unrecognised headings are kept as ordinary lines of the current section.
+
+    Args:
+        pages: List of page texts
+
+    Returns:
+        dict: Section name -> list of lines, in SECTION_PRIORITY order
+    """
+    page_lines = [[_normalize_line(line) for line in (page or "").splitlines()] for page in pages]
+    page_lines = [[line for line in lines if line and not _PAGE_NUMBER.match(line)] for lines in page_lines]
+
+    # Short lines that occur on several pages are running headers or footers
+    pages_per_line = Counter(line for lines in page_lines for line in set(lines))
+    repeated = {line for line, count in pages_per_line.items()
+                if count >= REPEATED_LINE_PAGES and len(line) <= MAX_BOILERPLATE_LINE_CHARS}
+
+    sections = {name: [] for name in SECTION_PRIORITY}
+    seen = set()
+    current = "contact"
+    for lines in page_lines:
+        for line in lines:
+            heading = _heading_section(line)
+            if heading is not None:
+                current = heading
+                continue
+            key = line.lower()
+            if key in seen and (line in repeated or len(line) >= MIN_DUPLICATE_LINE_CHARS):
+                continue
+            seen.add(key)
+            if current == "contact" and len(sections["contact"]) >= MAX_CONTACT_LINES:
+                # A long preamble without a heading is usually an unlabelled summary
+                current = "other"
+            sections[current].append(line)
+    return {name: lines for name, lines in sections.items() if lines}
+
+
+def _render(sections):
+    blocks = []
+    for name, lines in sections.items():
+        if name == "contact":
+            blocks.append("\n".join(lines))
+        else:
+            blocks.append(f"## {name.upper()}\n" + "\n".join(lines))
+    return "\n\n".join(blocks)
+
+
+def compact_resume(pages, token_budget):
+    """
+    Build a compact, token-budgeted representation of a resume
+
+    When the segmented resume is still over budget, the lowest-priority
+    sections lose their trailing lines first; every section keeps at least
+    MIN_SECTION_LINES lines, and the result is hard-capped at the budget.
+
+    Args:
+        pages: List of page texts
+        token_budget: Maximum estimated tokens of the compact text (None for no limit)
+
+    Returns:
+        dict: text, tokens_before, tokens_after and per-section token counts
+    """
+    raw_text = "".join(page + "\n\n" for page in pages)
+    sections = segment_resume(pages)
+
+    if token_budget is not None:
+        # Track the length incrementally instead of re-rendering after every cut
+        chars = len(_render(sections))
+        max_chars = token_budget * CHARS_PER_TOKEN
+        for name in reversed(SECTION_PRIORITY):
+            lines = sections.get(name)
+            while lines and chars > max_chars and len(lines) > MIN_SECTION_LINES:
+                chars -= len(lines.pop()) + 1
+            if chars <= max_chars:
+                break
+
+    text = _render(sections)
+    if token_budget is not None and estimate_tokens(text) > token_budget:
+        text = text[:token_budget * CHARS_PER_TOKEN]
+
+    return {
+        "text": text,
+        "tokens_before": estimate_tokens(raw_text),
+        "tokens_after": estimate_tokens(text),
+        "sections": {name: estimate_tokens("\n".join(lines)) for name, lines in sections.items()},
+    }
@@ -0,0 +1,211 @@
+# dedup.py
+# Near-duplicate resume detection with MinHash signatures and LSH banding
+import re
+import threading
+import zlib
+import numpy as np
+from utils.blob_store import get_resume_blob_store
+from utils.candidate_store import get_candidate_store
+from utils.text_extraction import extract_pages_from_pdf
+
+NUM_PERMUTATIONS = 128
+# 16 bands of 8 rows: pairs above ~0.7 Jaccard similarity almost always share a bucket
+LSH_BANDS = 16
+SHINGLE_SIZE = 5
+NEAR_DUPLICATE_THRESHOLD = 0.8
+
+_PRIME = (1 << 31) - 1
+# Fixed seed so signatures stored in the candidate database stay comparable across restarts
+_rng = np.random.default_rng(20240229)
+_HASH_A = _rng.integers(1, _PRIME, size=NUM_PERMUTATIONS, dtype=np.uint64)
+_HASH_B = _rng.integers(0, _PRIME, size=NUM_PERMUTATIONS, dtype=np.uint64)
+
+_WORD_PATTERN = re.compile(r"[a-z0-9@.+#]+")
+
+
+def shingles(text, size=SHINGLE_SIZE):
+    """
+    Split text into overlapping word n-grams
+
+    Args:
+        text: Extracted resume text
+        size: Words per shingle
+
+    Returns:
+        set: Distinct shingles
+    """
+    words = _WORD_PATTERN.findall((text or "").lower())
+    if len(words) <= size:
+        return {" ".join(words)} if words else set()
+    return {" ".join(words[i:i + size]) for i in range(len(words) - size + 1)}
+
+
+def minhash_signature(text):
+    """
+    Compute the MinHash signature of a text
+
+    Args:
+        text: Extracted resume text
+
+    Returns:
+        numpy.ndarray: NUM_PERMUTATIONS uint32 values, or None for empty text
+    """
+    grams = shingles(text)
+    if not grams:
+        return None
+    hashes = np.fromiter((zlib.crc32(gram.encode("utf-8")) for gram in grams),
+                         dtype=np.uint64, count=len(grams))
+    # a * x + b stays below 2**63 because a < 2**31 and x < 2**32
+    permuted = (_HASH_A[:, None] * hashes[None, :] + _HASH_B[:, None]) % np.uint64(_PRIME)
+    return permuted.min(axis=1).astype(np.uint32)
+
+
+def estimate_similarity(signature_a, signature_b):
+    """Estimate the Jaccard similarity of two texts from their signatures"""
+    return float(np.mean(signature_a == signature_b))
+
+
+class MinHashLSH:
+    """
+    Banded LSH index over MinHash signatures
+
+    Each signature is split into bands; texts sharing any band are candidate
+    pairs, so a lookup touches only a few buckets instead of every resume.
+    """
+
+    def __init__(self, bands=LSH_BANDS):
+        self.bands = bands
+        self.rows = NUM_PERMUTATIONS // bands
+        self._buckets = [{} for _ in range(bands)]
+        self._signatures = {}
+
+    def __len__(self):
+        return len(self._signatures)
+
+    def _band_keys(self, signature):
+        for band in range(self.bands):
+            yield band, signature[band * self.rows:(band + 1) * self.rows].tobytes()
+
+    def add(self, key, signature):
+        """Index a signature under key"""
+        self._signatures[key] = signature
+        for band, band_key in self._band_keys(signature):
+            self._buckets[band].setdefault(band_key, []).append(key)
+
+    def best_match(self, signature, threshold=NEAR_DUPLICATE_THRESHOLD):
+        """
+        Find the most similar indexed text
+
+        Args:
+            signature: MinHash signature to look up
+            threshold: Minimum estimated Jaccard similarity
+
+        Returns:
+            tuple: (key, similarity) of the best match, or (None, 0.0)
+        """
+        candidates = set()
+        for band, band_key in self._band_keys(signature):
+            candidates.update(self._buckets[band].get(band_key, ()))
+
+        best_key, best_similarity = None, 0.0
+        for key in candidates:
+            similarity = estimate_similarity(signature, self._signatures[key])
+            if similarity >= threshold and similarity > best_similarity:
+                best_key, best_similarity = key, similarity
+        return best_key, best_similarity
+
+
+class JobDuplicateIndex:
+    """
+    LSH index of one job's stored signatures, kept up to date as resumes are signed
+
+    The job's signatures are loaded once; linking a new resume then costs
+    one signature and a few bucket lookups instead of reloading the job.
+    """
+
+    def __init__(self, job_id):
+        self.job_id = job_id
+        self._index = MinHashLSH()
+        self._roots = {}
+        self._lock = threading.Lock()
+        for candidate_id, duplicate_of, signature in get_candidate_store().iter_minhashes(job_id):
+            self._index.add(candidate_id, np.frombuffer(signature, dtype=np.uint32))
+            self._roots[candidate_id] = duplicate_of or candidate_id
+
+    def link(self, candidate_id, text):
+        """
+        Sign a new resume, store its signature and link it to a near-identical indexed resume
+
+        Args:
+            candidate_id: ID of the new resume
+            text: Its extracted text
+
+        Returns:
+            bool: True if the resume was marked as a near duplicate
+        """
+        signature = minhash_signature(text)
+        if signature is None:
+            return False
+        store = get_candidate_store()
+        # Held across lookup and insert so two new copies of a resume see each other
+        with self._lock:
+            if candidate_id in self._roots:
+                return False
+            store.set_minhash(candidate_id, signature.tobytes())
+            match, _ = self._index.best_match(signature)
+            root = self._roots[match] if match is not None else candidate_id
+            if match is not None:
+                store.mark_duplicate(candidate_id, root)
+            self._roots[candidate_id] = root
+            self._index.add(candidate_id, signature)
+        return match is not None
+
+
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+
+def get_duplicate_index(job_id):
+    """Return the process-wide near-duplicate index of a job, loading it on first use"""
+    with _indexes_lock:
+        index = _indexes.get(job_id)
+        if index is None:
+            index = _indexes[job_id] = JobDuplicateIndex(job_id)
+        return index
+
+
+def discard_duplicate_index(job_id):
+    """Drop a job's index, e.g. after deleting resumes; it is reloaded on next use"""
+    with _indexes_lock:
+        _indexes.pop(job_id, None)
+
+
+def link_near_duplicates(job_id, resume_ids):
+    """
+    Link new resumes to near-identical ones already in the job so they skip the LLM
+
+    Signatures are stored with each candidate, so only the new resumes are
+    extracted and signed.
+
+    Args:
+        job_id: Job the resumes belong to
+        resume_ids: IDs of newly added resumes
+
+    Returns:
+        int: Number of new resumes marked as near duplicates
+    """
+    store = get_candidate_store()
+    blobs = get_resume_blob_store()
+    index = get_duplicate_index(job_id)
+    duplicates = 0
+    for row in store.get_summaries(resume_ids):
+        pdf_bytes = blobs.get(row["content_hash"], row["path"])
+        if pdf_bytes is None:
+            continue
+        try:
+            text = "\n".join(extract_pages_from_pdf(pdf_bytes))
+        except Exception:
+            # Unreadable PDFs are reported by ingestion; they cannot be compared
+            continue
+        duplicates += index.link(row["id"], text)
+    return duplicates
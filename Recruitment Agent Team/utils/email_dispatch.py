@@ -0,0 +1,311 @@
+# email_dispatch.py
+# Candidate email composition and a pooled, rate-limited SMTP dispatcher
+import smtplib
+import socket
+import threading
+import time
+from email.mime.text import MIMEText
+from email.mime.multipart import MIMEMultipart
+from config import SMTP_SERVER, SMTP_PORT, EMAIL_RATE_PER_MINUTE
+from utils.candidate_store import get_candidate_store
+from utils.jobs import get_job_registry
+
+# Errors after which reconnecting and retrying is worthwhile. SMTPException
+# subclasses OSError, so protocol errors are handled before these.
+TRANSIENT_ERRORS = (smtplib.SMTPServerDisconnected, socket.timeout, ConnectionError)
+
+
+def build_candidate_messages(sender, name, email, selected, questions=None):
+    """
+    Compose the result email (and the questions email for selected candidates)
+
+    Args:
+        sender: From address
+        name: Candidate name
+        email: Candidate email address
+        selected: "Selected" or "Rejected"
+        questions: Optional interview questions for selected candidates
+
+    Returns:
+        list: MIMEMultipart messages to send, in order
+    """
+    subject = "Application Result"
+    messages = []
+    if selected.lower() == "selected":
+        body = f"""
+Dear {name},
+
+Congratulations! 🎉
+
+After reviewing your resume, we are pleased to inform you that you have been selected for the next steps in our hiring process.
+
+You will receive test questions for your evaluation shortly. Please reply to this email to submit your answers.
+
+All the best,
+
+Best regards,
+Recruitment Team
+"""
+    elif selected.lower() == "rejected":
+        body = f"""
+Dear {name},
+
+Thank you for applying to our company.
+
+After a thorough review of your resume, we regret to inform you that you were not selected for the role at this time.
+
+We encourage you to apply again in the future and wish you the very best in your career.
+
+Warm regards,
+Recruitment Team
+"""
+    else:
+        return messages
+
+    messages.append(_compose(sender, email, subject, body))
+
+    # If questions are provided, send them in another email
+    if selected.lower() == "selected" and questions:
+        questions_subject = "Technical Assessment Questions"
+        questions_body = f"""
+Dear {name},
+
+As part of our selection process, please answer the following technical questions:
+
+{questions}
+
+Please reply to this email with your answers.
+
+Best regards,
+Recruitment Team
+"""
+        messages.append(_compose(sender, email, questions_subject, questions_body))
+
+    return messages
+
+
+def _compose(sender, recipient, subject, body):
+    msg = MIMEMultipart()
+    msg['From'] = sender
+    msg['To'] = recipient
+    msg['Subject'] = subject
+    msg.attach(MIMEText(body, 'plain'))
+    return msg
+
+
+class EmailDispatcher:
+    """
+    Send many messages over one authenticated SMTP session
+
+    The connection (and its STARTTLS handshake and login) is opened once and
+    reused. Sends are spaced to respect rate_per_minute, transient failures
+    reconnect and retry with backoff, and throughput is tracked in stats.
+    With use_tls=False and no credentials it talks to a plain local server
+    such as aiosmtpd.
+
+    Usage:
+        with EmailDispatcher(username=..., password=...) as dispatcher:
+            dispatcher.send(msg)
+    """
+
+    def __init__(self, host=SMTP_SERVER, port=SMTP_PORT, username=None, password=None, use_tls=True,
+                 rate_per_minute=EMAIL_RATE_PER_MINUTE, max_retries=3, backoff_seconds=2.0, timeout=30):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.use_tls = use_tls
+        self.min_interval = 60.0 / rate_per_minute if rate_per_minute else 0.0
+        self.max_retries = max_retries
+        self.backoff_seconds = backoff_seconds
+        self.timeout = timeout
+        self._server = None
+        self._last_send = 0.0
+        self._started = None
+        self.stats = {"sent": 0, "failed": 0, "retries": 0, "connections": 0}
+
+    def __enter__(self):
+        self.connect()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def connect(self):
+        """Open and authenticate the SMTP session"""
+        self.close()
+        server = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        if self.use_tls:
+            server.starttls()
+        if self.username and self.password:
+            server.login(self.username, self.password)
+        self._server = server
+        self.stats["connections"] += 1
+        if self._started is None:
+            self._started = time.perf_counter()
+
+    def close(self):
+        """Close the SMTP session if one is open"""
+        if self._server is not None:
+            try:
+                self._server.quit()
+            except (smtplib.SMTPException, OSError):
+                pass
+            self._server = None
+
+    def _throttle(self):
+        wait = self._last_send + self.min_interval - time.monotonic()
+        if wait > 0:
+            time.sleep(wait)
+        self._last_send = time.monotonic()
+
+    def send(self, msg):
+        """
+        Send one message, reconnecting and retrying on transient failures
+
+        Args:
+            msg: email.message.Message to send
+
+        Raises:
+            smtplib.SMTPException: Permanent failure or retries exhausted
+        """
+        for attempt in range(self.max_retries + 1):
+            try:
+                if self._server is None:
+                    self.connect()
+                self._throttle()
+                self._server.send_message(msg)
+                self.stats["sent"] += 1
+                return
+            except smtplib.SMTPResponseException as e:
+                # 4xx replies are temporary; 5xx are permanent and not retried
+                if not 400 <= e.smtp_code < 500 or attempt == self.max_retries:
+                    self.stats["failed"] += 1
+                    raise
+            except TRANSIENT_ERRORS:
+                self._server = None
+                if attempt == self.max_retries:
+                    self.stats["failed"] += 1
+                    raise
+            except smtplib.SMTPException:
+                # Refused recipients, malformed data, ... will not succeed on retry
+                self.stats["failed"] += 1
+                raise
+            except OSError:
+                # Network-level failure while (re)connecting
+                self._server = None
+                if attempt == self.max_retries:
+                    self.stats["failed"] += 1
+                    raise
+            self.stats["retries"] += 1
+            time.sleep(self.backoff_seconds * (2 ** attempt))
+
+    def send_many(self, batches, on_progress=None):
+        """
+        Send groups of messages, e.g. all emails for one candidate per group
+
+        A group stops at its first failed message, so the outcome says exactly
+        which messages went out and a retry can resume after them.
+
+        Args:
+            batches: List of (key, [messages]) pairs
+            on_progress: Optional callable(done, total) after each group
+
+        Returns:
+            dict: key -> {"sent": number of leading messages delivered,
+                "error": None if all were delivered, else the error message}
+        """
+        outcomes = {}
+        for done, (key, messages) in enumerate(batches, start=1):
+            outcome = outcomes[key] = {"sent": 0, "error": None}
+            for msg in messages:
+                try:
+                    self.send(msg)
+                except Exception as e:
+                    outcome["error"] = str(e)
+                    break
+                outcome["sent"] += 1
+            if on_progress:
+                on_progress(done, len(batches))
+        return outcomes
+
+    def throughput(self):
+        """Messages sent per minute since the first connection"""
+        if self._started is None:
+            return 0.0
+        elapsed = time.perf_counter() - self._started
+        return self.stats["sent"] / elapsed * 60.0 if elapsed > 0 else 0.0
+
+    def summary(self):
+        """One-line description of the send counters and throughput"""
+        return (f"{self.stats['sent']} email(s) sent · {self.stats['failed']} failed · "
+                f"{self.stats['retries']} retried · {self.throughput():.1f} msg/min")
+
+
+# Candidates with emails queued in a background job; clicking "email all" again skips them
+_queued = set()
+_queued_lock = threading.Lock()
+
+
+def notify_candidates_in_background(batches, dispatcher):
+    """
+    Send candidate emails on the job registry over one SMTP session
+
+    Groups run one at a time through the dispatcher, which keeps its
+    connection open and its rate limit between groups. The dispatcher's
+    sent, failed and retry counts and its throughput are kept on the job's
+    detail line after every group. Each delivered
+    message is recorded, so a group that failed part-way resumes after its
+    last delivered message when it is sent again.
+
+    Args:
+        batches: List of (candidate_id, [messages]) pairs, messages in sending order
+        dispatcher: EmailDispatcher to send with; it is closed when the job ends
+
+    Returns:
+        str: Background job ID, or None if every candidate is already queued
+    """
+    store = get_candidate_store()
+    with _queued_lock:
+        batches = [(candidate_id, messages) for candidate_id, messages in batches if candidate_id not in _queued]
+        _queued.update(candidate_id for candidate_id, _ in batches)
+    if not batches:
+        return None
+
+    def notify(batch):
+        candidate_id, messages = batch
+        try:
+            rows = store.get_summaries([candidate_id])
+            if not rows or rows[0]["email_sent"]:
+                return 0
+            delivered = rows[0]["emails_delivered"] or 0
+            outcome = dispatcher.send_many([(candidate_id, messages[delivered:])])[candidate_id]
+            if outcome["error"] is not None:
+                if outcome["sent"]:
+                    store.set_emails_delivered(candidate_id, delivered + outcome["sent"])
+                raise RuntimeError(outcome["error"])
+            store.set_email_sent(candidate_id)
+            return outcome["sent"]
+        finally:
+            with _queued_lock:
+                _queued.discard(candidate_id)
+
+    def report(job, done, total):
+        job.set_detail(dispatcher.summary())
+
+    def finish(job):
+        # Settle the throughput before the session closes and the clock keeps running
+        job.set_detail(dispatcher.summary())
+        dispatcher.close()
+        # Items skipped by cancelling never ran notify()
+        with _queued_lock:
+            _queued.difference_update(candidate_id for candidate_id, _ in batches)
+
+    return get_job_registry().submit(
+        f"Email {len(batches)} candidate(s)",
+        batches,
+        notify,
+        concurrency=1,
+        on_progress=report,
+        on_done=finish,
+    )
@@ -0,0 +1,181 @@
+# exports.py
+# Streaming CSV/JSONL/Parquet exports of analyzed candidates, cached per data version
+import csv
+import hashlib
+import json
+import os
+import threading
+from config import EXPORT_DIR
+from utils.candidate_store import get_candidate_store, match_level
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Parquet export is optional
+    pa = pq = None
+
+# (JSONL/Parquet key, CSV header) of every exported field
+EXPORT_FIELDS = (
+    ("name", "Name"),
+    ("email", "Email"),
+    ("resume_filename", "Resume Filename"),
+    ("rank_score", "Rank Score"),
+    ("score", "Score"),
+    ("match", "Match"),
+    ("decision", "Decision"),
+    ("feedback", "Feedback"),
+    ("email_sent", "Email Sent"),
+    ("questions", "Questions"),
+)
+MATCH_NAMES = {"strong": "Strong Match", "moderate": "Moderate Match", "poor": "Poor Match"}
+EXPORT_FORMATS = {"csv": "text/csv", "jsonl": "application/x-ndjson", "parquet": "application/vnd.apache.parquet"}
+# Rows per Parquet row group; also bounds the rows held in memory while writing
+PARQUET_BATCH_ROWS = 2000
+
+_build_lock = threading.Lock()
+
+
+def available_formats():
+    """Export formats usable in this environment"""
+    return [fmt for fmt in EXPORT_FORMATS if fmt != "parquet" or pq is not None]
+
+
+def iter_export_rows(job_id, candidate_ids, rank_scores):
+    """
+    Yield one flat export record per analyzed candidate
+
+    Args:
+        job_id: Job to export
+        candidate_ids: Candidates to export, in output order
+        rank_scores: {candidate_id: rank score}
+
+    Yields:
+        dict: Record keyed by the EXPORT_FIELDS keys
+    """
+    for data in get_candidate_store().iter_results(job_id, candidate_ids=candidate_ids):
+        result = data["result"] or {}
+        score = data["score"] or 0
+        decision = data["decision"] or "Rejected"
+        yield {
+            "name": data["candidate_name"] or result.get("name") or "N/A",
+            "email": data["email"] or "N/A",
+            "resume_filename": data["name"],
+            "rank_score": rank_scores.get(data["id"], 0.0),
+            "score": float(score),
+            "match": MATCH_NAMES[match_level(score, decision)],
+            "decision": decision,
+            "feedback": result.get("feedback", ""),
+            "email_sent": data["email_sent"],
+            "questions": data["questions_text"] or "",
+        }
+
+
+def write_csv(path, rows):
+    """Write records to CSV one row at a time; returns the number of rows"""
+    count = 0
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow([header for _, header in EXPORT_FIELDS])
+        for row in rows:
+            writer.writerow([("Yes" if row[key] else "No") if key == "email_sent" else row[key]
+                             for key, _ in EXPORT_FIELDS])
+            count += 1
+    return count
+
+
+def write_jsonl(path, rows):
+    """Write records as JSON lines one row at a time; returns the number of rows"""
+    count = 0
+    with open(path, "w", encoding="utf-8") as f:
+        for row in rows:
+            f.write(json.dumps(row, ensure_ascii=False))
+            f.write("\n")
+            count += 1
+    return count
+
+
+def write_parquet(path, rows, batch_rows=PARQUET_BATCH_ROWS):
+    """
+    Write records to Parquet one row group at a time; returns the number of rows
+
+    Raises:
+        ImportError: If pyarrow is not installed
+    """
+    if pq is None:
+        raise ImportError("Parquet export needs pyarrow")
+    schema = pa.schema([
+        ("name", pa.string()), ("email", pa.string()), ("resume_filename", pa.string()),
+        ("rank_score", pa.float64()), ("score", pa.float64()), ("match", pa.string()),
+        ("decision", pa.string()), ("feedback", pa.string()), ("email_sent", pa.bool_()),
+        ("questions", pa.string()),
+    ])
+    count = 0
+    batch = []
+    with pq.ParquetWriter(path, schema) as writer:
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= batch_rows:
+                writer.write_table(pa.Table.from_pylist(batch, schema=schema))
+                count += len(batch)
+                batch = []
+        if batch or not count:
+            writer.write_table(pa.Table.from_pylist(batch, schema=schema))
+            count += len(batch)
+    return count
+
+
+WRITERS = {"csv": write_csv, "jsonl": write_jsonl, "parquet": write_parquet}
+
+
+def export_path(job_id, fmt, version, ranking_key):
+    """
+    Location of the cached export for a job, data version and ranking
+
+    Rank scores depend on the HR weights as well as the data, so the
+    ranking inputs (ranking_key, any string) are part of the stamp.
+    """
+    ranking = hashlib.sha256(ranking_key.encode("utf-8")).hexdigest()[:12]
+    job_key = hashlib.sha256(job_id.encode("utf-8")).hexdigest()[:12]
+    return os.path.join(EXPORT_DIR, f"{job_key}-{version}-{ranking}.{fmt}")
+
+
+def build_export(job_id, fmt, version, ranking_key, candidate_ids, rank_scores):
+    """
+    Write an export unless the one for this data version already exists
+
+    The file is written under a temporary name and renamed when complete,
+    so a reader never sees a half-written export. Older exports of the same
+    job and format are removed.
+
+    Args:
+        job_id: Job to export
+        fmt: One of EXPORT_FORMATS
+        version: Candidate store data version the export reflects
+        ranking_key: String identifying the ranking inputs behind rank_scores
+        candidate_ids: Candidates to export, in output order
+        rank_scores: {candidate_id: rank score}
+
+    Returns:
+        str: Path of the finished export
+    """
+    path = export_path(job_id, fmt, version, ranking_key)
+    with _build_lock:
+        if os.path.exists(path):
+            return path
+        os.makedirs(EXPORT_DIR, exist_ok=True)
+        temp_path = f"{path}.{threading.get_ident()}.tmp"
+        try:
+            WRITERS[fmt](temp_path, iter_export_rows(job_id, candidate_ids, rank_scores))
+            os.replace(temp_path, path)
+        finally:
+            if os.path.exists(temp_path):
+                os.unlink(temp_path)
+
+        prefix = os.path.basename(path).split("-", 1)[0] + "-"
+        for name in os.listdir(EXPORT_DIR):
+            if name.startswith(prefix) and name.endswith(f".{fmt}") and name != os.path.basename(path):
+                try:
+                    os.unlink(os.path.join(EXPORT_DIR, name))
+                except OSError:
+                    pass
+    return path
@@ -0,0 +1,49 @@
+# hashing.py
+import hashlib
+
+CHUNK_SIZE = 1024 * 1024
+
+
+def sha256_bytes(data):
+    """
+    Compute the SHA-256 hex digest of in-memory content
+    
+    Args:
+        data: bytes, bytearray or memoryview
+        
+    Returns:
+        str: Hex digest
+    """
+    return hashlib.sha256(data).hexdigest()
+
+
+def sha256_file(file_path):
+    """
+    Compute the SHA-256 hex digest of a file without loading it all at once
+    
+    Args:
+        file_path: Path to the file
+        
+    Returns:
+        str: Hex digest
+    """
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def sha256_source(pdf_source):
+    """
+    Compute the SHA-256 hex digest of a file path or in-memory content
+    
+    Args:
+        pdf_source: Path to the file, or bytes/bytearray/memoryview
+        
+    Returns:
+        str: Hex digest
+    """
+    if isinstance(pdf_source, (bytes, bytearray, memoryview)):
+        return sha256_bytes(pdf_source)
+    return sha256_file(pdf_source)
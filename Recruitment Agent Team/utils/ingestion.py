@@ -0,0 +1,134 @@
+# ingestion.py
+# Bulk PDF ingestion across a process pool. This module is imported by worker
+# processes, so it must not depend on Streamlit.
+import io
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import PyPDF2
+from config import PDF_MAX_PAGES, PDF_MAX_CHARS
+from utils.blob_store import load_pdf_bytes
+from utils.hashing import sha256_bytes
+from utils.text_cache import get_page_text_cache
+
+# Below this many uncached files the process pool start-up cost outweighs the gain
+MIN_FILES_FOR_POOL = 4
+
+
+def iter_pdf_pages(pdf_bytes, max_pages=PDF_MAX_PAGES, max_chars=PDF_MAX_CHARS):
+    """
+    Lazily extract page text from a PDF, stopping early at the caps
+    
+    Args:
+        pdf_bytes: PDF content as bytes or a memoryview
+        max_pages: Stop after this many pages (None for no limit)
+        max_chars: Stop once this many characters were produced (None for no limit)
+        
+    Yields:
+        str: Text of each page
+    """
+    pdf_reader = PyPDF2.PdfReader(io.BytesIO(pdf_bytes))
+    chars = 0
+    for page_num, page in enumerate(pdf_reader.pages):
+        if max_pages is not None and page_num >= max_pages:
+            return
+        page_text = page.extract_text() or ""
+        if max_chars is not None and chars + len(page_text) > max_chars:
+            yield page_text[:max_chars - chars]
+            return
+        chars += len(page_text)
+        yield page_text
+
+
+def _source_key(pdf_source, content_hash=None):
+    """Key under which a source's errors are reported: its path, or its content hash"""
+    return pdf_source if isinstance(pdf_source, str) else content_hash
+
+
+def _extract_worker(pdf_source, max_pages, max_chars):
+    """Extract one PDF inside a worker process"""
+    content_hash = None
+    try:
+        pdf_bytes = load_pdf_bytes(pdf_source)
+        content_hash = sha256_bytes(pdf_bytes)
+        pages = list(iter_pdf_pages(pdf_bytes, max_pages, max_chars))
+        return _source_key(pdf_source, content_hash), content_hash, pages, None
+    except Exception as e:
+        return _source_key(pdf_source, content_hash), None, None, str(e)
+
+
+def ingest_pdfs(pdf_sources, max_workers=None, max_pages=PDF_MAX_PAGES, max_chars=PDF_MAX_CHARS,
+                on_progress=None):
+    """
+    Extract text from many PDFs in parallel and warm the page text cache
+    
+    Files already in the cache are skipped. The rest are spread across a
+    process pool (one worker per core by default).
+    
+    Args:
+        pdf_sources: List of PDF file paths or in-memory PDF bytes/memoryviews
+        max_workers: Number of worker processes (defaults to the CPU count)
+        max_pages: Per-file page cap
+        max_chars: Per-file character cap
+        on_progress: Optional callable(done, total) invoked as files complete
+        
+    Returns:
+        dict: Ingestion statistics including pages_per_sec and errors keyed
+            by path (or content hash for in-memory sources)
+    """
+    start = time.perf_counter()
+    cache = get_page_text_cache()
+    # Only results produced with the default caps are safe to share via the cache
+    cacheable = (max_pages, max_chars) == (PDF_MAX_PAGES, PDF_MAX_CHARS)
+    total = len(pdf_sources)
+    stats = {"files": total, "cached": 0, "pages": 0, "errors": {}}
+
+    pending = []
+    for pdf_source in pdf_sources:
+        try:
+            content_hash = sha256_bytes(load_pdf_bytes(pdf_source))
+        except OSError as e:
+            stats["errors"][pdf_source] = str(e)
+            continue
+        if cacheable and cache.get(content_hash) is not None:
+            stats["cached"] += 1
+        else:
+            pending.append(pdf_source)
+
+    done = total - len(pending)
+    if on_progress:
+        on_progress(done, total)
+
+    def record(result):
+        source_key, content_hash, pages, error = result
+        if error is not None:
+            stats["errors"][source_key] = error
+            return
+        stats["pages"] += len(pages)
+        if cacheable:
+            cache.put(content_hash, pages)
+
+    workers = max_workers or os.cpu_count() or 1
+    if len(pending) < MIN_FILES_FOR_POOL or workers == 1:
+        for pdf_source in pending:
+            record(_extract_worker(pdf_source, max_pages, max_chars))
+            done += 1
+            if on_progress:
+                on_progress(done, total)
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(pending))) as executor:
+            # memoryviews cannot be pickled, so in-memory sources cross the process boundary as bytes
+            futures = [executor.submit(_extract_worker,
+                                       bytes(pdf_source) if isinstance(pdf_source, memoryview) else pdf_source,
+                                       max_pages, max_chars)
+                       for pdf_source in pending]
+            for future in as_completed(futures):
+                record(future.result())
+                done += 1
+                if on_progress:
+                    on_progress(done, total)
+
+    elapsed = time.perf_counter() - start
+    stats["seconds"] = elapsed
+    stats["pages_per_sec"] = stats["pages"] / elapsed if elapsed > 0 else 0.0
+    return stats
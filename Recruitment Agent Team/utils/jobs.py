@@ -0,0 +1,261 @@
+# jobs.py
+# Background job registry with a bounded worker pool, progress polling,
+# cancellation, pause/resume and per-job metrics.
+import itertools
+import threading
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+
+QUEUED = "queued"
+RUNNING = "running"
+PAUSED = "paused"
+CANCELLED = "cancelled"
+COMPLETED = "completed"
+FAILED = "failed"
+FINISHED_STATES = (CANCELLED, COMPLETED, FAILED)
+
+# Shared by all jobs; also the most items one job can run at a time. Threads start lazily,
+# so an idle pool costs nothing.
+DEFAULT_POOL_WORKERS = 32
+MAX_ERRORS_KEPT = 50
+
+
+class BackgroundJob:
+    """
+    One batch of work items processed off the Streamlit script thread
+
+    All mutable state is guarded by the job's lock; the UI reads it through
+    snapshot() and controls the job with pause(), resume() and cancel().
+    """
+
+    def __init__(self, job_id, name, items, fn, concurrency, on_progress=None, on_done=None):
+        self.id = job_id
+        self.name = name
+        self.items = list(items)
+        self.fn = fn
+        self.concurrency = concurrency
+        self.on_progress = on_progress
+        self.on_done = on_done
+        self.status = QUEUED
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.completed = 0
+        self.failed = 0
+        self.skipped = 0
+        self.item_seconds = 0.0
+        self.errors = []
+        self.results = {}
+        self.detail = ""
+        self._lock = threading.Lock()
+        self._cancelled = threading.Event()
+        self._running = threading.Event()
+        self._running.set()
+
+    def pause(self):
+        """Stop dispatching new items; in-flight items still finish"""
+        with self._lock:
+            if self.status in (QUEUED, RUNNING):
+                self.status = PAUSED
+                self._running.clear()
+
+    def resume(self):
+        """Continue dispatching items after pause()"""
+        with self._lock:
+            if self.status == PAUSED:
+                self.status = RUNNING if self.started_at else QUEUED
+                self._running.set()
+
+    def cancel(self):
+        """Skip every item that has not started yet"""
+        self._cancelled.set()
+        # Wake a paused dispatcher so it can observe the cancellation
+        self._running.set()
+
+    def set_detail(self, detail):
+        """Replace the job-specific status line shown with its progress"""
+        with self._lock:
+            self.detail = detail
+
+    @property
+    def cancelled(self):
+        return self._cancelled.is_set()
+
+    def _record(self, item, result, error, seconds):
+        with self._lock:
+            self.item_seconds += seconds
+            if error is None:
+                self.completed += 1
+                self.results[item] = result
+            else:
+                self.failed += 1
+                if len(self.errors) < MAX_ERRORS_KEPT:
+                    self.errors.append((item, error))
+            done = self.completed + self.failed
+        if self.on_progress:
+            self.on_progress(self, done, len(self.items))
+
+    def snapshot(self):
+        """
+        Thread-safe view of the job's progress and metrics
+
+        Returns:
+            dict: Status, counts, progress fraction, timing metrics and detail line
+        """
+        with self._lock:
+            now = time.time()
+            done = self.completed + self.failed
+            started = self.started_at or now
+            finished = self.finished_at or now
+            return {
+                "id": self.id,
+                "name": self.name,
+                "status": self.status,
+                "total": len(self.items),
+                "completed": self.completed,
+                "failed": self.failed,
+                "skipped": self.skipped,
+                "progress": done / len(self.items) if self.items else 1.0,
+                "queue_seconds": started - self.created_at,
+                "run_seconds": finished - started if self.started_at else 0.0,
+                "avg_item_seconds": self.item_seconds / done if done else 0.0,
+                "errors": list(self.errors),
+                "detail": self.detail,
+            }
+
+
+class JobRegistry:
+    """
+    Registry of background jobs sharing one bounded thread pool
+
+    Each job gets a lightweight dispatcher thread that feeds at most
+    `concurrency` items at a time into the shared pool, so pausing a job
+    never ties up pool workers.
+    """
+
+    def __init__(self, max_workers=DEFAULT_POOL_WORKERS):
+        self.max_workers = max_workers
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="job-worker")
+        self._jobs = {}
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+
+    def submit(self, name, items, fn, concurrency=None, on_progress=None, on_done=None):
+        """
+        Start processing items in the background
+
+        Args:
+            name: Label shown in the UI
+            items: Work items; each is passed to fn
+            fn: Callable(item) -> result, run on the worker pool
+            concurrency: Maximum items of this job in flight (defaults to the pool size)
+            on_progress: Optional callable(job, done, total) after each item
+            on_done: Optional callable(job) once the job finishes
+
+        Returns:
+            str: Job ID
+        """
+        job_id = f"job-{next(self._ids)}"
+        job = BackgroundJob(job_id, name, items, fn, concurrency or self.max_workers,
+                            on_progress, on_done)
+        with self._lock:
+            self._jobs[job_id] = job
+        threading.Thread(target=self._dispatch, args=(job,), name=f"{job_id}-dispatcher",
+                         daemon=True).start()
+        return job_id
+
+    def _dispatch(self, job):
+        slots = threading.Semaphore(job.concurrency)
+        futures = []
+
+        def run_item(item):
+            start = time.perf_counter()
+            try:
+                result = job.fn(item)
+                job._record(item, result, None, time.perf_counter() - start)
+            except Exception as e:
+                job._record(item, None, f"{e}\n{traceback.format_exc(limit=3)}", time.perf_counter() - start)
+            finally:
+                slots.release()
+
+        for index, item in enumerate(job.items):
+            job._running.wait()
+            if not job.cancelled:
+                slots.acquire()
+                if job.cancelled:
+                    slots.release()
+            if job.cancelled:
+                with job._lock:
+                    job.skipped = len(job.items) - index
+                break
+            with job._lock:
+                if job.started_at is None:
+                    job.started_at = time.time()
+                if job.status == QUEUED:
+                    job.status = RUNNING
+            futures.append(self._executor.submit(run_item, item))
+
+        for future in futures:
+            future.exception()
+
+        with job._lock:
+            job.finished_at = time.time()
+            if job.started_at is None:
+                job.started_at = job.finished_at
+            if job.cancelled:
+                job.status = CANCELLED
+            elif job.items and job.failed == len(job.items):
+                job.status = FAILED
+            else:
+                job.status = COMPLETED
+        if job.on_done:
+            job.on_done(job)
+
+    def get(self, job_id):
+        """Return a job by ID, or None"""
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def snapshots(self, include_finished=True):
+        """Return snapshots of all jobs, newest first"""
+        with self._lock:
+            jobs = list(self._jobs.values())
+        snapshots = [job.snapshot() for job in reversed(jobs)]
+        if not include_finished:
+            snapshots = [s for s in snapshots if s["status"] not in FINISHED_STATES]
+        return snapshots
+
+    def pause(self, job_id):
+        job = self.get(job_id)
+        if job:
+            job.pause()
+
+    def resume(self, job_id):
+        job = self.get(job_id)
+        if job:
+            job.resume()
+
+    def cancel(self, job_id):
+        job = self.get(job_id)
+        if job:
+            job.cancel()
+
+    def clear_finished(self):
+        """Forget finished jobs"""
+        with self._lock:
+            for job_id in [jid for jid, job in self._jobs.items() if job.status in FINISHED_STATES]:
+                del self._jobs[job_id]
+
+
+_job_registry = None
+_registry_lock = threading.Lock()
+
+
+def get_job_registry():
+    """Return the process-wide job registry"""
+    global _job_registry
+    with _registry_lock:
+        if _job_registry is None:
+            _job_registry = JobRegistry()
+        return _job_registry
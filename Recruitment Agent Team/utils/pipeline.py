@@ -0,0 +1,217 @@
+# pipeline.py
+# Streaming save -> extract -> triage -> analyze pipeline for resumes as they are uploaded
+import queue
+import threading
+import time
+from config import PIPELINE_QUEUE_SIZE, PIPELINE_STAGE_WORKERS
+from utils.batch_processing import analyze_with_retry
+from utils.blob_store import get_resume_blob_store
+from utils.candidate_store import get_candidate_store
+from utils.dedup import get_duplicate_index
+from utils.hashing import sha256_bytes
+from utils.text_extraction import extract_pages_from_pdf
+from utils.triage import score_resumes
+from utils.verdict_cache import requirements_hash
+
+STAGES = ("save", "extract", "triage", "analyze")
+MAX_ERRORS_KEPT = 20
+
+
+class ScreeningPipeline:
+    """
+    Queue-connected stages that screen each resume as soon as it arrives
+
+    Every stage has its own worker threads and a bounded input queue. A
+    worker blocks when the next stage's queue is full, so a slow analyze
+    stage throttles extraction instead of piling up parsed resumes in
+    memory. Uploads land in an unbounded intake queue that a feeder thread
+    moves into the save stage, so submitting never blocks the caller (the
+    Streamlit script thread) on that backpressure. Items carry their own screening context (job, requirements,
+    triage profile, analysis options), so one pipeline serves every job.
+    """
+
+    def __init__(self, queue_size=PIPELINE_QUEUE_SIZE, stage_workers=None):
+        self.stage_workers = dict(PIPELINE_STAGE_WORKERS, **(stage_workers or {}))
+        self._queues = {stage: queue.Queue(maxsize=queue_size) for stage in STAGES}
+        # Holds only uploads the caller already has in memory; parsed text stays behind the bounded queues
+        self._intake = queue.Queue()
+        self._handlers = {"save": self._save, "extract": self._extract,
+                          "triage": self._triage, "analyze": self._analyze}
+        self._lock = threading.Lock()
+        self._in_flight = set()
+        self._stats = {stage: {"busy": 0, "processed": 0, "dropped": 0, "failed": 0} for stage in STAGES}
+        self._errors = []
+        # Time to first verdict of the current batch; a batch starts when a resume arrives at an idle pipeline
+        self._batch_started = None
+        self._first_verdict_seconds = None
+        self._started = False
+
+    def _start(self):
+        # Caller must hold the lock
+        if self._started:
+            return
+        for stage in STAGES:
+            for n in range(self.stage_workers[stage]):
+                threading.Thread(target=self._run_stage, args=(stage,), name=f"pipeline-{stage}-{n}",
+                                 daemon=True).start()
+        threading.Thread(target=self._feed, name="pipeline-intake", daemon=True).start()
+        self._started = True
+
+    def submit(self, context, name, data):
+        """
+        Feed one uploaded resume into the pipeline
+
+        Uploads already stored for the job or already in the pipeline are
+        ignored, so resubmitting the uploader's files on every rerun is cheap.
+        Never blocks: the resume waits in the intake queue while the save
+        stage is backed up.
+
+        Args:
+            context: Screening context dict with job_id, job_requirements, skills,
+                description, triage_key, triage_threshold, max_retries, use_cache,
+                include_questions and optionally analyze (False stops after triage)
+            name: Original file name
+            data: PDF bytes or memoryview
+
+        Returns:
+            bool: True if the resume was queued
+        """
+        content_hash = sha256_bytes(data)
+        key = (context["job_id"], content_hash)
+        with self._lock:
+            if key in self._in_flight:
+                return False
+            if get_candidate_store().find_by_hash(context["job_id"], content_hash) is not None:
+                return False
+            if self.idle():
+                self._batch_started = time.perf_counter()
+                self._first_verdict_seconds = None
+            self._in_flight.add(key)
+            self._start()
+            self._intake.put({"context": context, "name": name, "data": data, "content_hash": content_hash})
+        return True
+
+    def _feed(self):
+        while True:
+            item = self._intake.get()
+            # Blocks while the save stage is backed up, on this thread instead of the caller's
+            self._queues["save"].put(item)
+            self._intake.task_done()
+
+    def _run_stage(self, stage):
+        inbox = self._queues[stage]
+        handler = self._handlers[stage]
+        next_stage = STAGES[STAGES.index(stage) + 1] if stage != STAGES[-1] else None
+        while True:
+            item = inbox.get()
+            with self._lock:
+                self._stats[stage]["busy"] += 1
+            outcome = "processed"
+            try:
+                forward = handler(item)
+            except Exception as e:
+                forward = False
+                outcome = "failed"
+                with self._lock:
+                    if len(self._errors) < MAX_ERRORS_KEPT:
+                        self._errors.append((stage, item.get("name"), str(e)))
+            finally:
+                if stage == "save":
+                    with self._lock:
+                        self._in_flight.discard((item["context"]["job_id"], item["content_hash"]))
+            with self._lock:
+                self._stats[stage]["busy"] -= 1
+                if outcome == "processed" and not forward and next_stage is not None:
+                    outcome = "dropped"
+                self._stats[stage][outcome] += 1
+            if forward and next_stage is not None:
+                # Blocks while the next stage is backed up; this is the backpressure
+                self._queues[next_stage].put(item)
+            inbox.task_done()
+
+    # ------------------------------------------------------------------ stages
+    # Each handler returns True to pass the item on, False to stop it here
+
+    def _save(self, item):
+        context = item["context"]
+        store = get_candidate_store()
+        blobs = get_resume_blob_store()
+        content_hash = blobs.put(item.pop("data"))
+        if store.find_by_hash(context["job_id"], content_hash) is not None:
+            return False
+        item["candidate_id"] = store.add_candidate(
+            context["job_id"], item["name"], blobs.disk_path(content_hash) or "", content_hash)
+        return True
+
+    def _extract(self, item):
+        pdf_bytes = get_resume_blob_store().get(item["content_hash"])
+        if pdf_bytes is None:
+            raise FileNotFoundError(f"{item['name']} is no longer available")
+        item["text"] = "".join(page + "\n\n" for page in extract_pages_from_pdf(pdf_bytes))
+        if not item["text"].strip():
+            raise ValueError("No text could be extracted from the PDF")
+        # The job's index is loaded once and extended per resume, so linking stays cheap as the job grows
+        return not get_duplicate_index(item["context"]["job_id"]).link(item["candidate_id"], item["text"])
+
+    def _triage(self, item):
+        context = item["context"]
+        if not context["skills"] and not context["description"]:
+            item.pop("text")
+            return context.get("analyze", True)
+        score = round(float(score_resumes([item.pop("text")], context["skills"], context["description"])[0]), 1)
+        get_candidate_store().set_triage_scores([(item["candidate_id"], score)], context["triage_key"])
+        threshold = context["triage_threshold"]
+        return not (threshold > 0 and score < threshold) and context.get("analyze", True)
+
+    def _analyze(self, item):
+        context = item["context"]
+        item.pop("text", None)
+        pdf_bytes = get_resume_blob_store().get(item["content_hash"])
+        if pdf_bytes is None:
+            raise FileNotFoundError(f"{item['name']} is no longer available")
+        result = analyze_with_retry(pdf_bytes, context["job_requirements"], context["max_retries"],
+                                    context["use_cache"], context["include_questions"])
+        get_candidate_store().save_result(item["candidate_id"], result,
+                                          requirements_hash(context["job_requirements"]))
+        with self._lock:
+            if self._first_verdict_seconds is None:
+                self._first_verdict_seconds = time.perf_counter() - self._batch_started
+        return True
+
+    # ------------------------------------------------------------------ status
+
+    def status(self):
+        """
+        Snapshot of per-stage queue depth and counters
+
+        Returns:
+            dict: stages (stage -> queued, busy, processed, dropped, failed),
+                first_verdict_seconds of the current or last batch and recent errors
+        """
+        with self._lock:
+            stages = {stage: dict(self._stats[stage], queued=self._queues[stage].qsize()) for stage in STAGES}
+            stages["save"]["queued"] += self._intake.qsize()
+            return {
+                "stages": stages,
+                "first_verdict_seconds": self._first_verdict_seconds,
+                "errors": list(self._errors),
+            }
+
+    def idle(self):
+        """True when no resume is queued or being processed"""
+        # Items are forwarded before task_done(), so unfinished_tasks never drops to zero mid-flight
+        return self._intake.unfinished_tasks == 0 and all(
+            self._queues[stage].unfinished_tasks == 0 for stage in STAGES)
+
+
+_pipeline = None
+_pipeline_lock = threading.Lock()
+
+
+def get_screening_pipeline():
+    """Return the process-wide screening pipeline"""
+    global _pipeline
+    with _pipeline_lock:
+        if _pipeline is None:
+            _pipeline = ScreeningPipeline()
+        return _pipeline
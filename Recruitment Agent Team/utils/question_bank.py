@@ -0,0 +1,184 @@
+# question_bank.py
+# Per-job interview question bank: generated once per skill cluster, picked per candidate
+import json
+import os
+import sqlite3
+import threading
+import time
+import numpy as np
+from config import QUESTION_BANK_PATH
+from utils.triage import normalize_term, term_count_matrix
+
+# Skill clusters used to split bank generation; skills not listed form their own cluster
+SKILL_CLUSTERS = {
+    "programming languages": ("python", "java", "javascript", "c++", "c#", "go", "typescript"),
+    "frontend": ("react", "angular", "vue.js", "mobile development", "ios", "android"),
+    "backend": ("node.js", "express.js", "django", "flask", "fastapi", "spring boot", "rest api",
+                "graphql", "microservices", "system design"),
+    "databases": ("sql", "mongodb", "postgresql", "mysql", "redis"),
+    "cloud and devops": ("aws", "azure", "gcp", "docker", "kubernetes", "ci/cd", "git", "devops",
+                         "cloud architecture"),
+    "machine learning": ("tensorflow", "pytorch", "scikit-learn", "nlp", "computer vision",
+                         "data analysis", "machine learning", "deep learning"),
+    "process": ("agile", "scrum"),
+}
+# Maximum skills per generated cluster for skills outside SKILL_CLUSTERS
+OTHER_CLUSTER_SIZE = 6
+
+QUESTIONS_PER_CLUSTER = 8
+QUESTIONS_PER_CANDIDATE = 6
+
+_CLUSTER_OF = {skill: cluster for cluster, skills in SKILL_CLUSTERS.items() for skill in skills}
+
+
+def cluster_skills(skills):
+    """
+    Group job skills into clusters that each get one bank generation call
+
+    Args:
+        skills: Required skills of the job
+
+    Returns:
+        dict: Cluster name -> list of skills, in a stable order
+    """
+    clusters = {}
+    other = []
+    for skill in dict.fromkeys(s.strip() for s in skills if s and s.strip()):
+        cluster = _CLUSTER_OF.get(skill.lower())
+        if cluster is None:
+            other.append(skill)
+        else:
+            clusters.setdefault(cluster, []).append(skill)
+    for start in range(0, len(other), OTHER_CLUSTER_SIZE):
+        chunk = other[start:start + OTHER_CLUSTER_SIZE]
+        clusters[f"other: {', '.join(s.lower() for s in chunk)}"] = chunk
+    return dict(sorted(clusters.items()))
+
+
+class QuestionBank:
+    """
+    SQLite store of reusable interview questions
+
+    Questions are keyed by the job requirements hash and skill cluster, and
+    carry the keywords they probe so they can be matched to a candidate's
+    resume without another model call.
+    """
+
+    def __init__(self, db_path=QUESTION_BANK_PATH):
+        self.db_path = db_path
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS questions (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    requirements_hash TEXT NOT NULL,
+                    cluster TEXT NOT NULL,
+                    question TEXT NOT NULL,
+                    keywords_json TEXT NOT NULL,
+                    created_at REAL NOT NULL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_questions_requirements "
+                         "ON questions (requirements_hash, cluster)")
+
+    def _connect(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def clusters(self, req_hash):
+        """Return the clusters that already have questions for these requirements"""
+        return {row[0] for row in self._connect().execute(
+            "SELECT DISTINCT cluster FROM questions WHERE requirements_hash = ?", (req_hash,))}
+
+    def add(self, req_hash, cluster, questions):
+        """
+        Store generated questions for one cluster
+
+        Args:
+            req_hash: Job requirements hash
+            cluster: Skill cluster name
+            questions: List of {"question": str, "keywords": [str, ...]} dicts
+        """
+        now = time.time()
+        with self._connect() as conn:
+            conn.executemany(
+                "INSERT INTO questions (requirements_hash, cluster, question, keywords_json, created_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                ((req_hash, cluster, q["question"], json.dumps(q["keywords"]), now) for q in questions))
+
+    def questions(self, req_hash):
+        """Return every banked question for these requirements as dicts"""
+        return [
+            {"id": row[0], "cluster": row[1], "question": row[2], "keywords": json.loads(row[3])}
+            for row in self._connect().execute(
+                "SELECT id, cluster, question, keywords_json FROM questions "
+                "WHERE requirements_hash = ? ORDER BY id", (req_hash,))
+        ]
+
+    def clear(self, req_hash):
+        """Forget the bank for these requirements; returns the number of questions removed"""
+        with self._connect() as conn:
+            return conn.execute("DELETE FROM questions WHERE requirements_hash = ?", (req_hash,)).rowcount
+
+
+def pick_questions(bank_questions, resume_text, candidate_skills=(), limit=QUESTIONS_PER_CANDIDATE):
+    """
+    Choose the banked questions that best match a candidate, spread across clusters
+
+    Each question is scored by the share of its keywords found in the resume
+    or in the candidate's extracted skills. Clusters then take turns, best
+    question first, so one strong area does not crowd out the others.
+
+    Args:
+        bank_questions: Output of QuestionBank.questions()
+        resume_text: Candidate resume text
+        candidate_skills: Skills extracted by the analyzer
+        limit: Number of questions to pick
+
+    Returns:
+        list: Picked question dicts
+    """
+    if not bank_questions:
+        return []
+
+    vocabulary = list(dict.fromkeys(normalize_term(k) for q in bank_questions for k in q["keywords"] if k.strip()))
+    present = term_count_matrix([resume_text], vocabulary)[0] > 0 if vocabulary else np.zeros(0, dtype=bool)
+    skills = {normalize_term(s) for s in candidate_skills}
+    present |= np.array([term in skills for term in vocabulary], dtype=bool)
+    index = {term: i for i, term in enumerate(vocabulary)}
+
+    by_cluster = {}
+    for question in bank_questions:
+        ids = [index[normalize_term(k)] for k in question["keywords"] if k.strip()]
+        score = float(present[ids].mean()) if ids else 0.0
+        by_cluster.setdefault(question["cluster"], []).append((score, question))
+    for entries in by_cluster.values():
+        entries.sort(key=lambda entry: -entry[0])
+
+    # Clusters with the best-matching questions go first in every round
+    clusters = sorted(by_cluster, key=lambda c: -by_cluster[c][0][0])
+    picked = []
+    while len(picked) < limit and any(by_cluster[c] for c in clusters):
+        for cluster in clusters:
+            if by_cluster[cluster] and len(picked) < limit:
+                picked.append(by_cluster[cluster].pop(0)[1])
+    return picked
+
+
+_question_bank = None
+_bank_lock = threading.Lock()
+
+
+def get_question_bank():
+    """Return the process-wide question bank"""
+    global _question_bank
+    with _bank_lock:
+        if _question_bank is None:
+            _question_bank = QuestionBank()
+        return _question_bank
@@ -0,0 +1,177 @@
+# ranking.py
+# Columnar candidate features and instant, LLM-free re-ranking with HR weights
+import numpy as np
+
+EDUCATION_LEVELS = {
+    "none": 0, "high school": 1, "diploma": 1, "associate": 2, "bachelor": 3,
+    "master": 4, "mba": 4, "phd": 5, "doctorate": 5,
+}
+SENIORITY_LEVELS = {
+    "intern": 0, "entry": 1, "junior": 1, "mid": 2, "senior": 3,
+    "lead": 4, "staff": 4, "principal": 4, "architect": 4,
+}
+# Experience levels offered in the job configuration form
+EXPERIENCE_LEVEL_TARGETS = {
+    "Entry Level": 1, "Junior (1-3 years)": 1, "Mid-level (3-5 years)": 2,
+    "Senior (5+ years)": 3, "Lead/Architect": 4,
+}
+
+DEFAULT_WEIGHTS = {
+    "llm_score": 0.4,
+    "skills": 0.3,
+    "experience": 0.1,
+    "seniority": 0.1,
+    "education": 0.05,
+    "projects": 0.05,
+}
+
+# Values at which each component saturates to 1.0
+SKILL_YEARS_CAP = 5.0
+TOTAL_YEARS_CAP = 10.0
+PROJECT_COUNT_CAP = 10.0
+MAX_EDUCATION_LEVEL = 5.0
+MAX_SENIORITY_LEVEL = 4.0
+
+
+def _level(value, levels):
+    """Map a free-text education/seniority label to its ordinal level"""
+    text = str(value or "").lower()
+    matches = [level for label, level in levels.items() if label in text]
+    return max(matches) if matches else 0
+
+
+def _number(value):
+    try:
+        return max(float(value), 0.0)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+class CandidateFeatureStore:
+    """
+    Column store of structured resume features
+
+    Per-candidate scalars live in NumPy arrays and the variable-length
+    skill -> years mapping is kept in CSR form (indptr/indices/data), so
+    re-ranking is a handful of vectorized operations over all candidates.
+    """
+
+    def __init__(self, resume_ids, llm_scores, total_years, education, seniority, projects,
+                 skill_vocab, skill_indptr, skill_indices, skill_years):
+        self.resume_ids = np.asarray(resume_ids, dtype=object)
+        self.llm_scores = np.asarray(llm_scores, dtype=np.float32)
+        self.total_years = np.asarray(total_years, dtype=np.float32)
+        self.education = np.asarray(education, dtype=np.int8)
+        self.seniority = np.asarray(seniority, dtype=np.int8)
+        self.projects = np.asarray(projects, dtype=np.float32)
+        self.skill_vocab = skill_vocab
+        self.skill_indices = np.asarray(skill_indices, dtype=np.int32)
+        self.skill_years = np.asarray(skill_years, dtype=np.float32)
+        # Row number of every CSR entry, for per-candidate reductions
+        self.skill_rows = np.repeat(np.arange(len(self.resume_ids), dtype=np.int32),
+                                    np.diff(np.asarray(skill_indptr, dtype=np.int64)))
+
+    def __len__(self):
+        return len(self.resume_ids)
+
+    @classmethod
+    def from_results(cls, results):
+        """
+        Build the store from analyzer results
+
+        Args:
+            results: Iterable of (resume_id, result_dict) pairs
+
+        Returns:
+            CandidateFeatureStore: Columnar features for all candidates
+        """
+        resume_ids, llm_scores, total_years, education, seniority, projects = [], [], [], [], [], []
+        skill_vocab = {}
+        indptr, indices, years = [0], [], []
+
+        for resume_id, result in results:
+            features = result.get("features") or {}
+            resume_ids.append(resume_id)
+            llm_scores.append(_number(result.get("resume_score")))
+            total_years.append(_number(features.get("total_years")))
+            education.append(_level(features.get("education"), EDUCATION_LEVELS))
+            seniority.append(_level(features.get("seniority"), SENIORITY_LEVELS))
+            projects.append(_number(features.get("project_count")))
+
+            skills = features.get("skills") or {}
+            if isinstance(skills, list):
+                skills = {skill: 0 for skill in skills}
+            for skill, skill_years in skills.items():
+                key = str(skill).strip().lower()
+                if not key:
+                    continue
+                indices.append(skill_vocab.setdefault(key, len(skill_vocab)))
+                years.append(_number(skill_years))
+            indptr.append(len(indices))
+
+        return cls(resume_ids, llm_scores, total_years, education, seniority, projects,
+                   skill_vocab, indptr, indices, years)
+
+    def component_scores(self, required_skills, seniority_target=None):
+        """
+        Compute each ranking component, normalized to 0-1
+
+        Args:
+            required_skills: Skills the job asks for
+            seniority_target: Desired seniority level (see EXPERIENCE_LEVEL_TARGETS), or None
+
+        Returns:
+            dict: Component name -> numpy.ndarray of per-candidate values
+        """
+        n = len(self)
+        required_skills = list(dict.fromkeys(s.strip().lower() for s in required_skills if s and s.strip()))
+        required = [self.skill_vocab[s] for s in required_skills if s in self.skill_vocab]
+        if required_skills:
+            mask = np.isin(self.skill_indices, required)
+            # A listed skill with unknown years still earns half a year of credit
+            credit = np.minimum(np.maximum(self.skill_years[mask], 0.5), SKILL_YEARS_CAP) / SKILL_YEARS_CAP
+            skills = np.bincount(self.skill_rows[mask], weights=credit, minlength=n) / len(required_skills)
+            skills = np.minimum(skills, 1.0)
+        else:
+            skills = np.zeros(n)
+
+        if seniority_target is None:
+            seniority = self.seniority / MAX_SENIORITY_LEVEL
+        else:
+            seniority = 1.0 - np.abs(self.seniority - seniority_target) / MAX_SENIORITY_LEVEL
+
+        return {
+            "llm_score": self.llm_scores / 100.0,
+            "skills": skills,
+            "experience": np.minimum(self.total_years, TOTAL_YEARS_CAP) / TOTAL_YEARS_CAP,
+            "seniority": seniority,
+            "education": self.education / MAX_EDUCATION_LEVEL,
+            "projects": np.minimum(self.projects, PROJECT_COUNT_CAP) / PROJECT_COUNT_CAP,
+        }
+
+    def rank(self, weights=None, required_skills=(), seniority_target=None):
+        """
+        Re-rank all candidates locally with adjustable weights
+
+        Args:
+            weights: Component name -> weight (defaults to DEFAULT_WEIGHTS)
+            required_skills: Skills the job asks for
+            seniority_target: Desired seniority level, or None
+
+        Returns:
+            tuple: (resume_ids sorted best first, matching scores from 0 to 100)
+        """
+        if not len(self):
+            return [], np.zeros(0, dtype=np.float32)
+
+        weights = weights or DEFAULT_WEIGHTS
+        components = self.component_scores(list(required_skills), seniority_target)
+        total_weight = sum(max(weights.get(name, 0.0), 0.0) for name in components)
+        scores = np.zeros(len(self), dtype=np.float64)
+        if total_weight > 0:
+            for name, values in components.items():
+                scores += max(weights.get(name, 0.0), 0.0) * values
+            scores = scores / total_weight * 100.0
+
+        order = np.argsort(-scores, kind="stable")
+        return self.resume_ids[order].tolist(), scores[order].astype(np.float32)
@@ -0,0 +1,142 @@
+# requirements_diff.py
+# Structured diffs between job requirement versions and selective re-screening of affected verdicts
+import re
+from difflib import SequenceMatcher
+import numpy as np
+from utils.triage import extract_description_terms, normalize_term, term_count_matrix
+
+# Removed and added skills at least this similar are treated as one reworded skill
+REWORD_SIMILARITY = 0.75
+# Default score the Selected/Rejected line is assumed at when a job's verdicts cannot tell
+DEFAULT_DECISION_SCORE = 70
+# Verdicts within this many points of the decision line may flip on any requirements change
+NEAR_DECISION_MARGIN = 10
+
+_SKILL_CHARS = re.compile(r"[^a-z0-9+#]+")
+
+
+def _skill_key(skill):
+    """Normalize a skill for comparison: "Node.js", "NodeJS" and "node js" become "nodejs" """
+    return _SKILL_CHARS.sub("", skill.lower())
+
+
+def diff_profiles(old_profile, new_profile):
+    """
+    Diff two job profiles
+
+    Skills that only differ in case or punctuation are unchanged; a removed
+    and an added skill with similar spelling count as one reworded skill.
+
+    Args:
+        old_profile: Earlier profile dict (skills, description, experience_level)
+        new_profile: Current profile dict
+
+    Returns:
+        dict: added, removed and reworded ((old, new) pairs) skills,
+            description_added / description_removed keywords and
+            experience_level ((old, new) or None)
+    """
+    old_profile, new_profile = old_profile or {}, new_profile or {}
+    old_skills = {_skill_key(s): s for s in old_profile.get("skills", []) if s.strip()}
+    new_skills = {_skill_key(s): s for s in new_profile.get("skills", []) if s.strip()}
+    removed = [old_skills[key] for key in old_skills if key not in new_skills]
+    added = [new_skills[key] for key in new_skills if key not in old_skills]
+
+    reworded = []
+    for old in list(removed):
+        scored = [(SequenceMatcher(None, _skill_key(old), _skill_key(new)).ratio(), new) for new in added]
+        if scored:
+            similarity, new = max(scored)
+            if similarity >= REWORD_SIMILARITY:
+                reworded.append((old, new))
+                removed.remove(old)
+                added.remove(new)
+
+    old_terms = set(extract_description_terms(old_profile.get("description", "")))
+    new_terms = set(extract_description_terms(new_profile.get("description", "")))
+    old_level, new_level = old_profile.get("experience_level"), new_profile.get("experience_level")
+    return {
+        "added": added,
+        "removed": removed,
+        "reworded": reworded,
+        "description_added": sorted(new_terms - old_terms),
+        "description_removed": sorted(old_terms - new_terms),
+        "experience_level": (old_level, new_level) if old_level != new_level else None,
+    }
+
+
+def changed_terms(diff):
+    """Normalized (lowercased, single-spaced) skills and keywords touched by a diff"""
+    terms = list(diff["added"]) + list(diff["removed"])
+    terms += [term for pair in diff["reworded"] for term in pair]
+    terms += diff["description_added"] + diff["description_removed"]
+    return list(dict.fromkeys(normalize_term(term) for term in terms if term.strip()))
+
+
+def describe_diff(diff):
+    """One-line summary of a diff, e.g. "+Kubernetes · −Java · Node.js → NodeJS" """
+    parts = [f"+{skill}" for skill in diff["added"]]
+    parts += [f"−{skill}" for skill in diff["removed"]]
+    parts += [f"{old} → {new}" for old, new in diff["reworded"]]
+    if diff["experience_level"]:
+        parts.append(f"level: {diff['experience_level'][0]} → {diff['experience_level'][1]}")
+    if diff["description_added"] or diff["description_removed"]:
+        parts.append(f"description: +{len(diff['description_added'])}/−{len(diff['description_removed'])} keywords")
+    return " · ".join(parts) or "wording only"
+
+
+def decision_score(scores, decisions):
+    """
+    Estimate the score at which a job's verdicts switch from Rejected to Selected
+
+    Args:
+        scores: Verdict scores
+        decisions: Matching selection decisions
+
+    Returns:
+        float: Midpoint between the lowest Selected and the highest Rejected score,
+            or DEFAULT_DECISION_SCORE when either side is missing
+    """
+    selected = [s for s, d in zip(scores, decisions) if (d or "").lower() == "selected"]
+    rejected = [s for s, d in zip(scores, decisions) if (d or "").lower() != "selected"]
+    if not selected or not rejected:
+        return DEFAULT_DECISION_SCORE
+    return (min(selected) + max(rejected)) / 2
+
+
+def select_affected(candidates, texts, diff, boundary, margin=NEAR_DECISION_MARGIN):
+    """
+    Pick the stale verdicts whose outcome a requirements change could flip
+
+    A verdict is affected when its score is within margin of the decision
+    line, when the candidate's extracted skills or resume text touch a
+    changed term, or when the experience level changed (which moves
+    everyone's seniority fit).
+
+    Args:
+        candidates: List of dicts with id, score and skills (extracted skill names)
+        texts: Resume texts in the same order (None when unavailable)
+        diff: Output of diff_profiles()
+        boundary: Decision score (see decision_score())
+        margin: Half-width of the near-decision band
+
+    Returns:
+        dict: {candidate_id: list of reasons} for affected candidates
+    """
+    terms = changed_terms(diff)
+    mentions = (term_count_matrix([text or "" for text in texts], terms) > 0).any(axis=1) \
+        if terms else np.zeros(len(candidates), dtype=bool)
+    term_keys = {_skill_key(term) for term in terms}
+
+    affected = {}
+    for candidate, mentioned in zip(candidates, mentions):
+        reasons = []
+        if diff["experience_level"]:
+            reasons.append("experience level changed")
+        if abs((candidate["score"] or 0) - boundary) <= margin:
+            reasons.append("near the decision line")
+        if mentioned or any(_skill_key(str(skill)) in term_keys for skill in candidate["skills"]):
+            reasons.append("touches changed skills")
+        if reasons:
+            affected[candidate["id"]] = reasons
+    return affected
@@ -0,0 +1,68 @@
+# result_parsing.py
+import json
+import re
+
+
+def parse_json_response(result):
+    """
+    Parse the JSON payload returned by an agent
+
+    Args:
+        result: Raw agent response content (string or already parsed dict)
+
+    Returns:
+        dict: Parsed JSON object, or None if no JSON could be recovered
+    """
+    if isinstance(result, dict):
+        return result
+    if not result:
+        return None
+
+    try:
+        # Try to parse the result directly
+        parsed = json.loads(result)
+    except (TypeError, ValueError):
+        # If direct parsing fails, try to extract JSON from text
+        json_match = re.search(r'({.*})', result, re.DOTALL)
+        if not json_match:
+            return None
+        try:
+            parsed = json.loads(json_match.group(1))
+        except ValueError:
+            return None
+
+    return parsed if isinstance(parsed, dict) else None
+
+
+def parse_packed_response(result):
+    """
+    Parse a packed analyzer response into a list of per-candidate verdicts
+
+    Accepts either a bare JSON array or an object wrapping the array under
+    "candidates".
+
+    Args:
+        result: Raw agent response content
+
+    Returns:
+        list: Verdict dicts, or None if the response is malformed
+    """
+    if isinstance(result, str):
+        try:
+            parsed = json.loads(result)
+        except ValueError:
+            json_match = re.search(r'(\[.*\]|{.*})', result, re.DOTALL)
+            if not json_match:
+                return None
+            try:
+                parsed = json.loads(json_match.group(1))
+            except ValueError:
+                return None
+    else:
+        parsed = result
+
+    if isinstance(parsed, dict):
+        parsed = parsed.get("candidates")
+    if not isinstance(parsed, list):
+        return None
+    return [item for item in parsed if isinstance(item, dict)]
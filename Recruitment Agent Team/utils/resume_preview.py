@@ -1,12 +1,13 @@
 # resume_preview.py
 import base64
 import streamlit as st
+from utils.blob_store import load_pdf_bytes
+from utils.thumbnails import page_images
+
+def display_pdf(pdf_source):
+    """Display the PDF (a file path or in-memory bytes) in the Streamlit app"""
+    base64_pdf = base64.b64encode(load_pdf_bytes(pdf_source)).decode('utf-8')
 
-def display_pdf(file_path):
-    """Display the PDF file in the Streamlit app"""
-    with open(file_path, "rb") as f:
-        base64_pdf = base64.b64encode(f.read()).decode('utf-8')
-    
     # Embed PDF viewer
     pdf_display = f"""
         <iframe
@@ -19,19 +20,36 @@ def display_pdf(file_path):
     """
     st.markdown(pdf_display, unsafe_allow_html=True)
 
-def display_pdf_thumbnail(file_path, height="200px"):
-    """Display a smaller thumbnail of the PDF file"""
-    with open(file_path, "rb") as f:
-        base64_pdf = base64.b64encode(f.read()).decode('utf-8')
-    
-    # Embed PDF viewer as thumbnail
-    pdf_display = f"""
-        <iframe
-            src="data:application/pdf;base64,{base64_pdf}"
-            width="100%"
-            height="{height}"
-            style="border: 1px solid #ddd; border-radius: 5px;"
-            type="application/pdf">
-        </iframe>
+def display_pdf_thumbnail(pdf_source, content_hash=None, width=None):
+    """Display a small image of the PDF's first page; returns False if it cannot be rendered"""
+    images = page_images(pdf_source, content_hash, size="thumbnail", max_pages=1)
+    if not images:
+        return False
+    st.image(images[0], width=width)
+    return True
+
+def display_resume_preview(pdf_source, content_hash=None, key="preview"):
     """
-    st.markdown(pdf_display, unsafe_allow_html=True)
\ No newline at end of file
+    Preview a resume as cached page images, sending the full PDF only on request
+
+    One page is shown at preview size, picked from a strip of small page
+    thumbnails, so a rerun transfers a few small JPEGs instead of the whole
+    PDF. Without pypdfium2 the preview is the full PDF behind a button.
+    """
+    full_pdf_key = f"{key}_full_pdf"
+    images = page_images(pdf_source, content_hash, size="preview")
+    if images:
+        page = 0
+        if len(images) > 1:
+            thumbnails = page_images(pdf_source, content_hash, size="thumbnail")
+            cols = st.columns(len(thumbnails))
+            for i, (col, thumbnail) in enumerate(zip(cols, thumbnails)):
+                col.image(thumbnail, use_container_width=True)
+            page = st.radio("Page", range(len(images)), format_func=lambda i: f"Page {i + 1}",
+                            horizontal=True, key=f"{key}_page")
+        st.image(images[page], use_container_width=True)
+    else:
+        st.caption("Page previews need pypdfium2; open the full PDF below.")
+
+    if st.toggle("📄 Show full PDF", key=full_pdf_key):
+        display_pdf(pdf_source)
\ No newline at end of file
@@ -0,0 +1,123 @@
+# role_matrix.py
+# Multi-role screening: one candidate pool scored against several saved roles at once
+import numpy as np
+from utils.blob_store import get_resume_blob_store
+from utils.candidate_store import get_candidate_store
+from utils.text_extraction import extract_text_from_pdf
+from utils.triage import role_score_matrix
+
+DEFAULT_TOP_K = 5
+
+
+class RoleMatrix:
+    """
+    Candidates x roles matrix of local match scores
+
+    Rows follow candidate_ids and columns follow role_ids. LLM verdicts
+    (from CandidateStore.role_results) are layered on top when ranking, so
+    the matrix itself only changes when resumes or role profiles change.
+    """
+
+    def __init__(self, candidate_ids, role_ids, scores):
+        self.candidate_ids = list(candidate_ids)
+        self.role_ids = list(role_ids)
+        self.scores = scores
+        self._rows = {cid: i for i, cid in enumerate(self.candidate_ids)}
+        self._columns = {rid: j for j, rid in enumerate(self.role_ids)}
+
+    def local_score(self, candidate_id, role_id):
+        """Local match score of one candidate for one role"""
+        return float(self.scores[self._rows[candidate_id], self._columns[role_id]])
+
+    def top_k(self, role_id, k=DEFAULT_TOP_K):
+        """Return the IDs of the k candidates with the best local score for a role, best first"""
+        column = self.scores[:, self._columns[role_id]]
+        k = min(k, len(column))
+        if k <= 0:
+            return []
+        top = np.argpartition(-column, k - 1)[:k]
+        return [self.candidate_ids[i] for i in top[np.argsort(-column[top], kind="stable")]]
+
+    def _overlay(self, verdicts):
+        """Matrix of AI scores where a verdict exists, plus a mask of those cells"""
+        scores = self.scores.astype(np.float32, copy=True)
+        analyzed = np.zeros(scores.shape, dtype=bool)
+        for (candidate_id, role_id), verdict in verdicts.items():
+            row, column = self._rows.get(candidate_id), self._columns.get(role_id)
+            if row is not None and column is not None and verdict["score"] is not None:
+                scores[row, column] = verdict["score"]
+                analyzed[row, column] = True
+        return scores, analyzed
+
+    def ranked(self, role_id, verdicts):
+        """
+        Rank the pool for one role
+
+        Candidates with an AI verdict for the role come first, by AI score;
+        the rest follow by local score.
+
+        Args:
+            role_id: Role to rank for
+            verdicts: Output of CandidateStore.role_results()
+
+        Returns:
+            list: Candidate IDs, best first
+        """
+        scores, analyzed = self._overlay(verdicts)
+        column = self._columns[role_id]
+        order = np.lexsort((-scores[:, column], ~analyzed[:, column]))
+        return [self.candidate_ids[i] for i in order]
+
+    def best_fit(self, verdicts):
+        """
+        Pick each candidate's best-fitting role
+
+        Uses the AI score where the candidate was analyzed for a role and the
+        local score elsewhere.
+
+        Returns:
+            dict: {candidate_id: (role_id, score, scored by AI)}
+        """
+        if not self.role_ids:
+            return {}
+        scores, analyzed = self._overlay(verdicts)
+        best = scores.argmax(axis=1)
+        return {
+            candidate_id: (self.role_ids[best[i]], float(scores[i, best[i]]), bool(analyzed[i, best[i]]))
+            for i, candidate_id in enumerate(self.candidate_ids)
+        }
+
+
+def build_role_matrix(job_id, role_profiles):
+    """
+    Score a job's candidate pool against several roles
+
+    Each resume is extracted once (through the shared text cache) and
+    scanned once for the union of all roles' terms.
+
+    Args:
+        job_id: Job whose candidates form the pool
+        role_profiles: {role_id: job profile with "skills" and "description"}
+
+    Returns:
+        RoleMatrix: Local match scores
+    """
+    store = get_candidate_store()
+    blobs = get_resume_blob_store()
+    candidate_ids, texts = [], []
+    for row in store.list_candidates(job_id, duplicates=False):
+        pdf_bytes = blobs.get(row["content_hash"], row["path"])
+        if pdf_bytes is None:
+            continue
+        text = extract_text_from_pdf(pdf_bytes)
+        if text.startswith("Error"):
+            continue
+        candidate_ids.append(row["id"])
+        texts.append(text)
+
+    role_ids = list(role_profiles)
+    if texts and role_ids:
+        scores = role_score_matrix(texts, [role_profiles[role_id] for role_id in role_ids])
+    else:
+        scores = np.zeros((len(texts), len(role_ids)), dtype=np.float32)
+    return RoleMatrix(candidate_ids, role_ids, scores)
@@ -0,0 +1,143 @@
+# text_cache.py
+import json
+import os
+import threading
+from collections import OrderedDict
+from config import TEXT_CACHE_DIR, TEXT_CACHE_MAX_MEMORY_ENTRIES, TEXT_CACHE_MAX_DISK_ENTRIES, PDF_MAX_PAGES, PDF_MAX_CHARS
+
+# Prune the disk cache once every this many writes
+DISK_PRUNE_INTERVAL = 100
+
+
+class PageTextCache:
+    """
+    Two-level (memory + disk) LRU cache of extracted PDF text
+    
+    Entries are keyed by the SHA-256 of the PDF bytes and hold the text of
+    each page, so the same resume uploaded under any name is parsed once.
+    The extraction caps are part of the key: text truncated under smaller
+    caps is not served after they are raised.
+    """
+
+    def __init__(self, cache_dir=TEXT_CACHE_DIR, max_memory_entries=TEXT_CACHE_MAX_MEMORY_ENTRIES,
+                 max_disk_entries=TEXT_CACHE_MAX_DISK_ENTRIES, max_pages=PDF_MAX_PAGES, max_chars=PDF_MAX_CHARS):
+        self.cache_dir = cache_dir
+        self.caps_key = f"p{max_pages}-c{max_chars}"
+        self.max_memory_entries = max_memory_entries
+        self.max_disk_entries = max_disk_entries
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._writes = 0
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def _disk_path(self, content_hash):
+        return os.path.join(self.cache_dir, f"{content_hash}-{self.caps_key}.json")
+
+    def _remember(self, content_hash, pages):
+        # Caller must hold the lock; one instance has fixed caps, so the hash alone keys memory
+        self._memory[content_hash] = pages
+        self._memory.move_to_end(content_hash)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+
+    def get(self, content_hash):
+        """
+        Look up the cached pages for a PDF
+        
+        Args:
+            content_hash: SHA-256 hex digest of the PDF bytes
+            
+        Returns:
+            list: Page texts, or None on a miss
+        """
+        with self._lock:
+            pages = self._memory.get(content_hash)
+            if pages is not None:
+                self._memory.move_to_end(content_hash)
+                self.hits += 1
+                return list(pages)
+
+        disk_path = self._disk_path(content_hash)
+        try:
+            with open(disk_path, "r", encoding="utf-8") as f:
+                pages = tuple(json.load(f)["pages"])
+            # Refresh the access time so disk eviction is least-recently-used
+            os.utime(disk_path, None)
+        except (OSError, ValueError, KeyError):
+            with self._lock:
+                self.misses += 1
+            return None
+
+        with self._lock:
+            self._remember(content_hash, pages)
+            self.hits += 1
+        return list(pages)
+
+    def put(self, content_hash, pages):
+        """
+        Store the extracted pages for a PDF in memory and on disk
+        
+        Args:
+            content_hash: SHA-256 hex digest of the PDF bytes
+            pages: List of page texts
+        """
+        pages = tuple(pages)
+        disk_path = self._disk_path(content_hash)
+        tmp_path = f"{disk_path}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"pages": list(pages)}, f)
+            os.replace(tmp_path, disk_path)
+        except OSError:
+            # The memory cache still works when the disk is read-only or full
+            pass
+
+        with self._lock:
+            self._remember(content_hash, pages)
+            self._writes += 1
+            prune = self._writes % DISK_PRUNE_INTERVAL == 0
+
+        if prune:
+            self.prune_disk()
+
+    def prune_disk(self):
+        """Evict the least recently used disk entries above the size cap"""
+        try:
+            entries = [e for e in os.scandir(self.cache_dir) if e.name.endswith(".json")]
+        except OSError:
+            return
+        excess = len(entries) - self.max_disk_entries
+        if excess <= 0:
+            return
+        entries.sort(key=lambda e: e.stat().st_mtime)
+        for entry in entries[:excess]:
+            try:
+                os.unlink(entry.path)
+            except OSError:
+                pass
+
+    def clear(self):
+        """Drop every cached entry from memory and disk"""
+        with self._lock:
+            self._memory.clear()
+        for entry in os.scandir(self.cache_dir):
+            if entry.name.endswith(".json"):
+                try:
+                    os.unlink(entry.path)
+                except OSError:
+                    pass
+
+
+_page_text_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_page_text_cache():
+    """Return the process-wide page text cache"""
+    global _page_text_cache
+    with _cache_lock:
+        if _page_text_cache is None:
+            _page_text_cache = PageTextCache()
+        return _page_text_cache
@@ -1,46 +1,103 @@
 # text_extraction.py
-import PyPDF2
 import os
-import traceback
-import streamlit as st
+from config import RESUME_COMPACTION, RESUME_TOKEN_BUDGET
+from utils.blob_store import load_pdf_bytes
+from utils.compaction import compact_resume
+from utils.hashing import sha256_bytes
+from utils.ingestion import iter_pdf_pages
+from utils.text_cache import get_page_text_cache
 
-def extract_text_from_pdf(pdf_path):
+def extract_pages_from_pdf(pdf_source):
+    """
+    Extract the text of each page of a PDF file, using the content-addressed cache
+
+    Args:
+        pdf_source: Path to the PDF file, or its bytes/memoryview
+
+    Returns:
+        list: Text of each page
+    """
+    pdf_bytes = load_pdf_bytes(pdf_source)
+
+    content_hash = sha256_bytes(pdf_bytes)
+    cache = get_page_text_cache()
+    pages = cache.get(content_hash)
+    if pages is not None:
+        return pages
+
+    # Stream pages out of PyPDF2, stopping at the configured page/character caps
+    pages = list(iter_pdf_pages(pdf_bytes))
+
+    cache.put(content_hash, pages)
+    return pages
+
+def extract_text_from_pdf(pdf_source):
     """
     Extract text from a PDF file
-    
+
     Args:
-        pdf_path: Path to the PDF file
-        
+        pdf_source: Path to the PDF file, or its bytes/memoryview (None if unavailable)
+
     Returns:
         str: Extracted text
     """
-    text = ""
-    
     try:
         # Check if file exists
-        if not os.path.exists(pdf_path):
-            return f"Error: File not found at {pdf_path}"
-        
-        # Open the PDF file
-        with open(pdf_path, 'rb') as file:
-            # Create a PDF reader object
-            pdf_reader = PyPDF2.PdfReader(file)
-            
-            # Get the number of pages
-            num_pages = len(pdf_reader.pages)
-            
-            # Extract text from each page
-            for page_num in range(num_pages):
-                page = pdf_reader.pages[page_num]
-                text += page.extract_text() + "\n\n"
-                
+        if pdf_source is None:
+            return "Error: Resume file is no longer available"
+        if isinstance(pdf_source, str) and not os.path.exists(pdf_source):
+            return f"Error: File not found at {pdf_source}"
+
+        pages = extract_pages_from_pdf(pdf_source)
+        text = "".join(page + "\n\n" for page in pages)
+
         # If no text was extracted, return a message
         if not text.strip():
             return "No text could be extracted from the PDF. The PDF may be scanned or contain images."
-            
+
         return text
-        
+
     except Exception as e:
-        error_msg = f"Error extracting text from PDF: {str(e)}\n{traceback.format_exc()}"
-        st.error(error_msg)
-        return f"Error processing PDF: {str(e)}"
\ No newline at end of file
+        # Runs on worker threads too, so the error is returned rather than shown with st.error
+        return f"Error processing PDF: {str(e)}"
+
+def extract_compact_resume(pdf_source, token_budget=RESUME_TOKEN_BUDGET):
+    """
+    Extract a resume and compact it into sections within a token budget
+
+    Args:
+        pdf_source: Path to the PDF file, or its bytes/memoryview
+        token_budget: Maximum estimated tokens of the compact text
+
+    Returns:
+        dict: Output of compact_resume (text, tokens_before, tokens_after, sections),
+            or None if no text could be extracted
+    """
+    if pdf_source is None or (isinstance(pdf_source, str) and not os.path.exists(pdf_source)):
+        return None
+    try:
+        pages = extract_pages_from_pdf(pdf_source)
+    except Exception:
+        return None
+    if not any(page.strip() for page in pages):
+        return None
+    return compact_resume(pages, token_budget)
+
+def extract_resume_for_prompt(pdf_source):
+    """
+    Get the resume text to send to the model
+
+    Returns the compact representation when RESUME_COMPACTION is enabled,
+    and the full extracted text (or its error message) otherwise.
+
+    Args:
+        pdf_source: Path to the PDF file, or its bytes/memoryview
+
+    Returns:
+        str: Resume text for the prompt
+    """
+    if RESUME_COMPACTION:
+        compact = extract_compact_resume(pdf_source)
+        if compact is not None:
+            return compact["text"]
+    return extract_text_from_pdf(pdf_source)
\ No newline at end of file
@@ -0,0 +1,115 @@
+# thumbnails.py
+# Page images of resume PDFs, rasterized once and cached on disk by content hash
+import os
+import shutil
+import threading
+from config import THUMBNAIL_DIR, THUMBNAIL_WIDTHS, THUMBNAIL_MAX_PAGES
+from utils.blob_store import load_pdf_bytes
+from utils.hashing import sha256_source
+
+try:
+    import pypdfium2 as pdfium
+except ImportError:  # Previews fall back to the full PDF on request
+    pdfium = None
+
+# PDFium is not thread-safe; every render in the process goes through this lock
+_render_lock = threading.Lock()
+_hash_locks = {}
+_hash_locks_lock = threading.Lock()
+
+
+def rasterization_available():
+    """True when page images can be rendered"""
+    return pdfium is not None
+
+
+def _cache_dir(content_hash):
+    return os.path.join(THUMBNAIL_DIR, content_hash[:2], content_hash)
+
+
+def _image_path(content_hash, width, page):
+    return os.path.join(_cache_dir(content_hash), f"{width}-{page}.jpg")
+
+
+def _page_count_path(content_hash):
+    # Written last, so its presence means every size of every page is on disk; named after
+    # the page cap so renders made under another cap are not reused
+    return os.path.join(_cache_dir(content_hash), f"pages-{THUMBNAIL_MAX_PAGES}")
+
+
+def _cached_page_count(content_hash):
+    try:
+        with open(_page_count_path(content_hash)) as f:
+            return int(f.read())
+    except (OSError, ValueError):
+        return None
+
+
+def _render(pdf_source, content_hash):
+    directory = _cache_dir(content_hash)
+    os.makedirs(directory, exist_ok=True)
+    widths = sorted(THUMBNAIL_WIDTHS.values(), reverse=True)
+    with _render_lock:
+        pdf = pdfium.PdfDocument(bytes(load_pdf_bytes(pdf_source)))
+        try:
+            pages = min(len(pdf), THUMBNAIL_MAX_PAGES)
+            for index in range(pages):
+                page = pdf[index]
+                # Render once at the largest width; smaller sizes are downscaled copies
+                image = page.render(scale=widths[0] / page.get_width()).to_pil().convert("RGB")
+                page.close()
+                for width in widths:
+                    if image.width > width:
+                        image.thumbnail((width, image.height * width // image.width))
+                    temp_path = f"{_image_path(content_hash, width, index)}.tmp"
+                    image.save(temp_path, "JPEG", quality=80, optimize=True)
+                    os.replace(temp_path, _image_path(content_hash, width, index))
+        finally:
+            pdf.close()
+    with open(_page_count_path(content_hash), "w") as f:
+        f.write(str(pages))
+    return pages
+
+
+def page_images(pdf_source, content_hash=None, size="preview", max_pages=THUMBNAIL_MAX_PAGES):
+    """
+    Get cached JPEG images of a resume's first pages, rendering them on first use
+
+    All sizes in THUMBNAIL_WIDTHS and the first THUMBNAIL_MAX_PAGES pages are
+    rendered together, so asking for another size or page count later is a
+    cache hit. Concurrent requests for the same PDF wait for a single render.
+
+    Args:
+        pdf_source: Path to the PDF file or its bytes
+        content_hash: SHA-256 of the PDF, if already known
+        size: Key of THUMBNAIL_WIDTHS
+        max_pages: Maximum number of pages to return (at most THUMBNAIL_MAX_PAGES)
+
+    Returns:
+        list: Image file paths, one per page, or None if pypdfium2 is not installed
+            or the PDF cannot be rendered
+    """
+    if pdfium is None:
+        return None
+    content_hash = content_hash or sha256_source(pdf_source)
+    pages = _cached_page_count(content_hash)
+    if pages is None:
+        with _hash_locks_lock:
+            lock = _hash_locks.setdefault(content_hash, threading.Lock())
+        with lock:
+            pages = _cached_page_count(content_hash)
+            if pages is None:
+                try:
+                    pages = _render(pdf_source, content_hash)
+                except Exception:
+                    return None
+                finally:
+                    with _hash_locks_lock:
+                        _hash_locks.pop(content_hash, None)
+    width = THUMBNAIL_WIDTHS[size]
+    return [_image_path(content_hash, width, page) for page in range(min(pages, max_pages))]
+
+
+def discard_thumbnails(content_hash):
+    """Remove the cached images of a PDF"""
+    shutil.rmtree(_cache_dir(content_hash), ignore_errors=True)
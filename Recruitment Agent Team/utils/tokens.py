@@ -0,0 +1,18 @@
+# tokens.py
+import math
+
+# Rough characters-per-token ratio for English text with GPT-4o tokenizers
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text):
+    """
+    Estimate the number of prompt tokens in a piece of text
+    
+    Args:
+        text: Text to measure
+        
+    Returns:
+        int: Approximate token count
+    """
+    return math.ceil(len(text or "") / CHARS_PER_TOKEN)
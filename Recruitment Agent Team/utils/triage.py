@@ -0,0 +1,161 @@
+# triage.py
+# Local, LLM-free pre-screening of resumes against the job's skills and description
+import hashlib
+import json
+import re
+from collections import Counter
+import numpy as np
+
+# Relative weight of required skills vs. description keywords in the triage score
+SKILL_WEIGHT = 0.75
+DESCRIPTION_WEIGHT = 0.25
+MAX_DESCRIPTION_TERMS = 40
+
+STOPWORDS = {
+    "a", "about", "across", "all", "also", "an", "and", "any", "are", "as", "at", "be", "been",
+    "both", "but", "by", "can", "candidate", "candidates", "closely", "company", "do", "each",
+    "etc", "experience", "for", "from", "good", "has", "have", "help", "in", "including", "into",
+    "is", "it", "its", "job", "like", "looking", "more", "must", "new", "of", "on", "or", "other",
+    "our", "over", "plus", "preferred", "required", "requirements", "responsibilities", "role",
+    "should", "skills", "strong", "such", "team", "teams", "that", "the", "their", "them", "this",
+    "to", "using", "we", "well", "who", "will", "with", "work", "working", "years", "you", "your",
+}
+
+_WORD_PATTERN = re.compile(r"[a-z][a-z0-9+#.-]*[a-z0-9+#]|[a-z]")
+
+
+def extract_description_terms(job_description, max_terms=MAX_DESCRIPTION_TERMS):
+    """
+    Pick the most frequent meaningful keywords from a job description
+
+    Args:
+        job_description: Free-text job description
+        max_terms: Maximum number of keywords to keep
+
+    Returns:
+        list: Lowercased keywords
+    """
+    words = _WORD_PATTERN.findall((job_description or "").lower())
+    counts = Counter(w for w in words if len(w) > 2 and w not in STOPWORDS)
+    return [word for word, _ in counts.most_common(max_terms)]
+
+
+def normalize_term(term):
+    """Lowercase a skill or keyword and collapse its whitespace, so "Cloud  Architecture" is "cloud architecture" """
+    return " ".join(str(term).split()).lower()
+
+
+def _compile_terms(terms):
+    """Compile all (normalized) terms into one case-insensitive alternation, longest first"""
+    alternatives = sorted(terms, key=len, reverse=True)
+    body = "|".join(re.escape(term).replace(r"\ ", r"\s+") for term in alternatives)
+    # Custom boundaries so "C++", "C#" and "Node.js" match but "Java" does not match "JavaScript"
+    return re.compile(r"(?<![a-z0-9+#])(?:" + body + r")(?![a-z0-9+#])")
+
+
+def term_count_matrix(texts, terms):
+    """
+    Count occurrences of each term in each text
+
+    Terms are compared after normalize_term(), so any run of whitespace in a
+    term matches any run of whitespace in the text, and terms that normalize
+    to the same string get the same counts.
+
+    Args:
+        texts: List of resume texts
+        terms: List of terms (multi-word terms allowed)
+
+    Returns:
+        numpy.ndarray: (len(texts), len(terms)) matrix of counts
+    """
+    matrix = np.zeros((len(texts), len(terms)), dtype=np.float32)
+    keys = [normalize_term(term) for term in terms]
+    unique = [key for key in dict.fromkeys(keys) if key]
+    if not unique:
+        return matrix
+
+    index = {term: i for i, term in enumerate(unique)}
+    pattern = _compile_terms(unique)
+    counts = np.zeros((len(texts), len(unique)), dtype=np.float32)
+    for row, text in enumerate(texts):
+        matches = pattern.findall((text or "").lower())
+        if matches:
+            ids = [index[normalize_term(match)] for match in matches]
+            counts[row] = np.bincount(ids, minlength=len(unique))
+    columns = [i for i, key in enumerate(keys) if key]
+    matrix[:, columns] = counts[:, [index[keys[i]] for i in columns]]
+    return matrix
+
+
+def _profile_terms(skills, job_description):
+    skill_terms = list(dict.fromkeys(normalize_term(s) for s in skills if s and s.strip()))
+    description_terms = [t for t in extract_description_terms(job_description) if t not in skill_terms]
+    return skill_terms, description_terms
+
+
+def role_weight_matrix(profiles):
+    """
+    Build the term weights that turn term coverage into triage scores for several roles
+
+    Args:
+        profiles: List of job profiles, dicts with "skills" and "description"
+
+    Returns:
+        tuple: (vocabulary list shared by all roles, (len(vocabulary), len(profiles)) weight matrix)
+    """
+    role_terms = [_profile_terms(p.get("skills", []), p.get("description", "")) for p in profiles]
+    vocabulary = list(dict.fromkeys(term for skill_terms, description_terms in role_terms
+                                    for term in skill_terms + description_terms))
+    index = {term: i for i, term in enumerate(vocabulary)}
+    weights = np.zeros((len(vocabulary), len(profiles)), dtype=np.float32)
+    for role, (skill_terms, description_terms) in enumerate(role_terms):
+        # Each part is a mean over its terms; a role with only one part gives it full weight
+        skill_weight = SKILL_WEIGHT if description_terms else 1.0
+        description_weight = DESCRIPTION_WEIGHT if skill_terms else 1.0
+        for term in skill_terms:
+            weights[index[term], role] = skill_weight / len(skill_terms)
+        for term in description_terms:
+            weights[index[term], role] = description_weight / len(description_terms)
+    return vocabulary, weights
+
+
+def role_score_matrix(texts, profiles):
+    """
+    Score resumes against several job profiles at once without calling the LLM
+
+    Every resume is scanned once for the union of all roles' terms; the
+    per-role scores are then a single matrix product, identical to calling
+    score_resumes() for each role.
+
+    Args:
+        texts: List of extracted resume texts
+        profiles: List of job profiles, dicts with "skills" and "description"
+
+    Returns:
+        numpy.ndarray: (len(texts), len(profiles)) triage scores from 0 to 100
+    """
+    vocabulary, weights = role_weight_matrix(profiles)
+    # Per-term coverage where the first mention counts most (1 - e^-tf)
+    coverage = 1.0 - np.exp(-term_count_matrix(texts, vocabulary))
+    return coverage @ weights * 100.0
+
+
+def score_resumes(texts, skills, job_description=""):
+    """
+    Score resumes against the job's skills and description without calling the LLM
+
+    Args:
+        texts: List of extracted resume texts
+        skills: Required skills (selected COMMON_SKILLS plus custom job skills)
+        job_description: Free-text job description
+
+    Returns:
+        numpy.ndarray: Triage scores from 0 to 100, one per text
+    """
+    return role_score_matrix(texts, [{"skills": skills, "description": job_description}])[:, 0]
+
+
+def triage_profile_key(skills, job_description):
+    """Identify the job profile a set of triage scores was computed for"""
+    profile = json.dumps([sorted(s.lower() for s in skills), (job_description or "").strip()])
+    return hashlib.sha256(profile.encode("utf-8")).hexdigest()
@@ -0,0 +1,137 @@
+# verdict_cache.py
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from config import VERDICT_CACHE_PATH, VERDICT_CACHE_TTL_SECONDS
+from utils.hashing import sha256_bytes
+
+
+def normalize_requirements(job_requirements):
+    """Normalize job requirements so cosmetic whitespace/case edits share a cache key"""
+    lines = (re.sub(r"\s+", " ", line).strip() for line in (job_requirements or "").splitlines())
+    return "\n".join(line for line in lines if line).casefold()
+
+
+def requirements_hash(job_requirements):
+    """
+    Hash normalized job requirements
+    
+    Args:
+        job_requirements: Job requirements text
+        
+    Returns:
+        str: SHA-256 hex digest of the normalized text
+    """
+    return sha256_bytes(normalize_requirements(job_requirements).encode("utf-8"))
+
+
+class VerdictCache:
+    """
+    SQLite-backed cache of parsed analyzer verdicts
+    
+    Rows are keyed on (resume content hash, requirements hash, deployment,
+    prompt version) and expire after ttl_seconds. Each thread gets its own
+    connection so the cache can be used from the batch analyzer pool.
+    """
+
+    def __init__(self, db_path=VERDICT_CACHE_PATH, ttl_seconds=VERDICT_CACHE_TTL_SECONDS):
+        self.db_path = db_path
+        self.ttl_seconds = ttl_seconds
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS verdicts (
+                    resume_hash TEXT NOT NULL,
+                    requirements_hash TEXT NOT NULL,
+                    deployment TEXT NOT NULL,
+                    prompt_version TEXT NOT NULL,
+                    verdict_json TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    PRIMARY KEY (resume_hash, requirements_hash, deployment, prompt_version)
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_verdicts_requirements ON verdicts (requirements_hash)")
+
+    def _connect(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, resume_hash, req_hash, deployment, prompt_version):
+        """
+        Look up a cached verdict
+        
+        Returns:
+            dict: Parsed verdict, or None on a miss or expired entry
+        """
+        row = self._connect().execute(
+            "SELECT verdict_json, created_at FROM verdicts "
+            "WHERE resume_hash = ? AND requirements_hash = ? AND deployment = ? AND prompt_version = ?",
+            (resume_hash, req_hash, deployment, prompt_version)
+        ).fetchone()
+        if row is None:
+            return None
+        verdict_json, created_at = row
+        if self.ttl_seconds is not None and time.time() - created_at > self.ttl_seconds:
+            self.invalidate(resume_hash, req_hash, deployment, prompt_version)
+            return None
+        return json.loads(verdict_json)
+
+    def put(self, resume_hash, req_hash, deployment, prompt_version, verdict):
+        """Store a parsed verdict, replacing any previous entry for the same key"""
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO verdicts VALUES (?, ?, ?, ?, ?, ?)",
+                (resume_hash, req_hash, deployment, prompt_version, json.dumps(verdict), time.time())
+            )
+
+    def invalidate(self, resume_hash=None, req_hash=None, deployment=None, prompt_version=None):
+        """
+        Delete cached verdicts matching every given key part
+        
+        Calling with no arguments clears the whole cache.
+        
+        Returns:
+            int: Number of deleted entries
+        """
+        clauses = []
+        params = []
+        for column, value in (("resume_hash", resume_hash), ("requirements_hash", req_hash),
+                              ("deployment", deployment), ("prompt_version", prompt_version)):
+            if value is not None:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        with self._connect() as conn:
+            return conn.execute(f"DELETE FROM verdicts{where}", params).rowcount
+
+    def purge_expired(self):
+        """Delete every entry older than the TTL and return how many were removed"""
+        if self.ttl_seconds is None:
+            return 0
+        with self._connect() as conn:
+            return conn.execute(
+                "DELETE FROM verdicts WHERE created_at < ?", (time.time() - self.ttl_seconds,)
+            ).rowcount
+
+
+_verdict_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_verdict_cache():
+    """Return the process-wide verdict cache"""
+    global _verdict_cache
+    with _cache_lock:
+        if _verdict_cache is None:
+            _verdict_cache = VerdictCache()
+            _verdict_cache.purge_expired()
+        return _verdict_cache